@@ -0,0 +1,4 @@
+"""
+    Benchmarks of dipper's hot paths on synthetic, offline, data;
+    run with `python3 -m benchmarks.run` (see run.py)
+"""
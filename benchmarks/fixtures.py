@@ -0,0 +1,462 @@
+"""
+    Synthetic raw files, laid out as the ingests expect to find them
+    in raw/<source name>/, with the columns and value shapes of the real files
+    and `scale` records of each (genes, annotations, ortholog pairs ...).
+
+    The same scale and seed always give the same files.
+"""
+
+import os
+import re
+import io
+import json
+import gzip
+import random
+import tarfile
+import logging
+
+LOG = logging.getLogger(__name__)
+
+# what was written to each raw directory, so files are only made once per scale
+STAMP = 'bench_fixture.json'
+
+CLINVAR_TEMPLATES = os.path.join(
+    os.path.dirname(__file__), '..', 'tests', 'resources', 'clinvar', 'input')
+
+GENE_TYPES = [      # type_of_gene, roughly as common as in gene_info
+    'protein-coding', 'protein-coding', 'protein-coding', 'protein-coding',
+    'ncRNA', 'pseudo', 'pseudo', 'unknown', 'biological-region', 'snoRNA']
+EVIDENCE_CODES = ['IDA', 'IEA', 'IEA', 'IMP', 'IPI', 'ISS', 'TAS']
+ECO_MAP = [
+    ('IDA', 'Default', 'ECO:0000314'),
+    ('IEA', 'GO_REF:0000002', 'ECO:0000256'),
+    ('IEA', 'Default', 'ECO:0000501'),
+    ('IMP', 'Default', 'ECO:0000315'),
+    ('IPI', 'Default', 'ECO:0000353'),
+    ('ISS', 'Default', 'ECO:0000250'),
+    ('TAS', 'Default', 'ECO:0000304'),
+]
+# panther species code -> (gene id, protein id) formats
+PANTHER_SPECIES = {
+    'HUMAN': ('Ensembl=ENSG{:011d}', 'UniProtKB=P{:05d}'),
+    'MOUSE': ('MGI=MGI={}', 'UniProtKB=Q{:05d}'),
+    'RAT': ('RGD={}', 'UniProtKB=O{:05d}'),
+    'DANRE': ('ZFIN=ZDB-GENE-0{}', 'UniProtKB=A{:05d}'),
+    'DROME': ('FlyBase=FBgn{:07d}', 'UniProtKB=B{:05d}'),
+    'CAEEL': ('WormBase=WBGene{:08d}', 'UniProtKB=C{:05d}'),
+    'CHICK': ('Ensembl=ENSGALG{:011d}', 'UniProtKB=D{:05d}'),
+    'YEAST': ('SGD=S{:09d}', 'UniProtKB=E{:05d}'),
+}
+ORTHOLOGY_CLASSES = ['LDO', 'LDO', 'O', 'O', 'P', 'X', 'LDX']
+STRING_SCORES = [
+    'neighborhood', 'fusion', 'cooccurence', 'coexpression', 'experimental',
+    'database', 'textmining', 'combined_score']
+
+
+def make_fixtures(name, rawdir, scale, seed=0):
+    '''
+    Write the raw files of an ingest, unless those of this scale & seed are there
+    :param name: str  key of FIXTURES (the ingest's name)
+    :param rawdir: str  the ingest's raw directory
+    :param scale: int  records in the main file(s)
+    :return: dict  count of data rows written to each file
+    '''
+    stamp = os.path.join(rawdir, STAMP)
+    if os.path.exists(stamp):
+        with open(stamp) as fhandle:
+            made = json.load(fhandle)
+        if made['scale'] == scale and made['seed'] == seed:
+            return made['rows']
+    os.makedirs(rawdir, exist_ok=True)
+    LOG.info("Writing %s fixtures of scale %i to %s", name, scale, rawdir)
+    rows = FIXTURES[name](rawdir, scale, random.Random(seed))
+    with open(stamp, 'w') as fhandle:
+        json.dump({'scale': scale, 'seed': seed, 'rows': rows}, fhandle)
+    return rows
+
+
+def _write_tsv(filename, header, rows, opener=open):
+    count = 0
+    with opener(filename, 'wt') as fhandle:
+        for line in header:
+            fhandle.write(line + '\n')
+        for row in rows:
+            fhandle.write('\t'.join(row) + '\n')
+            count += 1
+    return count
+
+
+def write_ncbigene(rawdir, scale, rng):
+    '''
+    gene_info.gz, gene_history.gz, gene2pubmed.gz and OMIM's mimTitles.txt
+    A quarter of the genes are rat, which NCBIGene filters out by default.
+    '''
+    taxa = ['9606', '10090', '7955', '10116']
+
+    def chromosome(tax_num):
+        if tax_num == '9606':
+            chrom = rng.choice([str(num) for num in range(1, 23)] + ['X', 'Y'])
+            return (chrom, '{}{}{}.{}'.format(
+                chrom, rng.choice('pq'), rng.randint(11, 36), rng.randint(1, 3)))
+        if tax_num == '10090':
+            chrom = str(rng.randint(1, 19))
+            return (chrom, '{0} {1}{2}|{0} {3:.2f} cM'.format(
+                chrom, rng.choice('ABCDEFG'), rng.randint(1, 3), rng.uniform(1, 90)))
+        if tax_num == '7955':
+            return (str(rng.randint(1, 25)), '-')
+        return (rng.choice(['1', '2', '1|Un']), '-')
+
+    def gene_info():
+        for num in range(1, scale + 1):
+            tax_num = taxa[num % len(taxa)]
+            symbol = 'GENE{}'.format(num)
+            if tax_num == '9606':
+                dbxrefs = 'MIM:{}|HGNC:HGNC:{}|Ensembl:ENSG{:011d}|HPRD:{:05d}'.format(
+                    100000 + num, num, num, num)
+            elif tax_num == '10090':
+                dbxrefs = 'MGI:MGI:{}|Ensembl:ENSMUSG{:011d}|Vega:OTTMUSG{:011d}'.format(
+                    num, num, num)
+            elif tax_num == '7955':
+                dbxrefs = 'ZFIN:ZDB-GENE-0{}|Ensembl:ENSDARG{:011d}'.format(num, num)
+            else:
+                dbxrefs = 'RGD:{}'.format(num)
+            (chrom, map_loc) = chromosome(tax_num)
+            yield [
+                tax_num, str(num), symbol, '-',
+                '|'.join('{}S{}'.format(symbol, syn) for syn in range(rng.randint(0, 3)))
+                or '-',
+                dbxrefs, chrom, map_loc,
+                'synthetic gene {}'.format(num), rng.choice(GENE_TYPES),
+                symbol, 'synthetic gene {}'.format(num), 'O',
+                'gene {0} protein|gene {0} homolog'.format(num), '20190401', '-']
+
+    def gene_history():
+        for num in range(1, scale + 1, 10):
+            yield [taxa[num % len(taxa)], str(num), str(scale + num),
+                   'OLD{}'.format(num), '20120101']
+
+    def gene2pubmed():
+        for num in range(1, scale + 1):
+            for _ in range(rng.randint(0, 4)):
+                yield [taxa[num % len(taxa)], str(num), str(rng.randint(1, 30000000))]
+
+    def mimtitles():
+        for num in range(1, scale + 1, len(taxa)):  # the human genes' MIM numbers
+            mim = str(100000 + num)
+            declared = rng.choice(
+                ['Asterisk', 'Asterisk', 'Asterisk', 'Number Sign', 'Percent',
+                 'Plus', 'NULL', 'Caret'])
+            title = 'MOVED TO {}'.format(100000 + rng.randint(1, scale)) \
+                if declared == 'Caret' else 'SYNTHETIC ENTRY {}'.format(num)
+            yield [declared, mim, title, '', '']
+
+    return {
+        'gene_info.gz': _write_tsv(
+            os.path.join(rawdir, 'gene_info.gz'),
+            ['#tax_id\tGeneID\tSymbol\tLocusTag\tSynonyms\tdbXrefs\tchromosome\t'
+             'map_location\tdescription\ttype_of_gene\t'
+             'Symbol_from_nomenclature_authority\t'
+             'Full_name_from_nomenclature_authority\tNomenclature_status\t'
+             'Other_designations\tModification_date\tFeature_type'],
+            gene_info(), gzip.open),
+        'gene_history.gz': _write_tsv(
+            os.path.join(rawdir, 'gene_history.gz'),
+            ['#tax_id\tGeneID\tDiscontinued_GeneID\tDiscontinued_Symbol\t'
+             'Discontinue_Date'],
+            gene_history(), gzip.open),
+        'gene2pubmed.gz': _write_tsv(
+            os.path.join(rawdir, 'gene2pubmed.gz'),
+            ['#tax_id\tGeneID\tPubMed_ID'], gene2pubmed(), gzip.open),
+        'mimTitles.txt': _write_tsv(
+            os.path.join(rawdir, 'mimTitles.txt'),
+            ['# Copyright (c) synthetic', '# Generated: 2019-04-01',
+             '# Prefix\tMim Number\tPreferred Title; symbol\t'
+             'Alternative Title(s); symbol(s)\tIncluded Title(s); symbols'],
+            mimtitles()),
+    }
+
+
+def write_go(rawdir, scale, rng):
+    '''
+    goa_human.gaf.gz and mgi.gaf.gz with `scale` annotations each,
+    idmapping_selected.tab.gz mapping most of the human UniProt ids
+    and the GAF to ECO mapping file
+    '''
+    def gaf(tax_num):
+        genes = max(scale // 5, 1)
+        for num in range(scale):
+            gene = rng.randint(1, genes)
+            aspect = rng.choice('PFC')
+            code = rng.choice(EVIDENCE_CODES)
+            qualifier = rng.choice(['', '', '', '', 'NOT', 'colocalizes_with'])
+            if aspect == 'F' and qualifier == '':
+                qualifier = rng.choice(['', 'contributes_to'])
+            if tax_num == '9606':
+                (dbase, gene_num, assigned) = ('UniProtKB', 'P{:05d}'.format(gene), 'UniProt')
+                with_from = 'UniProtKB:Q{:05d}'.format(gene) if code == 'IPI' else ''
+            else:
+                (dbase, gene_num, assigned) = ('MGI', 'MGI:{}'.format(gene), 'MGI')
+                with_from = 'MGI:MGI:{}'.format(rng.randint(1, genes)) \
+                    if code == 'IMP' else ''
+            ref = 'GO_REF:0000002' if code == 'IEA' else 'PMID:{}|{}:{}'.format(
+                rng.randint(1, 30000000), 'MGI:MGI' if dbase == 'MGI' else 'Reactome',
+                rng.randint(1, 99999))
+            yield [
+                dbase, gene_num, 'GENE{}'.format(gene), qualifier,
+                'GO:{:07d}'.format(rng.randint(1, 70000)), ref, code, with_from,
+                aspect, 'synthetic gene {}'.format(gene),
+                'GENE{0}A|GENE{0}B'.format(gene) if num % 3 else '',
+                'protein', 'taxon:' + tax_num, '20190401', assigned, '', '']
+
+    def idmapping():
+        for num in range(1, scale // 5 + 1):
+            row = [''] * 22
+            row[0] = 'P{:05d}'.format(num)
+            row[1] = 'GENE{}_HUMAN'.format(num)
+            if num % 10 < 7:
+                row[2] = str(num)
+            elif num % 10 < 8:
+                row[2] = '{0}; {1}'.format(num, num + 1)  # not 1:1
+                row[18] = 'ENSG{:011d}'.format(num)
+            elif num % 10 < 9:
+                row[18] = 'ENSG{:011d}'.format(num)
+            row[12] = '9606'
+            yield row
+        for num in range(1, scale // 5 + 1, 3):
+            row = [''] * 22
+            row[0] = 'Q{:05d}'.format(num)
+            row[2] = str(1000000 + num)
+            row[12] = '10090'
+            yield row
+
+    header = ['!gaf-version: 2.1', '!generated-by: dipper benchmarks']
+    return {
+        'goa_human.gaf.gz': _write_tsv(
+            os.path.join(rawdir, 'goa_human.gaf.gz'), header, gaf('9606'), gzip.open),
+        'mgi.gaf.gz': _write_tsv(
+            os.path.join(rawdir, 'mgi.gaf.gz'), header, gaf('10090'), gzip.open),
+        'idmapping_selected.tab.gz': _write_tsv(
+            os.path.join(rawdir, 'idmapping_selected.tab.gz'), [], idmapping(),
+            gzip.open),
+        'gaf-eco-mapping.txt': _write_tsv(
+            os.path.join(rawdir, 'gaf-eco-mapping.txt'),
+            ['# GO evidence code to ECO mapping'], (list(row) for row in ECO_MAP)),
+    }
+
+
+def write_panther(rawdir, scale, rng):
+    '''
+    RefGenomeOrthologs.tar.gz and Orthologs_HCOP.tar.gz, `scale` gene pairs
+    each, one in eight between species NCBIGene's default taxa do not include
+    '''
+    species = sorted(PANTHER_SPECIES)
+    genes = max(scale // 2, 1)
+
+    def thing(code, num):
+        (gene, protein) = PANTHER_SPECIES[code]
+        if code == 'RAT' and num % 50 == 0:
+            gene = 'Gene=Huwe{}'    # a symbol, not an identifier
+        return '|'.join((code, gene.format(num), protein.format(num % 100000)))
+
+    def pairs():
+        for num in range(scale):
+            species_a = 'HUMAN' if num % 2 else rng.choice(species)
+            species_b = rng.choice(species)
+            if num % 8 == 0:
+                species_a = rng.choice(['RAT', 'CHICK', 'YEAST'])
+                species_b = rng.choice(['DROME', 'CAEEL'])
+            yield [
+                thing(species_a, rng.randint(1, genes)),
+                thing(species_b, rng.randint(1, genes)),
+                rng.choice(ORTHOLOGY_CLASSES), rng.choice(['Euarchontoglires', 'ND']),
+                'PTHR{:05d}'.format(rng.randint(10000, 99999))]
+
+    rows = {}
+    for (tarname, member) in (
+            ('RefGenomeOrthologs.tar.gz', 'RefGenomeOrthologs'),
+            ('Orthologs_HCOP.tar.gz', 'Orthologs_HCOP')):
+        lines = ['\t'.join(row) + '\n' for row in pairs()]
+        text = ''.join(lines).encode()
+        info = tarfile.TarInfo(member)
+        info.size = len(text)
+        with tarfile.open(os.path.join(rawdir, tarname), 'w:gz') as tar:
+            tar.addfile(info, io.BytesIO(text))
+        rows[tarname] = len(lines)
+    return rows
+
+
+def write_mgi(rawdir, scale, rng):
+    '''
+    The MGI query dumps joined on to make genotype to phenotype and disease
+    associations: genotypes, alleles, annotations and their evidence
+    '''
+    genotypes = max(scale // 4, 1)
+    alleles = max(scale // 2, 1)
+
+    def gxd_genotype_summary_view():
+        for key in range(1, genotypes + 1):
+            for part in range(rng.randint(1, 2)):
+                yield [str(key), '1', 'MGI:{}'.format(5000000 + key),
+                       rng.choice(['hom', 'het', 'cn']),
+                       'Gene{0}<tm{1}>,Gene{0}<tm{1}>'.format(key, part + 1)]
+
+    def gxd_genotype_view():
+        for key in range(1, genotypes + 1):
+            strain = rng.randint(-2, 2000)
+            yield [str(key), str(strain), 'strain {}'.format(strain),
+                   'MGI:{}'.format(5000000 + key)]
+
+    def all_summary_view():
+        for key in range(1, alleles + 1):
+            yield [str(key), '1' if key % 5 else '0', 'MGI:{}'.format(3000000 + key),
+                   'targeted mutation {}'.format(key), 'Gene{0}<tm{0}>'.format(key)]
+
+    def voc_annot_view():
+        for key in range(1, scale + 1):
+            annot_type = rng.choice([
+                'Mammalian Phenotype/Genotype', 'Mammalian Phenotype/Genotype',
+                'Mammalian Phenotype/Genotype', 'DO/Genotype', 'DO/Allele'])
+            if annot_type == 'Mammalian Phenotype/Genotype':
+                (obj, accid) = (rng.randint(1, genotypes), 'MP:{:07d}'.format(
+                    rng.randint(1, 20000)))
+            elif annot_type == 'DO/Genotype':
+                (obj, accid) = (rng.randint(1, genotypes), 'DOID:{}'.format(
+                    rng.randint(1, 90000)))
+            else:
+                (obj, accid) = (rng.randint(1, alleles), 'DOID:{}'.format(
+                    rng.randint(1, 90000)))
+            qualifier = rng.choice(['', '', '', '1614157'])
+            yield [str(key), annot_type, str(obj), str(rng.randint(1, 99999)),
+                   qualifier, 'NOT' if qualifier else '', 'term', accid]
+
+    def evidence_view():
+        for key in range(1, scale + 1):
+            sex = rng.choice(['', '', 'M', 'F', 'NA'])
+            yield [str(key), str(key), rng.choice(['EXP', 'IDA', 'IMP', 'TAS', 'IEA']),
+                   'J:{}'.format(rng.randint(1, 300000)),
+                   'MP-Sex-Specificity' if sex else '', sex,
+                   'Mammalian Phenotype/Genotype']
+
+    tables = {
+        'gxd_genotype_summary_view': (
+            'object_key\tpreferred\tmgiid\tsubtype\tshort_description',
+            gxd_genotype_summary_view),
+        'gxd_genotype_view': (
+            'genotype_key\tstrain_key\tstrain\tmgiid', gxd_genotype_view),
+        'all_summary_view': (
+            'object_key\tpreferred\tmgiid\tdescription\tshort_description',
+            all_summary_view),
+        'voc_annot_view': (
+            'annot_key\tannot_type\tobject_key\tterm_key\tqualifier_key\t'
+            'qualifier\tterm\taccid', voc_annot_view),
+        'evidence_view': (
+            'annot_evidence_key\tannot_key\tevidence_code\tjnumid\tqualifier\t'
+            'qualifier_value\tannotation_type', evidence_view),
+    }
+    return {
+        table: _write_tsv(os.path.join(rawdir, table), [header], rows())
+        for (table, (header, rows)) in tables.items()}
+
+
+def write_clinvar(rawdir, scale, rng):
+    '''
+    ClinVarFullRelease_00-latest.xml.gz of `scale` ClinVarSets,
+    copies of those in tests/resources/clinvar each given new accessions & ids,
+    and the gene_condition_source_id mapping
+    '''
+    sets = []
+    for name in sorted(os.listdir(CLINVAR_TEMPLATES)):
+        if name.endswith('.xml.gz'):
+            with gzip.open(os.path.join(CLINVAR_TEMPLATES, name), 'rt') as fhandle:
+                sets += re.findall(r'<ClinVarSet .*?</ClinVarSet>', fhandle.read(), re.S)
+
+    count = 0
+    with gzip.open(
+            os.path.join(rawdir, 'ClinVarFullRelease_00-latest.xml.gz'), 'wt') as fhandle:
+        fhandle.write(
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<ReleaseSet Dated="2019-04-03" Type="full">\n')
+        for num in range(scale):
+            # RCV, SCV & VCV accessions and the numeric ids, unique per copy
+            suffix = r'\g<1>{:06d}'.format(num)
+            text = re.sub(
+                r'((?:RCV|SCV|VCV)\d+)', suffix, sets[rng.randrange(len(sets))])
+            text = re.sub(r'(\bID="\d+)', suffix, text)
+            fhandle.write(text + '\n')
+            count += 1
+        fhandle.write('</ReleaseSet>\n')
+    with open(os.path.join(CLINVAR_TEMPLATES, 'gene_condition_source_id')) as source:
+        mapping = source.read()
+    with open(os.path.join(rawdir, 'gene_condition_source_id'), 'w') as fhandle:
+        fhandle.write(mapping)
+    return {'ClinVarFullRelease_00-latest.xml.gz': count}
+
+
+def write_string(rawdir, scale, rng):
+    '''
+    STRING's detailed protein links of human & mouse, `scale` links each,
+    and its entrez to STRING id mappings (which miss a tenth of the proteins)
+    '''
+    proteins = max(scale // 10, 2)
+    rows = {}
+    for (tax_num, species) in (('9606', 'human'), ('10090', 'mouse')):
+        links = '{}.protein.links.detailed.v11.0.txt.gz'.format(tax_num)
+
+        def protein_links():
+            for _ in range(scale):
+                scores = [str(rng.choice([0, 0, rng.randint(0, 999)])) for _ in range(7)]
+                yield ['{}.ENSP{:011d}'.format(tax_num, rng.randint(1, proteins)),
+                       '{}.ENSP{:011d}'.format(tax_num, rng.randint(1, proteins))] + \
+                    scores + [str(rng.randint(150, 999))]
+
+        rows[links] = _write_tsv(
+            os.path.join(rawdir, links), [' '.join(['protein1', 'protein2'] + STRING_SCORES)],
+            ([' '.join(row)] for row in protein_links()), gzip.open)
+
+        mapping = '{}.entrez_2_string.2018.tsv.gz'.format(species)
+        rows[mapping] = _write_tsv(
+            os.path.join(rawdir, mapping), ['# NCBI taxid / entrez / STRING'],
+            ([tax_num, str(num) if num % 7 else '{0}|{1}'.format(num, num + 1),
+              '{}.ENSP{:011d}'.format(tax_num, num)]
+             for num in range(1, proteins + 1) if num % 10), gzip.open)
+    return rows
+
+
+def write_rgd(rawdir, scale, rng):
+    '''
+    RGD's rat gene to mammalian phenotype GAF, `scale` annotations,
+    a tenth of them NOT
+    '''
+    genes = max(scale // 5, 1)
+
+    def annotations():
+        for _ in range(scale):
+            gene = rng.randint(1, genes)
+            refs = 'RGD:{}'.format(rng.randint(1, 99999))
+            if rng.random() < 0.5:
+                refs += '|PMID:{}'.format(rng.randint(1, 30000000))
+            yield [
+                'RGD', str(gene), 'Gene{}'.format(gene),
+                'NOT' if rng.random() < 0.1 else '',
+                'MP:{:07d}'.format(rng.randint(1, 15000)), refs,
+                rng.choice(['IAGP', 'IDA', 'IED', 'IMP', 'TAS']), '', 'N',
+                'synthetic gene {}'.format(gene), '', 'gene', 'taxon:10116',
+                '20190401', 'RGD', '', '']
+
+    header = ['!gaf-version: 2.1', '!generated-by: dipper benchmarks']
+    return {
+        'rattus_genes_mp': _write_tsv(
+            os.path.join(rawdir, 'rattus_genes_mp'), header, annotations()),
+    }
+
+
+# ingest name -> writer of its raw files
+FIXTURES = {
+    'ncbigene': write_ncbigene,
+    'go': write_go,
+    'panther': write_panther,
+    'mgi': write_mgi,
+    'clinvarxml_alpha': write_clinvar,
+    'string': write_string,
+    'rgd': write_rgd,
+}
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+    Time dipper's hot paths on synthetic data, offline:
+    each ingest's parse(), adding triples to each kind of graph,
+    CurieUtil and GraphUtils.write (see suite.py).
+
+    Each run is appended to benchmarks/results/history.jsonl
+    and compared with the last run of the same scale and graph type.
+
+    python3 -m benchmarks.run --scale 10000 --repeat 3 parse emit-rdf_graph
+"""
+
+import os
+import sys
+import json
+import logging
+import argparse
+import platform
+import subprocess
+from datetime import datetime
+from statistics import mean
+
+from dipper.utils.MetricsUtil import Metrics
+from benchmarks.fixtures import make_fixtures
+from benchmarks.suite import BENCHMARKS
+
+LOG = logging.getLogger(__name__)
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HISTORY = os.path.join(REPO, 'benchmarks', 'results', 'history.jsonl')
+WORKDIR = os.path.join(REPO, 'benchmarks', 'results', 'work')
+
+
+def select(names):
+    '''
+    :param names: list of benchmark names, or their prefixes ('parse', 'emit')
+    :return: list of benchmark names, in suite order
+    '''
+    if not names:
+        return list(BENCHMARKS)
+    selected = [
+        bench for bench in BENCHMARKS
+        if any(bench == name or bench.startswith(name + '-') for name in names)]
+    unknown = [
+        name for name in names
+        if not any(bench == name or bench.startswith(name + '-') for bench in BENCHMARKS)]
+    if unknown:
+        raise ValueError("No benchmark {}, try --list".format(', '.join(unknown)))
+    return selected
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO, check=True,
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            universal_newlines=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(name, args, profile_dir=None):
+    '''
+    Time a benchmark `args.repeat` times, each on a fresh Case
+    :return: dict  of the best (quickest) run, and every run's seconds
+    '''
+    (fixture, make_case) = BENCHMARKS[name]
+    rows = None
+    if fixture is not None:
+        rows = sum(make_fixtures(
+            fixture, os.path.join('raw', fixture), args.scale, args.seed).values())
+    metrics = Metrics(name)
+    records = []
+    for attempt in range(args.repeat):
+        case = make_case(args.graph, args.scale)
+        with metrics.stage(
+                str(attempt), case.graph, profile_dir,
+                trace_memory=args.trace_memory) as record:
+            case.run()
+        if case.finish is not None:
+            case.finish()
+        if case.count_triples is not None:
+            record['triples'] = case.count_triples()
+        if rows is not None:
+            record['rows'] = rows     # the input read, whether counted or not
+        records.append(record)
+
+    best = dict(min(records, key=lambda record: record['seconds']))
+    seconds = max(best['seconds'], 1e-6)
+    best.update(
+        seconds=round(best['seconds'], 4),
+        mean_seconds=round(mean(record['seconds'] for record in records), 4),
+        runs=[round(record['seconds'], 4) for record in records],
+        triples_per_sec=round(best['triples'] / seconds, 1),
+        rows_per_sec=round(best['rows'] / seconds, 1))
+    del best['calls']
+    best.pop('top_allocators', None)
+    return best
+
+
+def read_history(filename):
+    if not os.path.exists(filename):
+        return []
+    with open(filename) as fhandle:
+        return [json.loads(line) for line in fhandle if line.strip()]
+
+
+def previous_results(history, run, baseline=None):
+    '''
+    The latest earlier result of each benchmark from a comparable run:
+    the same scale, seed and graph type (and git revision, given a baseline)
+    :return: dict  benchmark name -> (its result, the run's revision & date)
+    '''
+    previous = {}
+    for past in history:
+        if (past['scale'], past['seed'], past['graph']) != \
+                (run['scale'], run['seed'], run['graph']):
+            continue
+        if baseline is not None and past.get('revision') != baseline:
+            continue
+        for (name, result) in past['results'].items():
+            previous[name] = (result, past)
+    return previous
+
+
+def report(run, previous, out=sys.stdout):
+    '''
+    Print each benchmark's best time and rates, and the change since before
+    '''
+    print('{:<22}{:>10}{:>14}{:>14}{:>10}{:>9}  {}'.format(
+        'benchmark', 'seconds', 'triples/sec', 'rows/sec', 'before', 'change',
+        'compared with'), file=out)
+    for (name, result) in run['results'].items():
+        before = change = since = ''
+        if name in previous:
+            (past, past_run) = previous[name]
+            before = '{:.3f}'.format(past['seconds'])
+            change = '{:+.1f}%'.format(
+                100.0 * (result['seconds'] - past['seconds']) / max(past['seconds'], 1e-6))
+            since = '{} {}'.format(past_run.get('revision') or '-', past_run['date'])
+        print('{:<22}{:>10.3f}{:>14.0f}{:>14.0f}{:>10}{:>9}  {}'.format(
+            name, result['seconds'], result['triples_per_sec'], result['rows_per_sec'],
+            before, change, since), file=out)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='time dipper parsers & graph writing on synthetic data',
+        formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument(
+        'names', nargs='*',
+        help='benchmarks, or prefixes such as parse or emit (default: all)')
+    parser.add_argument('--list', action='store_true', help='list the benchmarks')
+    parser.add_argument(
+        '--scale', type=int, default=10000,
+        help='records in each synthetic file (genes, annotations, links ...)')
+    parser.add_argument('--seed', type=int, default=0, help='of the synthetic data')
+    parser.add_argument(
+        '--repeat', type=int, default=3, help='runs of each benchmark, the best is kept')
+    parser.add_argument(
+        '--graph', default='rdf_graph',
+        choices=('rdf_graph', 'compact_graph', 'sqlite_graph', 'streamed_graph'),
+        help='graph type the ingests parse into')
+    parser.add_argument(
+        '--workdir', default=WORKDIR,
+        help='where fixtures (raw/) and output (out/) are kept between runs')
+    parser.add_argument('--history', default=HISTORY, help='json lines of past runs')
+    parser.add_argument(
+        '--baseline', help='compare with the last run at this git revision\n'
+        '(default: the last comparable run)')
+    parser.add_argument(
+        '--no-save', dest='save', action='store_false',
+        help='do not add this run to the history')
+    parser.add_argument(
+        '--profile', action='store_true',
+        help='cProfile each run, saving <workdir>/out/<benchmark>_<run>.pstats')
+    parser.add_argument(
+        '--trace-memory', dest='trace_memory', action='store_true',
+        help='record the peak memory of each run (tracemalloc; slows it)')
+    parser.add_argument('--debug', action='store_true', help='log at INFO')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.debug else logging.WARNING)
+
+    if args.list:
+        for (name, (fixture, make_case)) in BENCHMARKS.items():
+            print('{:<22}{}'.format(name, fixture or ''))
+        return
+
+    names = select(args.names)
+    history_file = os.path.abspath(args.history)
+    os.makedirs(args.workdir, exist_ok=True)
+    os.chdir(args.workdir)
+    os.makedirs('out', exist_ok=True)
+    profile_dir = os.path.abspath('out') if args.profile else None
+
+    run = {
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'host': platform.node(),
+        'python': platform.python_version(),
+        'scale': args.scale,
+        'seed': args.seed,
+        'graph': args.graph,
+        'repeat': args.repeat,
+        'results': {},
+    }
+    for name in names:
+        LOG.info("Running %s", name)
+        run['results'][name] = run_benchmark(name, args, profile_dir)
+
+    report(run, previous_results(read_history(history_file), run, args.baseline))
+
+    if args.save:
+        os.makedirs(os.path.dirname(history_file), exist_ok=True)
+        with open(history_file, 'a') as fhandle:
+            fhandle.write(json.dumps(run, sort_keys=True) + '\n')
+        LOG.info("Added the results to %s", history_file)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""
+    The benchmarks: each makes a Case, the call to time and what it adds to.
+
+    parse-*     an ingest's parse() of its synthetic raw files (see fixtures.py)
+    emit-*      addTriple of synthetic triples to each kind of dipper graph
+    curie       CurieUtil.get_curie and get_uri of synthetic IRIs
+    write-*     GraphUtils.write of an RDFGraph as turtle and as N-Triples
+
+    Run from a scratch directory; ingests read raw/ and write out/ beneath it.
+"""
+
+import os
+import sys
+import logging
+import pathlib
+
+from dipper import curie_map
+from dipper.graph.RDFGraph import RDFGraph
+from dipper.graph.CompactGraph import CompactGraph
+from dipper.graph.SQLiteGraph import SQLiteGraph
+from dipper.graph.StreamedGraph import StreamedGraph
+from dipper.utils.CurieUtil import CurieUtil
+from dipper.utils.GraphUtils import GraphUtils
+from dipper.utils.MetricsUtil import count_rows
+from dipper.sources import ClinVarXML_alpha
+from dipper.sources.NCBIGene import NCBIGene
+from dipper.sources.GeneOntology import GeneOntology
+from dipper.sources.Panther import Panther
+from dipper.sources.MGI import MGI
+from dipper.sources.StringDB import StringDB
+from dipper.sources.RGD import RGD
+
+LOG = logging.getLogger(__name__)
+
+# the tables MGI.parse() reads which fixtures.write_mgi makes, in parse order
+MGI_TABLES = [
+    '_process_all_summary_view',
+    '_process_gxd_genotype_summary_view',
+    '_process_gxd_genotype_view',
+    '_process_voc_annot_view',
+    '_process_evidence_view',
+]
+
+PREDICATES = [
+    'rdf:type', 'rdfs:label', 'RO:0002162', 'RO:0002200', 'OBAN:association_has_subject',
+    'OBAN:association_has_object', 'oboInOwl:hasExactSynonym', 'dc:source']
+OBJECTS = ['NCBIGene', 'MGI', 'HP', 'MONDO', 'GO', 'PMID', 'ENSEMBL', 'ZFIN']
+
+
+class Case:
+    '''
+    A benchmark ready to run:
+    `run` is timed, `finish` (closing output, not timed) follows it,
+    triples are counted on `graph`, or by `count_triples` where there is none.
+    '''
+
+    def __init__(self, run, graph=None, finish=None, count_triples=None):
+        self.run = run
+        self.graph = graph
+        self.finish = finish
+        self.count_triples = count_triples
+
+
+def offline(source_class, **attributes):
+    '''
+    A subclass of the ingest which fetches nothing, as its raw files are
+    already in place, i.e. NCBIGene's OMIM titles are read, not downloaded.
+    :param attributes: class attributes to override
+    '''
+    def get_files(self, is_dl_forced, files=None):
+        LOG.info("Not fetching %s files for a benchmark", self.name)
+
+    def fetch_from_url(self, remotefile, localfile=None, is_dl_forced=False,
+                       headers=None):
+        LOG.info("Not fetching %s for a benchmark", remotefile)
+
+    attributes.update(get_files=get_files, fetch_from_url=fetch_from_url)
+    return type(source_class.__name__, (source_class,), attributes)
+
+
+def _source_case(source, run=None):
+    if run is None:
+        run = source.parse
+    return Case(run, source.graph, source.close)
+
+
+def parse_ncbigene(graph_type, scale):
+    return _source_case(offline(NCBIGene)(graph_type, True))
+
+
+def parse_go(graph_type, scale):
+    eco_map = pathlib.Path(os.path.abspath('raw/go/gaf-eco-mapping.txt')).as_uri()
+    source_class = offline(GeneOntology, map_files={'eco_map': eco_map})
+    # the UniProt id map index is rebuilt once the fixtures of another scale are newer
+    return _source_case(source_class(graph_type, True, ['9606', '10090']))
+
+
+def parse_panther(graph_type, scale):
+    return _source_case(offline(Panther)(graph_type, True))
+
+
+def parse_mgi(graph_type, scale):
+    source = offline(MGI)(graph_type, True)
+
+    def run():
+        for table in MGI_TABLES:
+            getattr(source, table)(None)
+    return _source_case(source, run)
+
+
+def parse_string(graph_type, scale):
+    return _source_case(offline(StringDB)(graph_type, True, ['9606', '10090']))
+
+
+def parse_rgd(graph_type, scale):
+    return _source_case(offline(RGD)(graph_type, True))
+
+
+def parse_clinvar(graph_type, scale):
+    '''
+    ClinVarXML_alpha writes N-Triples itself, whatever the graph_type
+    '''
+    inputdir = os.path.abspath('raw/clinvarxml_alpha')
+    destination = os.path.abspath('out')
+    output = os.path.join(destination, 'clinvarxml_alpha.nt')
+    argv = [
+        'clinvar', '--inputdir', inputdir, '--destination', destination,
+        '--output', os.path.basename(output)]
+
+    def run():
+        saved = sys.argv
+        sys.argv = argv
+        try:
+            ClinVarXML_alpha.parse()
+        finally:
+            sys.argv = saved
+
+    def count_triples():
+        with open(output) as lines:
+            return sum(1 for line in lines if line.strip())
+    return Case(run, count_triples=count_triples)
+
+
+def synthetic_triples(scale):
+    '''
+    scale * 10 addTriple arguments, a tenth of the objects literals
+    and many subjects & objects repeated, as ingests repeat them
+    '''
+    subjects = max(scale, 1)
+    for num in range(scale * 10):
+        subject = '{}:{}'.format(OBJECTS[num % 3], (num * 7919) % subjects)
+        predicate = PREDICATES[num % len(PREDICATES)]
+        if num % 10 == 0:
+            yield (subject, 'rdfs:label', 'synthetic label {}'.format(num), True)
+        else:
+            yield (subject, predicate, '{}:{}'.format(
+                OBJECTS[(num // 3) % len(OBJECTS)], (num * 104729) % subjects), False)
+
+
+def _emit_case(graph, scale, finish=None):
+    triples = list(synthetic_triples(scale))
+
+    def run():
+        for triple in triples:
+            graph.addTriple(*triple)
+        count_rows(len(triples))
+    return Case(run, graph, finish)
+
+
+def emit_rdf_graph(graph_type, scale):
+    return _emit_case(RDFGraph(True, 'bench'), scale)
+
+
+def emit_compact_graph(graph_type, scale):
+    return _emit_case(CompactGraph(True, 'bench'), scale)
+
+
+def emit_sqlite_graph(graph_type, scale):
+    graph = SQLiteGraph(True, 'bench', 'out/bench.sqlite')
+    return _emit_case(graph, scale, graph.close)
+
+
+def emit_streamed_graph(graph_type, scale):
+    graph = StreamedGraph(True, 'bench', StreamedGraph.open('out/bench.nt'))
+    return _emit_case(graph, scale, graph.close)
+
+
+def curie(graph_type, scale):
+    curie_util = CurieUtil(curie_map.get())
+    prefixes = sorted(pfx for pfx in curie_map.get() if pfx != '')
+    curies = [
+        '{}:{}'.format(prefixes[num % len(prefixes)], num) for num in range(scale * 10)]
+    iris = [iri for iri in map(curie_util.get_uri, curies) if iri is not None]
+    iris += ['http://example.org/unknown/{}'.format(num) for num in range(scale)]
+
+    def run():
+        for iri in iris:
+            curie_util.get_curie(iri)
+        for text in curies:
+            curie_util.get_uri(text)
+        count_rows(len(iris) + len(curies))
+    return Case(run)
+
+
+def _write_case(fileformat, scale):
+    graph = RDFGraph(True, 'bench')
+    graph.addTriples(synthetic_triples(scale))
+    filename = 'out/bench.' + fileformat
+
+    def run():
+        GraphUtils.write(graph, fileformat, filename)
+        count_rows(len(graph))
+    return Case(run)
+
+
+def write_turtle(graph_type, scale):
+    return _write_case('turtle', scale)
+
+
+def write_nt(graph_type, scale):
+    return _write_case('nt', scale)
+
+
+# name -> (ingest whose fixtures it reads or None, maker of its Case)
+BENCHMARKS = {
+    'parse-ncbigene': ('ncbigene', parse_ncbigene),
+    'parse-go': ('go', parse_go),
+    'parse-panther': ('panther', parse_panther),
+    'parse-mgi': ('mgi', parse_mgi),
+    'parse-clinvar': ('clinvarxml_alpha', parse_clinvar),
+    'parse-string': ('string', parse_string),
+    'parse-rgd': ('rgd', parse_rgd),
+    'emit-rdf_graph': (None, emit_rdf_graph),
+    'emit-compact_graph': (None, emit_compact_graph),
+    'emit-sqlite_graph': (None, emit_sqlite_graph),
+    'emit-streamed_graph': (None, emit_streamed_graph),
+    'curie': (None, curie),
+    'write-turtle': (None, write_turtle),
+    'write-nt': (None, write_nt),
+}
@@ -5,9 +5,15 @@ import logging
 import unittest
 import importlib
 import time
+import os
+import contextlib
+import traceback
+import concurrent.futures
 from tests.test_general import GeneralGraphTestCase
 # from dipper.utils.TestUtils import TestUtils
 from dipper.utils.GraphUtils import GraphUtils
+from dipper.sources.Source import Source
+from dipper.utils.FetchUtil import ContentStore
 
 logging.basicConfig()
 LOG = logging.getLogger(__name__)
@@ -66,7 +72,9 @@ def main():
         formatter_class=argparse.RawTextHelpFormatter)
     parser.add_argument(
         '-g', '--graph', type=str, default="rdf_graph",
-        help='graph type: rdf_graph, streamed_graph')
+        help='graph type: rdf_graph, compact_graph, sqlite_graph, streamed_graph\n'
+        'compact_graph holds large ingests in far less memory than rdf_graph\n'
+        'sqlite_graph keeps them on disk, in out/<source>.sqlite')
     parser.add_argument(
         '-s', '--sources', type=str, default='?',
         help='comma separated list of sources')
@@ -109,10 +117,47 @@ def main():
 
     parser.add_argument(
         '--dest_fmt',
-        help='serialization format: [turtle], nt, nquads, rdfxml, n3, raw', type=str)
+        help='serialization format: [turtle], nt, nquads, rdfxml, n3, raw\n'
+        'a streamed_graph is written as it is parsed, in nt unless given', type=str)
 
     parser.add_argument('-v', '--version', help='version of source', type=str)
 
+    parser.add_argument(
+        '--profile', action='store_true',
+        help='cProfile each stage, saving out/<source>_<stage>.pstats')
+    parser.add_argument(
+        '--trace-memory', dest='trace_memory', action='store_true',
+        help='record the peak memory and top allocating lines of each stage\n'
+        'in out/<source>_metrics.json (tracemalloc; slows the run)')
+
+    parser.add_argument(
+        '--compress', choices=('gzip', 'zstd'),
+        help='compress the output of a streamed_graph (zstd needs zstandard)')
+    parser.add_argument(
+        '--writer_thread', action='store_true',
+        help='write (and compress) a streamed_graph in a background thread')
+    parser.add_argument(
+        '--dedup', choices=('exact', 'bloom'),
+        help='drop repeated triples as a streamed_graph is written.\n'
+        'exact spills to disk if need be, bloom uses fixed memory but\n'
+        'loses about 1 in 1000 distinct triples')
+    parser.add_argument(
+        '--sort', action='store_true',
+        help='sort a streamed_graph once written, keeping one of each triple')
+
+    parser.add_argument(
+        '-j', '--jobs', type=int, default=1,
+        help='number of sources to run at once, each in its own process.\n'
+        'When greater than one, each source logs to <logdir>/<source>.log')
+    parser.add_argument(
+        '--shards', type=int, default=1,
+        help='processes parsing each large table of a source at once\n'
+        '(NCBIGene gene_info, IMPC) or its files (Panther);\n'
+        'the output is as one process makes it')
+    parser.add_argument(
+        '--logdir', type=str, default='out',
+        help='directory for the per source log files of a parallel run')
+
     args = parser.parse_args()
     tax_ids = None
     if args.taxon is not None:
@@ -180,6 +225,8 @@ def main():
             LOG.error("You have specified an invalid serializer: %s", args.dest_fmt)
 
             exit(0)
+    elif args.graph == 'streamed_graph':
+        args.dest_fmt = 'nt'
     else:
         args.dest_fmt = 'turtle'
 
@@ -192,88 +239,348 @@ def main():
         exit(0)
 
     # iterate through all the sources
-    for source in args.sources.split(','):
-        LOG.info("\n******* %s *******", source)
-        source = source.lower()
+    sources = [source.lower() for source in args.sources.split(',')]
+    source_args = {}
+    for source in sources:
         src = source_to_class_map[source]
-
-        # import source lib
-        module = "dipper.sources.{0}".format(src)
-        imported_module = importlib.import_module(module)
-        source_class = getattr(imported_module, src)
-        mysource = None
         # arg factory
-        source_args = dict(
+        source_args[source] = dict(
             graph_type=args.graph
         )
-        source_args['are_bnodes_skolemized'] = not args.use_bnodes
+        source_args[source]['are_bnodes_skolemized'] = not args.use_bnodes
 
         # args should be available to source supported (yet) or not
         if src in taxa_supported:
-            source_args['tax_ids'] = tax_ids
+            source_args[source]['tax_ids'] = tax_ids
         if args.version:
-            source_args['version'] = args.version
-
-        mysource = source_class(**source_args)
-        if args.parse_only is False:
-            start_fetch = time.perf_counter()
-            mysource.fetch(args.force)
-
-            end_fetch = time.perf_counter()
-            LOG.info("Fetching time: %d sec", end_fetch-start_fetch)
-
-        mysource.settestonly(args.test_only)
-
-        # run tests first
-        if (args.no_verify or args.skip_tests) is not True:
-            suite = mysource.getTestSuite()
-            if suite is None:
-                LOG.warning(
-                    "No tests configured for this source: %s", source)
+            source_args[source]['version'] = args.version
+
+    dag = build_dag(sources, source_to_class_map, args)
+    if args.jobs > 1:
+        results = run_dag(dag, source_to_class_map, source_args, args)
+        report_summary(results)
+        prune_raw(args)
+        if [res for res in results if res['status'] != 'ok']:
+            exit(1)
+    else:
+        for node in order_dag(dag):
+            if node in source_to_class_map:
+                run_source(
+                    node, source_to_class_map[node], source_args[node], args,
+                    fetched_upstream(dag[node], source_to_class_map))
             else:
-                unittest.TextTestRunner(verbosity=2).run(suite)
-        else:
-            LOG.info("Skipping Tests for source: %s", source)
-
-        if args.test_only is False and args.fetch_only is False:
-            start_parse = time.perf_counter()
-            mysource.parse(args.limit)
-
-            end_parse = time.perf_counter()
-            LOG.info("Parsing time: %d sec", end_parse-start_parse)
+                fetch_artifact(node, args)
+        prune_raw(args)
 
-            if args.graph == 'rdf_graph':
-                LOG.info("Found %d nodes", len(mysource.graph))
-
-                # Add property axioms
+    LOG.info("All done.")
 
-                start_axiom_exp = time.perf_counter()
-                LOG.info("Adding property axioms")
 
-                properties = GraphUtils.get_properties_from_graph(mysource.graph)
-                GraphUtils.add_property_axioms(mysource.graph, properties)
-                end_axiom_exp = time.clock()
-                LOG.info("Property axioms added: %d sec", end_axiom_exp-start_axiom_exp)
+def prune_raw(args):
+    """
+    Remove the content addressed copies of raw files replaced during this run.
+    Only once every source has fetched: a blob no raw file links to may be
+    about to be shared by a source still fetching the same contents.
+    """
+    if args.parse_only:     # nothing was fetched
+        return
+    removed = ContentStore(os.path.join('raw', ContentStore.DIRNAME)).prune()
+    LOG.info("Removed %i stored copies no raw file links to", removed)
+
+
+def run_source(source, src, source_args, args, fetched_artifacts=()):
+    """
+    fetch, (test), parse and write a single source
+    :param source: str  the lowercase source name given on the command line
+    :param src: str  the name of the Source class (and its module)
+    :param source_args: dict  arguments for the Source constructor
+    :param args: argparse.Namespace  the command line arguments
+    :param fetched_artifacts: 'SourceClass:file_key' already fetched this run
+    :return: dict of the seconds spent in each stage
+    """
+    LOG.info("\n******* %s *******", source)
+    timing = {}
+
+    # import source lib
+    module = "dipper.sources.{0}".format(src)
+    imported_module = importlib.import_module(module)
+    source_class = getattr(imported_module, src)
+    mysource = None
+
+    Source.stream_compression = args.compress
+    Source.stream_threaded = args.writer_thread
+    Source.stream_dedup = args.dedup
+    Source.stream_sort = args.sort
+    Source.stream_fmt = args.dest_fmt
+    Source.parse_shards = args.shards
+    mysource = source_class(**source_args)
+    mysource.fetched_artifacts.update(fetched_artifacts)
+    metrics = mysource.metrics
+    profile_dir = mysource.outdir if args.profile else None
+
+    def stage(name):
+        return metrics.stage(
+            name, mysource.graph, profile_dir, trace_memory=args.trace_memory)
+
+    if args.parse_only is False:
+        with stage('fetch'):
+            mysource.fetch(args.force)
 
-                start_write = time.perf_counter()
-                mysource.write(fmt=args.dest_fmt)
+    mysource.settestonly(args.test_only)
 
-                end_write = time.perf_counter()
-                LOG.info("Writing time: %d sec", end_write-start_write)
+    # run tests first
+    if (args.no_verify or args.skip_tests) is not True:
+        suite = mysource.getTestSuite()
+        if suite is None:
+            LOG.warning(
+                "No tests configured for this source: %s", source)
+        else:
+            unittest.TextTestRunner(verbosity=2).run(suite)
+    else:
+        LOG.info("Skipping Tests for source: %s", source)
 
-        # if args.no_verify is not True:
-        #    status = mysource.verify()
-        #    if status is not True:
-        #        LOG.error(
-        #            'Source %s did not pass verification tests.', source)
-        #        exit(1)
-        # else:
-        #    LOG.info('skipping verification step')
-        LOG.info('***** Finished with %s *****', source)
-    # load configuration parameters
-    # for example, keys
+    if args.test_only is False and args.fetch_only is False:
+        with stage('parse'):
+            mysource.parse(args.limit)
 
-    LOG.info("All done.")
+        if args.graph != 'streamed_graph':
+            LOG.info("Found %d nodes", len(mysource.graph))
+
+        # Add property axioms (to a streamed graph too, before it is closed)
+        LOG.info("Adding property axioms")
+        with stage('axioms'):
+            properties = GraphUtils.get_properties_from_graph(mysource.graph)
+            GraphUtils.add_property_axioms(mysource.graph, properties)
+
+        # a streamed graph is only flushed & closed here
+        with stage('write'):
+            mysource.write(fmt=args.dest_fmt)
+
+    for name, record in metrics.stages.items():
+        timing[name] = record['seconds']
+    metrics.write(
+        os.path.join(mysource.outdir, mysource.name + '_metrics.json'), mysource.graph)
+
+    # if args.no_verify is not True:
+    #    status = mysource.verify()
+    #    if status is not True:
+    #        LOG.error(
+    #            'Source %s did not pass verification tests.', source)
+    #        exit(1)
+    # else:
+    #    LOG.info('skipping verification step')
+    LOG.info('***** Finished with %s *****', source)
+
+    return timing
+
+
+def fetch_artifact(artifact, args):
+    """
+    fetch a file (shared by one or more of the sources) once for this run
+    :param artifact: str 'SourceClass:file_key'
+    :return: dict of the seconds spent fetching
+    """
+    LOG.info("\n******* %s *******", artifact)
+    start_fetch = time.perf_counter()
+    Source.fetch_artifact(artifact, args.force)
+    return {'fetch': time.perf_counter() - start_fetch}
+
+
+def run_job(node, logdir, func, *params):
+    """
+    Worker process entry point for `--jobs`.
+    Everything the job logs, prints or tests is redirected
+    to its own `<logdir>/<node>.log` so the parallel runs do not interleave.
+    Exceptions are caught and reported in the result rather than raised.
+
+    :param node: str  the source or artifact name
+    :param logdir: str  directory for the log file
+    :param func: callable  `run_source()` or `fetch_artifact()`
+    :param params: passed on to `func`
+    :return: dict with the node, its exit status, stage timings and log file
+    """
+    logfile = os.path.join(logdir, node.replace(':', '_') + '.log')
+    result = {
+        'source': node, 'status': 'ok', 'timing': {}, 'log': logfile}
+
+    start = time.perf_counter()
+    with open(logfile, 'w', buffering=1) as log_handle:
+        root_logger = logging.getLogger()
+        for handler in list(root_logger.handlers):
+            root_logger.removeHandler(handler)
+        handler = logging.StreamHandler(log_handle)
+        handler.setFormatter(logging.Formatter(
+            '%(asctime)s %(levelname)s %(name)s: %(message)s'))
+        root_logger.addHandler(handler)
+
+        with contextlib.redirect_stdout(log_handle), \
+                contextlib.redirect_stderr(log_handle):
+            try:
+                result['timing'] = func(node, *params)
+            except BaseException:    # report SystemExit from a source as well
+                LOG.error(
+                    'Job %s failed\n%s', node, traceback.format_exc())
+                result['status'] = 'failed'
+        handler.flush()
+
+    result['timing']['total'] = time.perf_counter() - start
+    return result
+
+
+def build_dag(sources, source_to_class_map, args):
+    """
+    Each requested source waits on the files it needs from other ingests
+    (its `Source.dependencies`).
+    When the ingest owning such a file is itself being run, its fetch
+    provides the file and the dependant source waits for that ingest instead;
+    otherwise the file is a node of its own, fetched once for all dependants.
+
+    :param sources: list of source names, as given on the command line
+    :return: dict of node -> set of the nodes it waits on
+    """
+    class_to_source = {
+        source_to_class_map[source]: source for source in sources}
+    dag = {}
+    for source in sources:
+        dag[source] = set()
+        if args.parse_only:     # nothing is fetched
+            continue
+        source_class = Source.get_source_class(source_to_class_map[source])
+        for artifact in source_class.get_artifacts():
+            owner = artifact.split(':')[0]
+            if owner in class_to_source and class_to_source[owner] != source:
+                dag[source].add(class_to_source[owner])
+            else:
+                dag.setdefault(artifact, set())
+                dag[source].add(artifact)
+
+    # fail early on circular declarations
+    order_dag(dag)
+    return dag
+
+
+def order_dag(dag):
+    """
+    Topological sort, otherwise keeping the order the nodes were given in
+    :return: list of nodes
+    """
+    ordered = []
+    remaining = dict(dag)
+    while remaining:
+        ready = [
+            node for node in remaining
+            if not remaining[node] - set(ordered)]
+        if not ready:
+            raise ValueError(
+                "Circular source dependencies among: {}".format(
+                    ', '.join(sorted(remaining))))
+        ordered.append(ready[0])
+        del remaining[ready[0]]
+    return ordered
+
+
+def fetched_upstream(waits_on, source_to_class_map):
+    """
+    The files a source does not fetch again, once the nodes it waits on have run:
+    the artifacts fetched on their own and every file of an upstream source
+    :param waits_on: set of the nodes (of `build_dag()`) the source waits on
+    :return: set of 'SourceClass:file_key'
+    """
+    fetched = set()
+    for dep in waits_on:
+        if dep in source_to_class_map:
+            src = source_to_class_map[dep]
+            fetched.update(
+                ':'.join((src, key)) for key in Source.get_source_class(src).files)
+        else:
+            fetched.add(dep)
+    return fetched
+
+
+def run_dag(dag, source_to_class_map, source_args, args):
+    """
+    Run each node of the dependency graph in its own worker process,
+    at most `args.jobs` at a time, starting each once everything it waits on
+    has finished.  Nodes waiting on a failure are skipped, as is every node
+    not yet started once a worker has died (the pool then takes no more jobs).
+
+    :return: list of the `run_job()` results, in dependency order
+    """
+    if not os.path.exists(args.logdir):
+        os.makedirs(args.logdir)
+
+    LOG.info(
+        "Running %i jobs with %i workers; logs in %s",
+        len(dag), args.jobs, os.path.abspath(args.logdir))
+
+    results = {}
+    pending = dict(dag)
+    running = {}
+    broken = None   # once a worker dies outright the pool takes no more jobs
+    with concurrent.futures.ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        while pending or running:
+            for node in [n for n in pending if pending[n] <= set(results)]:
+                waits_on = pending.pop(node)
+                failed = [dep for dep in waits_on if results[dep]['status'] != 'ok']
+                if failed:
+                    results[node] = {
+                        'source': node, 'status': 'skipped', 'timing': {},
+                        'log': '-'}
+                    LOG.error("Skipping %s, it needs %s", node, ', '.join(failed))
+                    continue
+                if broken is None:
+                    if node in source_to_class_map:
+                        job = (
+                            run_source, source_to_class_map[node], source_args[node],
+                            args, fetched_upstream(waits_on, source_to_class_map))
+                    else:
+                        job = (fetch_artifact, args)
+                    try:
+                        running[pool.submit(run_job, node, args.logdir, *job)] = node
+                        continue
+                    except concurrent.futures.process.BrokenProcessPool as err:
+                        broken = err
+                results[node] = {
+                    'source': node, 'status': 'skipped', 'timing': {}, 'log': '-'}
+                LOG.error("Skipping %s, the worker pool is broken: %s", node, broken)
+
+            if not running:
+                continue    # only skips were resolved; look again
+            done, _ = concurrent.futures.wait(
+                running, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                node = running.pop(future)
+                try:
+                    results[node] = future.result()
+                except concurrent.futures.process.BrokenProcessPool as err:
+                    # the worker died outright (i.e. out of memory)
+                    broken = err
+                    results[node] = {
+                        'source': node, 'status': 'crashed', 'timing': {},
+                        'log': os.path.join(
+                            args.logdir, node.replace(':', '_') + '.log')}
+                    LOG.error('Worker for %s died: %s', node, err)
+                LOG.info(
+                    "Finished %s: %s (%d sec)", node, results[node]['status'],
+                    results[node]['timing'].get('total', 0))
+
+    return [results[node] for node in order_dag(dag)]
+
+
+def report_summary(results):
+    """
+    Log a table of each source's stage timings and exit status
+    """
+    stages = ('fetch', 'parse', 'axioms', 'write', 'total')
+    lines = ['{:<24}{:<9}'.format('source', 'status') + ''.join(
+        '{:>9}'.format(stage) for stage in stages) + '  log']
+    for res in results:
+        lines.append(
+            '{:<24}{:<9}'.format(res['source'], res['status']) + ''.join(
+                '{:>9}'.format(
+                    '%d' % res['timing'][stage]
+                    if stage in res['timing'] else '-') for stage in stages) +
+            '  ' + res['log'])
+    LOG.info("Summary (sec):\n%s", '\n'.join(lines))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,161 @@
+import logging
+from array import array
+
+import numpy
+
+from dipper.graph.EncodedGraph import EncodedGraph
+
+LOG = logging.getLogger(__name__)
+
+# rows of triples read from the array at once
+WRITE_ROWS = 2 ** 16
+
+
+class CompactGraph(EncodedGraph):
+    """
+    An in memory graph for ingests too large for rdflib's IOMemory store.
+
+    Each distinct term is held once, as its N-Triples text, and numbered;
+    each triple is three of those numbers in a typed array (12 bytes)
+    rather than rdflib node objects and index dicts.
+
+    Repeated triples are dropped whenever the array has doubled in size
+    and before the graph is read.  The rdflib style queries used on a
+    graph (triples(), predicates(), subjects(), objects() ...) scan the
+    array with numpy; there is no index to maintain as triples are added.
+    serialize() writes nt, nquads and turtle itself;
+    other formats go through an rdflib graph.
+    """
+
+    def __init__(self, are_bnodes_skized=True, identifier=None):
+        super().__init__(are_bnodes_skized, identifier)
+        self.term_ids = {}          # N-Triples text of a term -> its number
+        self.terms = []             # number -> N-Triples text
+        self.spo = array('I')       # subject, predicate, object numbers
+        self.distinct = 0           # leading triples known to be distinct
+        self.compact_at = 3 * 2 ** 20
+
+    def _term_id(self, text):
+        term_id = self.term_ids.get(text)
+        if term_id is None:
+            term_id = self.term_ids[text] = len(self.terms)
+            self.terms.append(text)
+        return term_id
+
+    def _append(self, subject_text, predicate_text, obj_text):
+        self.spo.extend((
+            self._term_id(subject_text),
+            self._term_id(predicate_text),
+            self._term_id(obj_text)))
+        if len(self.spo) >= self.compact_at:
+            self._compact()
+
+    def _extend(self, rows):
+        """
+        :param rows: list of (subject, predicate, object) N-Triples texts
+        """
+        term_id = self._term_id
+        self.spo.extend([term_id(text) for row in rows for text in row])
+        if len(self.spo) >= self.compact_at:
+            self._compact()
+
+    def _rows(self):
+        # a numpy view of the array, to be dropped before the array grows
+        return numpy.frombuffer(self.spo, dtype=numpy.uintc).reshape(-1, 3)
+
+    def _compact(self):
+        """
+        drop repeated triples, leaving them sorted (so grouped by subject)
+        """
+        if len(self.spo) == 3 * self.distinct:
+            return
+        rows = numpy.unique(self._rows(), axis=0)
+        self.spo = array('I', rows.tobytes())
+        self.distinct = len(rows)
+        self.compact_at = 3 * max(2 * self.distinct, 2 ** 20)
+        LOG.debug("%i distinct triples of %i terms", self.distinct, len(self.terms))
+
+    def _match(self, subject=None, predicate=None, obj=None):
+        """
+        :return: (numpy view of every row, boolean mask of the rows matching
+                 the rdflib terms or None when all do)
+        """
+        self._compact()
+        rows = self._rows()
+        mask = None
+        for col, term in enumerate((subject, predicate, obj)):
+            if term is None:
+                continue
+            term_id = self.term_ids.get(self.encode(term))
+            if term_id is None:
+                return rows, numpy.zeros(len(rows), dtype=bool)
+            col_mask = rows[:, col] == term_id
+            mask = col_mask if mask is None else mask & col_mask
+        return rows, mask
+
+    def _select(self, subject=None, predicate=None, obj=None):
+        """
+        :return: numpy array of the [s, p, o] rows matching the rdflib terms
+        """
+        rows, mask = self._match(subject, predicate, obj)
+        if mask is None:
+            return rows.copy()
+        return rows[mask]
+
+    def _term(self, term_id):
+        return self._terms(self.terms[term_id])
+
+    # rdflib.Graph like methods, for GraphUtils and friends
+
+    def __len__(self):
+        self._compact()
+        return self.distinct
+
+    def __contains__(self, triple):
+        return len(self._select(*triple)) > 0
+
+    def remove(self, triple):
+        rows, mask = self._match(*triple)
+        if mask is None:
+            rows = rows[:0]
+        else:
+            rows = rows[~mask]
+        self.spo = array('I', rows.tobytes())
+        self.distinct = len(rows)
+
+    def triples(self, triple):
+        for row in self._select(*triple):
+            yield tuple(self._term(term_id) for term_id in row)
+
+    def subjects(self, predicate=None, obj=None):
+        for term_id in numpy.unique(self._select(None, predicate, obj)[:, 0]):
+            yield self._term(term_id)
+
+    def predicates(self, subject=None, obj=None):
+        for term_id in numpy.unique(self._select(subject, None, obj)[:, 1]):
+            yield self._term(term_id)
+
+    def objects(self, subject=None, predicate=None):
+        for term_id in numpy.unique(self._select(subject, predicate, None)[:, 2]):
+            yield self._term(term_id)
+
+    def predicate_objects(self, subject=None):
+        for row in self._select(subject, None, None):
+            yield self._term(row[1]), self._term(row[2])
+
+    def text_rows(self):
+        """
+        every triple as N-Triples text, sorted so a subject's are adjacent
+        """
+        self._compact()
+        terms = self.terms
+        rows = self._rows()
+        for start in range(0, len(rows), WRITE_ROWS):
+            for (subj, pred, obj) in rows[start:start + WRITE_ROWS].tolist():
+                yield terms[subj], terms[pred], terms[obj]
+
+    def term_texts(self):
+        """
+        the N-Triples text of every term
+        """
+        return iter(self.terms)
@@ -0,0 +1,210 @@
+import io
+import logging
+from collections import Counter
+from functools import lru_cache
+
+from rdflib import ConjunctiveGraph, Literal, URIRef
+from rdflib.util import from_n3
+
+from dipper.graph.Graph import Graph as DipperGraph
+from dipper.graph.RDFGraph import RDFGraph, BNODE_PREFIX
+from dipper.graph.StreamedGraph import StreamedGraph
+from dipper.utils.GraphUtils import GraphUtils
+
+LOG = logging.getLogger(__name__)
+
+
+class EncodedGraph(DipperGraph):
+    """
+    What CompactGraph and SQLiteGraph share: each term of a triple is
+    encoded as its N-Triples text, and a triple as the text of its three
+    terms, which a subclass stores as it will.
+
+    A subclass keeps the rows given to `_append()` and `_extend()`,
+    and gives them back from `text_rows()` (a subject's adjacent)
+    and its terms from `term_texts()`; serialize() writes from those.
+    """
+
+    curie_map = RDFGraph.curie_map
+    curie_util = RDFGraph.curie_util
+    globaltt = RDFGraph.globaltt
+    globaltcid = RDFGraph.globaltcid
+    node_cache_size = RDFGraph.node_cache_size
+
+    def __init__(self, are_bnodes_skized=True, identifier=None):
+        self.are_bnodes_skized = are_bnodes_skized
+        self.identifier = identifier
+        self._nodes = lru_cache(maxsize=self.node_cache_size)(self._makenode)
+        self._terms = lru_cache(maxsize=self.node_cache_size)(from_n3)
+        self.properties = Counter()     # triples added per predicate
+
+    def addTriple(
+            self, subject_id, predicate_id, obj, object_is_literal=None,
+            literal_type=None):
+        row = self._text_row(
+            subject_id, predicate_id, obj, object_is_literal, literal_type)
+        if row is not None:
+            self.properties[row[1]] += 1
+            self._append(*row)
+
+    def addTriples(self, triples):
+        """
+        Encode every triple then add them in one batch
+        :param triples: iterable of tuples of the addTriple arguments
+        """
+        rows = [
+            row for row in (self._text_row(*triple) for triple in triples)
+            if row is not None]
+        self.properties.update(row[1] for row in rows)
+        self._extend(rows)
+
+    def _text_row(
+            self, subject_id, predicate_id, obj, object_is_literal=None,
+            literal_type=None):
+        """
+        :return: tuple  N-Triples text of the subject, predicate and object
+                 of the addTriple arguments, or None
+        """
+        # trying making infrence on type of object if none is supplied
+        if object_is_literal is None:
+            if self.curie_regexp.match(obj) is not None or\
+                    obj.split(':')[0].lower() in ('http', 'https', 'ftp'):
+                object_is_literal = False
+            else:
+                object_is_literal = True
+
+        if object_is_literal is True:
+            if obj is None:
+                LOG.warning(
+                    "None as literal object for subj: %s and pred: %s",
+                    subject_id, predicate_id)
+                return None
+            obj_text = self._literal(obj, literal_type)
+        elif obj is not None and obj != '':  # object is a resourse
+            obj_text = self._getnode(obj)
+        else:
+            LOG.warning(
+                "None/empty object IRI for subj: %s and pred: %s",
+                subject_id, predicate_id)
+            return None
+
+        subject_text = self._getnode(subject_id)
+        predicate_text = self._getnode(predicate_id)
+        if None in (subject_text, predicate_text, obj_text):
+            return None
+        return subject_text, predicate_text, obj_text
+
+    def skolemizeBlankNode(self, curie):
+        return RDFGraph.skolemizeBlankNode(self, curie)
+
+    def _getnode(self, curie):
+        """
+        :param curie: str identifier formatted as curie or iri
+        :return: str  the N-Triples text of the IRI or blank node
+        """
+        return self._nodes(curie)
+
+    def _makenode(self, curie):
+        if curie[0] == '_':
+            if self.are_bnodes_skized is True:
+                return '<{}>'.format(self.skolemizeBlankNode(curie))
+            return '_:' + BNODE_PREFIX.sub('', curie, 1)
+
+        # Check if curie string is actually an IRI
+        if curie[:4] == 'http' or curie[:3] == 'ftp':
+            return '<{}>'.format(curie)
+        iri = self.curie_util.get_uri(curie)
+        if iri is None:
+            LOG.error("couldn't make URI for %s", curie)
+            return None
+        return '<{}>'.format(iri)
+
+    def _literal(self, obj, literal_type):
+        if literal_type is None and isinstance(obj, str):
+            return StreamedGraph._quote_encode(obj)
+        datatype = None
+        if literal_type is not None:
+            datatype = self._getnode(literal_type)[1:-1]
+        # as rdflib would type (and normalize) it
+        return self.encode(Literal(obj, datatype=datatype))
+
+    @staticmethod
+    def encode(term):
+        """
+        :param term: rdflib URIRef, BNode or Literal
+        :return: str  N-Triples text of the term
+        """
+        return GraphUtils.get_nt_term(term)
+
+    def _append(self, subject_text, predicate_text, obj_text):
+        raise NotImplementedError
+
+    def _extend(self, rows):
+        """
+        :param rows: list of (subject, predicate, object) N-Triples texts
+        """
+        raise NotImplementedError
+
+    def __iter__(self):
+        return self.triples((None, None, None))
+
+    def add(self, triple):
+        self._append(*(self.encode(term) for term in triple))
+
+    def serialize(
+            self, destination=None, format='turtle', base=None, encoding=None):
+        """
+        :param destination: a binary file handle, a path,
+                            or None to return the serialization as bytes
+        :param format: nt, nquads, turtle; or any rdflib serializer
+        :return: bytes if there is no destination
+        """
+        if format not in ('nt', 'ntriples', 'nquads', 'turtle', 'ttl'):
+            LOG.warning("Copying to an rdflib graph to write %s", format)
+            graph = ConjunctiveGraph()
+            for triple in self.triples((None, None, None)):
+                graph.add(triple)
+            return graph.serialize(destination, format=format)
+
+        if destination is None:
+            stream = io.BytesIO()
+            self._write(stream, format)
+            return stream.getvalue()
+        if isinstance(destination, str):
+            with open(destination, 'wb') as stream:
+                self._write(stream, format)
+        else:
+            self._write(destination, format)
+        return None
+
+    def _write(self, stream, fmt):
+        GraphUtils.write_triples(
+            stream, fmt, self.text_rows(), dict(self.namespaces()),
+            GraphUtils.get_graph_iri(self))
+
+    def text_rows(self):
+        """
+        every triple as N-Triples text, sorted so a subject's are adjacent
+        """
+        raise NotImplementedError
+
+    def term_texts(self):
+        """
+        the N-Triples text of every term
+        """
+        raise NotImplementedError
+
+    def namespaces(self):
+        """
+        As rdflib's, the (prefix, namespace) of each curie_map prefix in use
+        """
+        prefixes = set()
+        for text in self.term_texts():
+            if text[0] == '<':
+                prefixes.add(self.curie_util.get_curie_prefix(text[1:-1]))
+            elif text[-1] == '>':   # datatype
+                prefixes.add(self.curie_util.get_curie_prefix(
+                    text[text.rfind('^^<') + 3:-1]))
+        prefixes.discard(None)
+        for prefix in sorted(prefixes):
+            yield prefix, URIRef(self.curie_map[prefix])
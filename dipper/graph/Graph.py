@@ -1,6 +1,8 @@
 from abc import ABCMeta, abstractmethod
 import re
 
+from rdflib import URIRef
+
 
 class Graph(metaclass=ABCMeta):
 
@@ -30,3 +32,37 @@ class Graph(metaclass=ABCMeta):
     @abstractmethod
     def serialize(self, **kwargs):
         pass
+
+    def addTriples(self, triples):
+        """
+        Add many triples at once; graphs which can insert (or write) in bulk
+        override this to pay their per call costs once per batch.
+
+        :param triples: iterable of tuples of the addTriple arguments
+                        (subject_id, predicate_id, object_id
+                        [, object_is_literal [, literal_type]])
+        :return: None
+        """
+        for triple in triples:
+            self.addTriple(*triple)
+
+    def get_properties(self):
+        """
+        The predicates of the triples added with addTriple(s); a graph counts
+        them in self.properties (a Counter) keyed by their N-Triples text.
+
+        :return: set of rdflib URIRef
+        """
+        return {URIRef(text[1:-1]) for text in self.properties}
+
+    def get_property_counts(self):
+        """
+        :return: dict  predicate IRI -> count of triples added with it
+        """
+        return {text[1:-1]: count for (text, count) in self.properties.items()}
+
+    def get_triple_count(self):
+        """
+        :return: int  count of triples added with addTriple(s), repeats included
+        """
+        return sum(self.properties.values())
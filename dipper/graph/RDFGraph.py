@@ -1,17 +1,21 @@
 import re
 import logging
 import sys
-import os
+from collections import Counter
+from functools import lru_cache
 
-import yaml
 from rdflib import ConjunctiveGraph, Literal, URIRef, BNode, Namespace
 
 from dipper.graph.Graph import Graph as DipperGraph
 from dipper.utils.CurieUtil import CurieUtil
+from dipper.utils.TranslationUtil import get_globaltt
 from dipper import curie_map as curie_map_class
 
 LOG = logging.getLogger(__name__)
 
+# leading '_:' or '_' of a blank node curie
+BNODE_PREFIX = re.compile(r'^_:|^_')
+
 
 class RDFGraph(DipperGraph, ConjunctiveGraph):
     """
@@ -24,12 +28,13 @@ class RDFGraph(DipperGraph, ConjunctiveGraph):
     curie_map = curie_map_class.get()
     curie_util = CurieUtil(curie_map)
 
+    # most recently used curie -> node objects kept per graph;
+    # the same predicates and classes recur on most every triple
+    node_cache_size = 2 ** 16
+
     # make global translation table available outside the ingest
-    with open(
-            os.path.join(os.path.dirname(__file__),
-                         '../../translationtable/GLOBAL_TERMS.yaml')) as fhandle:
-        globaltt = yaml.safe_load(fhandle)
-        globaltcid = {v: k for k, v in globaltt.items()}
+    globaltt = get_globaltt()
+    globaltcid = {v: k for k, v in globaltt.items()}
 
     def __init__(self, are_bnodes_skized=True, identifier=None):
         # print("in RDFGraph  with id: ", identifier)
@@ -41,12 +46,45 @@ class RDFGraph(DipperGraph, ConjunctiveGraph):
         for pfx in ('OBO',):  # , 'ORPHA'):
             self.bind(pfx, Namespace(self.curie_map[pfx]))
 
+        self.bound_prefixes = {
+            pfx for (pfx, ns) in self.namespace_manager.namespaces()}
+        # per instance as blank nodes depend on are_bnodes_skized
+        self._nodes = lru_cache(maxsize=self.node_cache_size)(self._makenode)
+        self.properties = Counter()     # triples added per predicate node
+
         # try adding them all
         # self.bind_all_namespaces()  # too much
 
     def addTriple(
             self, subject_id, predicate_id, obj, object_is_literal=None,
             literal_type=None):
+        triple = self._make_triple(
+            subject_id, predicate_id, obj, object_is_literal, literal_type)
+        if triple is not None:
+            self.add(triple)
+            self.properties[triple[1]] += 1
+        return
+
+    def addTriples(self, triples):
+        """
+        Make the nodes of every triple then insert them in one batch
+        :param triples: iterable of tuples of the addTriple arguments
+        """
+        quads = []
+        for args in triples:
+            triple = self._make_triple(*args)
+            if triple is not None:
+                quads.append(triple + (self.default_context,))
+        self.properties.update(quad[1] for quad in quads)
+        self.addN(quads)
+
+    def _make_triple(
+            self, subject_id, predicate_id, obj, object_is_literal=None,
+            literal_type=None):
+        """
+        :return: tuple  rdflib (subject, predicate, object) of the addTriple
+                 arguments, or None
+        """
         # trying making infrence on type of object if none is supplied
         if object_is_literal is None:
             if self.curie_regexp.match(obj) is not None or\
@@ -58,38 +96,43 @@ class RDFGraph(DipperGraph, ConjunctiveGraph):
         if object_is_literal is True:
             if literal_type is not None and obj is not None:
                 literal_type_iri = self._getnode(literal_type)
-                self.add(
-                    (self._getnode(subject_id), self._getnode(predicate_id),
-                     Literal(obj, datatype=literal_type_iri)))
-            elif obj is not None:
-                self.add((
+                return (
                     self._getnode(subject_id), self._getnode(predicate_id),
-                    Literal(obj)))
-            else:
+                    Literal(obj, datatype=literal_type_iri))
+            if obj is not None:
+                return (
+                    self._getnode(subject_id), self._getnode(predicate_id),
+                    Literal(obj))
+            LOG.warning(
+                "None as literal object for subj: %s and pred: %s",
+                subject_id, predicate_id)
+            # get a sense of where the None is comming from
+            # magic number here is "steps up the call stack"
+            for call in range(3, 1, -1):
                 LOG.warning(
-                    "None as literal object for subj: %s and pred: %s",
-                    subject_id, predicate_id)
-                # get a sense of where the None is comming from
-                # magic number here is "steps up the call stack"
-                for call in range(2, 0, -1):
-                    LOG.warning(
-                        '\t%sfrom: %s', '\t' * call, sys._getframe(call).f_code.co_name)
+                    '\t%sfrom: %s', '\t' * call, sys._getframe(call).f_code.co_name)
 
         elif obj is not None and obj != '':  # object is a resourse
-            self.add((
+            return (
                 self._getnode(subject_id),
                 self._getnode(predicate_id),
-                self._getnode(obj)))
+                self._getnode(obj))
         else:
             LOG.warning(
                 "None/empty object IRI for subj: %s and pred: %s",
                 subject_id, predicate_id)
-        return
+        return None
+
+    def get_properties(self):
+        return set(self.properties)
+
+    def get_property_counts(self):
+        return {str(node): count for (node, count) in self.properties.items()}
 
     def skolemizeBlankNode(self, curie):
-        stripped_id = re.sub(r'^_:|^_', '', curie, 1)
+        stripped_id = BNODE_PREFIX.sub('', curie, 1)
         node = BNode(stripped_id).skolemize(self.curie_util.get_base())
-        node = re.sub(r'rdflib/', '', node)  # remove string added by rdflib
+        node = node.replace('rdflib/', '')  # remove string added by rdflib
         return URIRef(node)
 
     def _getnode(self, curie):  # convention is lowercase names
@@ -102,15 +145,20 @@ class RDFGraph(DipperGraph, ConjunctiveGraph):
         Alternatively, self.skolemize_blank_node is True,
         it will skolemize the blank node
 
+        Nodes are cached, so the same object is returned for a recurring curie.
+
         :param curie: str identifier formatted as curie or iri
         :return: node: RDFLib URIRef or BNode object
         """
+        return self._nodes(curie)
+
+    def _makenode(self, curie):
         node = None
         if curie[0] == '_':
             if self.are_bnodes_skized is True:
                 node = self.skolemizeBlankNode(curie)
             else:  # delete the leading underscore to make it cleaner
-                node = BNode(re.sub(r'^_:|^_', '', curie, 1))
+                node = BNode(BNODE_PREFIX.sub('', curie, 1))
 
         # Check if curie string is actually an IRI
         elif curie[:4] == 'http' or curie[:3] == 'ftp':
@@ -118,12 +166,13 @@ class RDFGraph(DipperGraph, ConjunctiveGraph):
         else:
             iri = RDFGraph.curie_util.get_uri(curie)
             if iri is not None:
-                node = URIRef(RDFGraph.curie_util.get_uri(curie))
+                node = URIRef(iri)
                 # Bind prefix map to graph
                 prefix = curie.split(':')[0]
-                if prefix not in self.namespace_manager.namespaces():
+                if prefix not in self.bound_prefixes:
                     mapped_iri = self.curie_map[prefix]
                     self.bind(prefix, Namespace(mapped_iri))
+                    self.bound_prefixes.add(prefix)
             else:
                 LOG.error("couldn't make URI for %s", curie)
         return node
@@ -136,6 +185,7 @@ class RDFGraph(DipperGraph, ConjunctiveGraph):
         for prefix in self.curie_map.keys():
             iri = self.curie_map[prefix]
             self.bind(prefix, Namespace(iri))
+        self.bound_prefixes.update(self.curie_map.keys())
         return
 
     # serialize() conflicts between rdflib & Graph.serialize abstractmethod
@@ -0,0 +1,184 @@
+import os
+import logging
+import sqlite3
+
+from dipper.graph.EncodedGraph import EncodedGraph
+
+LOG = logging.getLogger(__name__)
+
+# triples gathered in memory per insert transaction
+BATCH_SIZE = 2 ** 16
+
+
+class SQLiteGraph(EncodedGraph):
+    """
+    A graph kept in an SQLite file, for ingests larger than memory.
+
+    Terms are encoded as in CompactGraph: each distinct term is one row
+    of its N-Triples text, and a triple is a row of three term ids whose
+    primary key keeps them distinct and grouped by subject.
+    Triples are inserted a batch per transaction. Indexes on predicate and
+    object are only made once the graph is queried by them.
+
+    The graph is built in a file of its own beside dbfile, which replaces
+    dbfile once the graph is closed; until then an earlier dbfile is left
+    as it was.
+    """
+
+    def __init__(self, are_bnodes_skized=True, identifier=None, dbfile=None):
+        super().__init__(are_bnodes_skized, identifier)
+        self.dbfile = dbfile
+        if dbfile is None:
+            self.tmpfile = ':memory:'
+        else:
+            # of this process alone; another may be building the same graph
+            self.tmpfile = '{}.{}.tmp'.format(dbfile, os.getpid())
+            if os.path.exists(self.tmpfile):
+                os.remove(self.tmpfile)
+        self.dbconn = sqlite3.connect(self.tmpfile)
+        self.dbconn.execute('PRAGMA journal_mode = OFF')
+        self.dbconn.execute('PRAGMA synchronous = OFF')
+        self.dbconn.execute('PRAGMA cache_size = -65536')   # KiB
+        self.dbconn.execute(
+            'CREATE TABLE terms (id INTEGER PRIMARY KEY, text TEXT UNIQUE NOT NULL)')
+        self.dbconn.execute(
+            'CREATE TABLE triples (s INTEGER, p INTEGER, o INTEGER, '
+            'PRIMARY KEY (s, p, o)) WITHOUT ROWID')
+        self.batch = []
+        self.is_indexed = False
+
+    def _append(self, subject_text, predicate_text, obj_text):
+        self.batch.append((subject_text, predicate_text, obj_text))
+        if len(self.batch) >= BATCH_SIZE:
+            self.commit()
+
+    def _extend(self, rows):
+        self.batch.extend(rows)
+        if len(self.batch) >= BATCH_SIZE:
+            self.commit()
+
+    def commit(self):
+        """
+        Insert the triples added since the last commit
+        """
+        if not self.batch:
+            return
+        with self.dbconn:
+            self.dbconn.executemany(
+                'INSERT OR IGNORE INTO terms (text) VALUES (?)',
+                ((text,) for text in {text for row in self.batch for text in row}))
+            self.dbconn.executemany(
+                'INSERT OR IGNORE INTO triples '
+                'SELECT s.id, p.id, o.id FROM terms s, terms p, terms o '
+                'WHERE s.text = ? AND p.text = ? AND o.text = ?', self.batch)
+        self.batch = []
+
+    def close(self):
+        """
+        Commit and close the database file, then put it in place of dbfile
+        """
+        if self.dbconn is not None:
+            self.commit()
+            self.dbconn.close()
+            self.dbconn = None
+            if self.dbfile is not None:
+                LOG.info("Writing %s", self.dbfile)
+                os.replace(self.tmpfile, self.dbfile)
+
+    def _ids(self, triple):
+        """
+        :return: list of the term id (or None) of each rdflib term (or None),
+                 or None if a term is not in the graph
+        """
+        ids = []
+        for term in triple:
+            if term is None:
+                ids.append(None)
+                continue
+            row = self.dbconn.execute(
+                'SELECT id FROM terms WHERE text = ?', (self.encode(term),)).fetchone()
+            if row is None:
+                return None
+            ids.append(row[0])
+        return ids
+
+    def _where(self, triple):
+        """
+        :return: (sql WHERE clause, its parameters) matching the triple pattern,
+                 or None if it can not match
+        """
+        self.commit()
+        ids = self._ids(triple)
+        if ids is None:
+            return None
+        if ids[0] is None and not self.is_indexed and ids != [None, None, None]:
+            LOG.info("Indexing triples by predicate and object")
+            self.dbconn.execute('CREATE INDEX triples_po ON triples (p, o, s)')
+            self.dbconn.execute('CREATE INDEX triples_os ON triples (o, s, p)')
+            self.is_indexed = True
+        clauses = [col + ' = ?' for col, term_id in zip('spo', ids) if term_id is not None]
+        if not clauses:
+            return '', []
+        return ' WHERE ' + ' AND '.join(clauses), [
+            term_id for term_id in ids if term_id is not None]
+
+    def _distinct(self, col, triple):
+        where = self._where(triple)
+        if where is None:
+            return []
+        return [self._terms(row[0]) for row in self.dbconn.execute(
+            'SELECT text FROM terms WHERE id IN '
+            '(SELECT DISTINCT {} FROM triples{})'.format(col, where[0]), where[1])]
+
+    def _select_text(self, triple):
+        where = self._where(triple)
+        if where is None:
+            return iter(())
+        # ordered by the primary key, so a subject's triples are adjacent
+        return self.dbconn.execute(
+            'SELECT (SELECT text FROM terms WHERE id = s), '
+            '(SELECT text FROM terms WHERE id = p), '
+            '(SELECT text FROM terms WHERE id = o) '
+            'FROM triples{} ORDER BY s, p, o'.format(where[0]), where[1])
+
+    # rdflib.Graph like methods, for GraphUtils and friends
+
+    def __len__(self):
+        self.commit()
+        return self.dbconn.execute('SELECT count(*) FROM triples').fetchone()[0]
+
+    def __contains__(self, triple):
+        where = self._where(triple)
+        return where is not None and self.dbconn.execute(
+            'SELECT 1 FROM triples{} LIMIT 1'.format(where[0]), where[1]
+        ).fetchone() is not None
+
+    def remove(self, triple):
+        where = self._where(triple)
+        if where is not None:
+            with self.dbconn:
+                self.dbconn.execute('DELETE FROM triples' + where[0], where[1])
+
+    def triples(self, triple):
+        for row in self._select_text(triple):
+            yield tuple(self._terms(text) for text in row)
+
+    def subjects(self, predicate=None, obj=None):
+        return iter(self._distinct('s', (None, predicate, obj)))
+
+    def predicates(self, subject=None, obj=None):
+        return iter(self._distinct('p', (subject, None, obj)))
+
+    def objects(self, subject=None, predicate=None):
+        return iter(self._distinct('o', (subject, predicate, None)))
+
+    def predicate_objects(self, subject=None):
+        for (subj, pred, obj) in self.triples((subject, None, None)):
+            yield pred, obj
+
+    def text_rows(self):
+        return self._select_text((None, None, None))
+
+    def term_texts(self):
+        self.commit()
+        return (row[0] for row in self.dbconn.execute('SELECT text FROM terms'))
@@ -0,0 +1,53 @@
+import logging
+from collections import Counter
+
+from dipper.graph.Graph import Graph as DipperGraph
+from dipper.graph.RDFGraph import RDFGraph
+
+LOG = logging.getLogger(__name__)
+
+
+class ShardGraph(DipperGraph):
+    """
+    Records the addTriple arguments of the rows an ingest parses in a
+    worker process, to be added to the ingest's own graph (of any type)
+    in its own process, shard after shard in the order of the file.
+
+    Nothing is made of the arguments here, so the identifiers of the
+    triples (skolemized blank nodes, make_id digests) are those a single
+    process would make.
+    """
+
+    curie_map = RDFGraph.curie_map
+    curie_util = RDFGraph.curie_util
+    globaltt = RDFGraph.globaltt
+    globaltcid = RDFGraph.globaltcid
+
+    def __init__(self, are_bnodes_skized=True, identifier=None):
+        self.are_bnodes_skized = are_bnodes_skized
+        self.identifier = identifier
+        self.records = []           # addTriple arguments, in the order given
+        self.properties = Counter()
+
+    def __len__(self):
+        return len(self.records)
+
+    def addTriple(
+            self, subject_id, predicate_id, obj, object_is_literal=None,
+            literal_type=None):
+        self.records.append(
+            (subject_id, predicate_id, obj, object_is_literal, literal_type))
+
+    def addTriples(self, triples):
+        self.records.extend(tuple(triple) for triple in triples)
+
+    def skolemizeBlankNode(self, curie):
+        return RDFGraph.skolemizeBlankNode(self, curie)
+
+    def serialize(self, *args, **kwargs):
+        """
+        The recorded triples, as an RDFGraph of them serializes
+        """
+        graph = RDFGraph(self.are_bnodes_skized, self.identifier)
+        graph.addTriples(self.records)
+        return graph.serialize(*args, **kwargs)
@@ -1,50 +1,221 @@
 import logging
 import re
-import yaml
-import os
+import io
+import gzip
+import queue
+import threading
+from collections import Counter
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 from dipper.graph.Graph import Graph as DipperGraph
+from dipper.graph.RDFGraph import RDFGraph
 from dipper.utils.CurieUtil import CurieUtil
+from dipper.utils.DedupUtil import digest, DigestSet, BloomFilter
+from dipper.utils.SerializeUtil import TripleSerializer
+from dipper.utils.TranslationUtil import get_globaltt
 from dipper import curie_map as curimap
 
 LOG = logging.getLogger(__name__)
 
+# bytes gathered in memory between writes to the (compressed) file
+BUFFER_SIZE = 2 ** 22
+# formatted triples handed to the file (or writer thread) at once
+BATCH_SIZE = 2 ** 12
+
 
 class StreamedGraph(DipperGraph):
     """
     Stream rdf triples to file or stdout
-    Assumes a downstream process will sort then uniquify triples
+    Assumes a downstream process will sort then uniquify triples,
+    unless they are de-duplicated as they are written:
+      dedup='exact'  remembers a digest of each triple, spilling to disk
+                     when there are too many to keep in memory
+      dedup='bloom'  fixed memory, but drops about 1 in 1000 distinct
+                     triples as false positives
 
-    Theoretically could support both ntriple, rdfxml formats, for now
-    just support nt
+    fmt='nt' writes N-Triples, 'nquads' puts every triple in the graph
+    named by the identifier; 'turtle' (or 'n3') and 'rdfxml' group each run
+    of triples about the same subject, as Model and Assoc add them,
+    but a subject recurs wherever the source mentions it again.
+
+    Triples are written in batches through a large buffer, optionally
+    compressed (see `StreamedGraph.open`), and optionally by a background
+    thread so compression overlaps with parsing.
+    `flush()` and `close()` must be called for the output to be complete.
     """
 
+    # file name suffix for each compression
+    compression_ext = {'gzip': '.gz', 'zstd': '.zst'}
+
     curie_map = curimap.get()
     curie_util = CurieUtil(curie_map)
 
-    with open(
-            os.path.join(os.path.dirname(__file__),
-                         '../../translationtable/GLOBAL_TERMS.yaml')) as fhandle:
-        globaltt = yaml.safe_load(fhandle).copy()
-        globaltcid = {v: k for k, v in globaltt.items()}
+    globaltt = get_globaltt().copy()
+    globaltcid = {v: k for k, v in globaltt.items()}
 
     def __init__(
-            self, are_bnodes_skized=True, identifier=None, file_handle=None, fmt='nt'):
+            self, are_bnodes_skized=True, identifier=None, file_handle=None, fmt='nt',
+            threaded=False, dedup=None):
         self.are_bnodes_skized = are_bnodes_skized
         self.fmt = fmt
         self.file_handle = file_handle
         self.identifier = identifier
+        self.serializer = TripleSerializer(fmt, self.curie_map, self.get_graph_iri())
+        self.is_finished = False
+        self.properties = Counter()     # triples written per predicate
+
+        self.batch = []
+        self.writer = None
+        self.writer_error = None
+        if threaded and file_handle is not None:
+            self.batches = queue.Queue(maxsize=16)
+            self.writer = threading.Thread(target=self._write_batches, daemon=True)
+            self.writer.start()
+
+        if dedup is None:
+            self.seen = None
+        elif dedup == 'exact':
+            self.seen = DigestSet()
+        elif dedup == 'bloom':
+            self.seen = BloomFilter()
+        else:
+            raise ValueError("{} dedup not supported, use exact or bloom".format(dedup))
+        self.duplicates = 0
+        self._output(self.serializer.header())
+
+    @classmethod
+    def open(cls, filename, compression=None, buffer_size=BUFFER_SIZE):
+        """
+        Open a text file to stream triples to
+        :param filename: str
+        :param compression: None, 'gzip' or 'zstd' (needs the zstandard package)
+        :param buffer_size: int bytes written to disk (or compressor) at once
+        :return: file handle
+        """
+        if compression is None:
+            return open(filename, 'w', buffering=buffer_size, encoding='utf-8')
+        if compression == 'gzip':
+            raw = gzip.GzipFile(filename, 'wb', compresslevel=6)
+        elif compression == 'zstd':
+            if zstandard is None:
+                raise ImportError("zstd compression needs the zstandard package")
+            raw = zstandard.ZstdCompressor().stream_writer(open(filename, 'wb'))
+        else:
+            raise ValueError(
+                "{} compression not supported, use one of {}".format(
+                    compression, ', '.join(cls.compression_ext)))
+        return io.TextIOWrapper(
+            io.BufferedWriter(raw, buffer_size), encoding='utf-8')
+
+    def get_graph_iri(self):
+        """
+        :return: str  the IRI of the identifier, naming the graph in nquads
+        """
+        if self.identifier is None:
+            return None
+        if re.match(r'^http|^ftp', self.identifier) or ':' not in self.identifier:
+            return self.identifier
+        return self.curie_util.get_uri(self.identifier)
+
+    def flush(self):
+        """
+        Write out every triple added so far
+        """
+        self._write_batch()
+        if self.writer is not None:
+            self.batches.join()
+            self._raise_writer_error()
+        if self.file_handle is not None and not self.file_handle.closed:
+            self.file_handle.flush()
+
+    def close(self):
+        """
+        Flush then close the output file (stdout is left open)
+        """
+        if not self.is_finished:
+            self.is_finished = True
+            self._output(self.serializer.footer())
+        self._write_batch()
+        if self.writer is not None:
+            self.batches.put(None)
+            self.writer.join()
+            self.writer = None
+            self._raise_writer_error()
+        if self.file_handle is not None and not self.file_handle.closed:
+            self.file_handle.close()
+        if self.seen is not None:
+            LOG.info(
+                "Wrote %i distinct triples, dropped %i duplicates",
+                len(self.seen), self.duplicates)
+            self.seen.close()
+            self.seen = None
+
+    def _write_batch(self):
+        if not self.batch:
+            return
+        lines = ''.join(self.batch)
+        self.batch = []
+        if self.writer is not None:
+            self._raise_writer_error()
+            self.batches.put(lines)
+        else:
+            self.file_handle.write(lines)
+
+    def _write_batches(self):
+        while True:
+            lines = self.batches.get()
+            try:
+                if lines is None:
+                    break
+                if self.writer_error is None:
+                    self.file_handle.write(lines)
+            except Exception as err:  # raised again from the parsing thread
+                self.writer_error = err
+            finally:
+                self.batches.task_done()
+
+    def _raise_writer_error(self):
+        if self.writer_error is not None:
+            err = self.writer_error
+            self.writer_error = None
+            raise IOError("writing triples failed") from err
 
     def addTriple(
             self, subject_id, predicate_id, obj, object_is_literal=None,
             literal_type=None):
+        triple = self._format_triple(
+            subject_id, predicate_id, obj, object_is_literal, literal_type)
+        if triple is not None:
+            self._emit((triple,))
+        return
+
+    def addTriples(self, triples):
+        """
+        Format every triple then hand them to the output as one batch
+        :param triples: iterable of tuples of the addTriple arguments
+        """
+        self._emit([
+            row for row in (self._format_triple(*triple) for triple in triples)
+            if row is not None])
+
+    def _format_triple(
+            self, subject_id, predicate_id, obj, object_is_literal=None,
+            literal_type=None):
+        """
+        :return: tuple  N-Triples text of the subject, predicate and object
+                 of the addTriple arguments, or None
+        """
         # trying making infrence on type of object if none is supplied
         if object_is_literal is None:
             if self.curie_regexp.match(obj) or\
                     obj.split(':')[0].lower() in ('http', 'https', 'ftp'):
                 object_is_literal = False
-        else:
-            object_is_literal = True
+            else:
+                object_is_literal = True
 
         subject_iri = self._getnode(subject_id)
         predicate_iri = self._getnode(predicate_id)
@@ -53,44 +224,77 @@ class StreamedGraph(DipperGraph):
 
         if literal_type is not None:
             literal_type = self._getnode(literal_type)
+            if literal_type is None:    # reported by _getnode
+                return None
 
-        if obj is not None:
-            self.serialize(
-                subject_iri, predicate_iri, obj, object_is_literal, literal_type)
-        else:
+        if subject_iri is None or predicate_iri is None:
+            return None
+        if obj is None:
             LOG.warning("Null value passed as object")
-        return
+            return None
+        return self._format(
+            subject_iri, predicate_iri, obj, object_is_literal, literal_type)
 
     def skolemizeBlankNode(self, curie):
-        base_iri = StreamedGraph.curie_map.get_base()
-        curie_id = curie.split(':')[1]
-        skolem_iri = "{0}.wellknown/genid/{1}".format(base_iri, curie_id)
-        return skolem_iri
+        # the same IRI as the other graphs make of the blank node
+        return str(RDFGraph.skolemizeBlankNode(self, curie))
 
     def serialize(self, subject_iri, predicate_iri, obj,
                   object_is_literal=False, literal_type=None):
+        self._emit((self._format(
+            subject_iri, predicate_iri, obj, object_is_literal, literal_type),))
+
+    def _format(self, subject_iri, predicate_iri, obj,
+                object_is_literal=False, literal_type=None):
+        """
+        :return: tuple  N-Triples text of the subject, predicate and object
+        """
         if not object_is_literal:
-            triple = "<{}> <{}> <{}> .".format(subject_iri, predicate_iri, obj)
+            obj_text = self._node_text(obj)
         elif literal_type is not None:
-            triple = '<{}> <{}> {}^^<{}> .'.format(
-                subject_iri, predicate_iri,
-                self._quote_encode(str(obj)), literal_type)
+            obj_text = '{}^^<{}>'.format(self._quote_encode(str(obj)), literal_type)
         else:
             if isinstance(obj, str):
-                triple = '<{}> <{}> {} .'.format(
-                    subject_iri, predicate_iri, self._quote_encode(obj))
+                obj_text = self._quote_encode(obj)
             else:
                 lit_type = self._getLiteralXSDType(obj)
                 if type is not None:
-                    triple = '<{}> <{}> "{}"^^<{}> .'.format(
-                        subject_iri, predicate_iri, obj, lit_type)
+                    obj_text = '"{}"^^<{}>'.format(obj, lit_type)
                 else:
                     raise TypeError("Cannot determine type of {}".format(obj))
+        return self._node_text(subject_iri), '<' + predicate_iri + '>', obj_text
+
+    @staticmethod
+    def _node_text(node):
+        # blank nodes are left as curies when they are not skolemized
+        return node if node[:2] == '_:' else '<' + node + '>'
+
+    def _emit(self, triples):
+        """
+        :param triples: sequence of (subject, predicate, object) N-Triples text
+        """
+        if self.seen is not None:
+            distinct = [
+                triple for triple in triples if self.seen.add(digest(' '.join(triple)))]
+            self.duplicates += len(triples) - len(distinct)
+            triples = distinct
+
+        self.properties.update(triple[1] for triple in triples)
+        lines = self.serializer.format(triples)
+        if self.file_handle is None:
+            print(''.join(lines), end='')
+        else:
+            self.batch.extend(lines)
+            if len(self.batch) >= BATCH_SIZE:
+                self._write_batch()
 
+    def _output(self, text):
+        if not text:
+            return
         if self.file_handle is None:
-            print(triple)
+            print(text, end='')
         else:
-            self.file_handle.write("{}\n".format(triple))
+            self.batch.append(text)
 
     def _getnode(self, curie):
         """
@@ -98,7 +302,7 @@ class StreamedGraph(DipperGraph):
         self.skolemize_blank_node setting
 
         :param curie: str id as curie or iri
-        :return:
+        :return: str, or None for a curie of an unknown prefix
         """
         if re.match(r'^_:', curie):
             if self.are_bnodes_skized is True:
@@ -107,8 +311,10 @@ class StreamedGraph(DipperGraph):
                 node = curie
         elif re.match(r'^http|^ftp', curie):
             node = curie
-        elif len(curie.split(':')) == 2:
+        elif ':' in curie:
             node = StreamedGraph.curie_util.get_uri(curie)
+            if node is None:    # the triple is skipped, as RDFGraph does
+                LOG.error("couldn't make URI for %s", curie)
         else:
             raise TypeError("Cannot process curie {}".format(curie))
         return node
@@ -173,11 +173,12 @@ class Genotype():
         :return:
 
         """
+        triples = []
         if product_label is not None and product_type is not None:
-            self.model.addIndividualToGraph(
+            triples = self.model.individual_triples(
                 product_id, product_label, product_type)
-        self.graph.addTriple(
-            sequence_id, self.globaltt['has gene product'], product_id)
+        triples.append((sequence_id, self.globaltt['has gene product'], product_id))
+        self.graph.addTriples(triples)
 
         return
 
@@ -194,11 +195,12 @@ class Genotype():
         """
         if polypeptide_type is None:
             polypeptide_type = self.globaltt['polypeptide']
-        self.model.addIndividualToGraph(
+        triples = self.model.individual_triples(
             polypeptide_id, polypeptide_label, polypeptide_type)
         if transcript_id is not None:
-            self.graph.addTriple(
-                transcript_id, self.globaltt['translates_to'], polypeptide_id)
+            triples.append(
+                (transcript_id, self.globaltt['translates_to'], polypeptide_id))
+        self.graph.addTriples(triples)
 
         return
 
@@ -354,10 +356,11 @@ class Genotype():
         """
 
         # TODO add default type to reagent_type
-        self.model.addIndividualToGraph(
+        triples = self.model.individual_triples(
             reagent_id, reagent_label, reagent_type, description)
 
-        self.graph.addTriple(reagent_id, self.globaltt['targets_gene'], gene_id)
+        triples.append((reagent_id, self.globaltt['targets_gene'], gene_id))
+        self.graph.addTriples(triples)
 
         return
 
@@ -389,18 +392,16 @@ class Genotype():
         if targeted_gene_id is None:
             targeted_gene_id = '_' + gene_id + '-' + reagent_id
             targeted_gene_id = targeted_gene_id.replace(":", "")
-        self.model.addIndividualToGraph(
+        triples = self.model.individual_triples(
             targeted_gene_id, targeted_gene_label,
-
             self.globaltt['reagent_targeted_gene'], description)
 
         if gene_id is not None:
-            self.graph.addTriple(
-                targeted_gene_id, self.globaltt['is_expression_variant_of'],
-                gene_id)
+            triples.append(
+                (targeted_gene_id, self.globaltt['is_expression_variant_of'], gene_id))
 
-        self.graph.addTriple(
-            targeted_gene_id, self.globaltt['is_targeted_by'], reagent_id)
+        triples.append((targeted_gene_id, self.globaltt['is_targeted_by'], reagent_id))
+        self.graph.addTriples(triples)
 
         return
 
@@ -448,12 +449,13 @@ class Genotype():
 
     def addReferenceGenome(self, build_id, build_label, taxon_id):
         genome_id = self.makeGenomeID(taxon_id)
-        self.model.addIndividualToGraph(
+        triples = self.model.individual_triples(
             build_id, build_label, self.globaltt['reference_genome'])
-        self.model.addType(build_id, genome_id)
+        triples.append((build_id, self.globaltt['type'], genome_id))
         if re.match(r'[0-9]+', taxon_id):
             taxon_id = 'NCBITaxon:' + taxon_id
-        self.addTaxon(taxon_id, build_id)
+        triples.append((build_id, self.globaltt['in taxon'], taxon_id))
+        self.graph.addTriples(triples)
 
         return
 
@@ -580,7 +582,7 @@ class Genotype():
         animal_id = '_:'+animal_id
 
         animal_label = ' '.join((genotype_label, taxon_label))
-        self.model.addIndividualToGraph(animal_id, animal_label, taxon_id)
-        self.graph.addTriple(
-            animal_id, self.globaltt['has_genotype'], genotype_id)
+        triples = self.model.individual_triples(animal_id, animal_label, taxon_id)
+        triples.append((animal_id, self.globaltt['has_genotype'], genotype_id))
+        self.graph.addTriples(triples)
         return animal_id
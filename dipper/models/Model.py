@@ -29,6 +29,12 @@ class Model():
         self.graph.addTriple(
             subject_id, predicate_id, obj, object_is_literal, literal_type)
 
+    def addTriples(self, triples):
+        """
+        :param triples: iterable of tuples of the addTriple arguments
+        """
+        self.graph.addTriples(triples)
+
     def addType(self, subject_id, subject_type):
         self.graph.addTriple(
             subject_id, self.globaltt['type'], subject_type)
@@ -54,36 +60,47 @@ class Model():
         :param description:
         :return:
 
+        """
+        self.graph.addTriples(
+            self.class_triples(class_id, label, class_type, description))
+
+    def class_triples(self, class_id, label=None, class_type=None, description=None):
+        """
+        :return: list  the addTriples tuples addClassToGraph adds,
+                 for callers with more triples to add in the same batch
         """
         assert class_id is not None
 
-        self.graph.addTriple(
-            class_id, self.globaltt['type'], self.globaltt['class'])
+        triples = [(class_id, self.globaltt['type'], self.globaltt['class'])]
         if label is not None:
-            self.graph.addTriple(
-                class_id, self.globaltt['label'], label, object_is_literal=True)
+            triples.append((class_id, self.globaltt['label'], label, True))
 
         if class_type is not None:
-            self.graph.addTriple(class_id, self.globaltt['subclass_of'], class_type)
+            triples.append((class_id, self.globaltt['subclass_of'], class_type))
         if description is not None:
-            self.graph.addTriple(
-                class_id, self.globaltt['description'], description,
-                object_is_literal=True)
+            triples.append((class_id, self.globaltt['description'], description, True))
+        return triples
 
     def addIndividualToGraph(self, ind_id, label, ind_type=None, description=None):
+        self.graph.addTriples(
+            self.individual_triples(ind_id, label, ind_type, description))
+
+    def individual_triples(self, ind_id, label, ind_type=None, description=None):
+        """
+        :return: list  the addTriples tuples addIndividualToGraph adds,
+                 for callers with more triples to add in the same batch
+        """
+        triples = []
         if label is not None:
-            self.graph.addTriple(
-                ind_id, self.globaltt['label'], label, object_is_literal=True)
+            triples.append((ind_id, self.globaltt['label'], label, True))
         if ind_type is not None:
-            self.graph.addTriple(
-                ind_id, self.globaltt['type'], ind_type, object_is_literal=False)
+            triples.append((ind_id, self.globaltt['type'], ind_type, False))
         else:
-            self.graph.addTriple(
-                ind_id, self.globaltt['type'], self.globaltt['named_individual'])
+            triples.append(
+                (ind_id, self.globaltt['type'], self.globaltt['named_individual']))
         if description is not None:
-            self.graph.addTriple(
-                ind_id, self.globaltt['description'], description,
-                object_is_literal=True)
+            triples.append((ind_id, self.globaltt['description'], description, True))
+        return triples
 
     def addEquivalentClass(self, sub, obj):
         self.graph.addTriple(
@@ -99,23 +116,19 @@ class Model():
         bnode = '_:'+re.sub(
             r':', '', property_id)+re.sub(r':', '', property_value)
 
-        self.graph.addTriple(
-            bnode, self.globaltt['type'], self.globaltt['restriction'])
-        self.graph.addTriple(
-            bnode, self.globaltt['on_property'], property_id)
-        self.graph.addTriple(
-            bnode, self.globaltt['some_values_from'], property_value)
-        self.graph.addTriple(
-            class_id, self.globaltt['subclass_of'], bnode)
+        self.graph.addTriples((
+            (bnode, self.globaltt['type'], self.globaltt['restriction']),
+            (bnode, self.globaltt['on_property'], property_id),
+            (bnode, self.globaltt['some_values_from'], property_value),
+            (class_id, self.globaltt['subclass_of'], bnode)))
 
         return
 
     def addPerson(self, person_id, person_label=None):
-        self.graph.addTriple(
-            person_id, self.globaltt['type'], self.globaltt['person'])
+        triples = [(person_id, self.globaltt['type'], self.globaltt['person'])]
         if person_label is not None:
-            self.graph.addTriple(
-                person_id, self.globaltt['label'], person_label, object_is_literal=True)
+            triples.append((person_id, self.globaltt['label'], person_label, True))
+        self.graph.addTriples(triples)
 
     def addDeprecatedClass(self, old_id, new_ids=None):
         """
@@ -128,26 +141,23 @@ class Model():
         :return: None
 
         """
-        self.graph.addTriple(
-            old_id, self.globaltt['type'], self.globaltt['class'])
-
-        self._addReplacementIds(old_id, new_ids)
+        self.graph.addTriples(self._replacement_triples(
+            old_id, self.globaltt['class'], new_ids))
 
-    def _addReplacementIds(self, old_id, new_ids):
-
-        self.graph.addTriple(
-            old_id, self.globaltt['deprecated'], True, object_is_literal=True,
-            literal_type='xsd:boolean')
+    def _replacement_triples(self, old_id, old_type, new_ids):
+        triples = [
+            (old_id, self.globaltt['type'], old_type),
+            (old_id, self.globaltt['deprecated'], True, True, 'xsd:boolean')]
 
         if new_ids is not None:
             if isinstance(new_ids, str):
-                self.graph.addTriple(old_id, self.globaltt['term replaced by'], new_ids)
+                triples.append((old_id, self.globaltt['term replaced by'], new_ids))
             elif len(new_ids) == 1:
-                self.graph.addTriple(
-                    old_id, self.globaltt['term replaced by'], new_ids[0])
+                triples.append((old_id, self.globaltt['term replaced by'], new_ids[0]))
             elif new_ids:
                 for new_id in new_ids:
-                    self.graph.addTriple(old_id, self.globaltt['consider'], new_id)
+                    triples.append((old_id, self.globaltt['consider'], new_id))
+        return triples
 
     def addDeprecatedIndividual(self, old_id, new_ids=None):
         """
@@ -161,10 +171,8 @@ class Model():
         :return:
 
         """
-        self.graph.addTriple(
-            old_id, self.globaltt['type'], self.globaltt['named_individual'])
-
-        self._addReplacementIds(old_id, new_ids)
+        self.graph.addTriples(self._replacement_triples(
+            old_id, self.globaltt['named_individual'], new_ids))
 
     def addSubClass(self, child_id, parent_id):
         self.graph.addTriple(child_id, self.globaltt['subclass_of'], parent_id)
@@ -83,57 +83,61 @@ class Assoc:
 
     def add_association_to_graph(self):
 
-        if not self._is_valid():
-            return
+        self.graph.addTriples(self.association_triples())
+
+        return
 
-        self.graph.addTriple(self.sub, self.rel, self.obj)
+    def association_triples(self):
+        """
+        :return: list  the addTriples tuples add_association_to_graph adds,
+                 for callers with more triples to add in the same batch
+        """
+        if not self._is_valid():
+            return []
 
         if self.assoc_id is None:
             self.set_association_id()
 
         assert self.assoc_id is not None
 
-        self.model.addType(self.assoc_id, self.model.globaltt['association'])
-
-        self.graph.addTriple(
-            self.assoc_id, self.globaltt['association has subject'], self.sub)
-        self.graph.addTriple(
-            self.assoc_id, self.globaltt['association has object'], self.obj)
-        self.graph.addTriple(
-            self.assoc_id, self.globaltt['association has predicate'], self.rel)
+        triples = [
+            (self.sub, self.rel, self.obj),
+            (self.assoc_id, self.globaltt['type'], self.globaltt['association']),
+            (self.assoc_id, self.globaltt['association has subject'], self.sub),
+            (self.assoc_id, self.globaltt['association has object'], self.obj),
+            (self.assoc_id, self.globaltt['association has predicate'], self.rel)]
 
         if self.description is not None:
-            self.model.addDescription(self.assoc_id, self.description)
+            triples.append((
+                self.assoc_id, self.globaltt['description'],
+                self.description.strip(), True))
 
         if self.evidence is not None and len(self.evidence) > 0:
             for evi in self.evidence:
-                self.graph.addTriple(self.assoc_id, self.globaltt['has evidence'], evi)
+                triples.append((self.assoc_id, self.globaltt['has evidence'], evi))
 
         if self.source is not None and len(self.source) > 0:
             for src in self.source:
                 # TODO assume that the source is a publication? use Reference class
-                self.graph.addTriple(self.assoc_id, self.globaltt['source'], src)
+                triples.append((self.assoc_id, self.globaltt['source'], src))
 
         if self.provenance is not None and len(self.provenance) > 0:
             for prov in self.provenance:
-                self.graph.addTriple(
-                    self.assoc_id, self.globaltt['has_provenance'], prov)
+                triples.append((self.assoc_id, self.globaltt['has_provenance'], prov))
 
         if self.date is not None and len(self.date) > 0:
             for dat in self.date:
-                self.graph.addTriple(
-                    self.assoc_id,self.globaltt['created_on'], dat,
-                    object_is_literal=True)
+                triples.append((self.assoc_id, self.globaltt['created_on'], dat, True))
 
         if self.score is not None:
-            self.graph.addTriple(
+            triples.append((
                 self.assoc_id, self.globaltt['has measurement value'], self.score,
-                True, 'xsd:float')
+                True, 'xsd:float'))
             # TODO
             # update with some kind of instance of scoring object
             # that has a unit and type
 
-        return
+        return triples
 
     def add_predicate_object(
             self, predicate, object_node, object_type=None, datatype=None):
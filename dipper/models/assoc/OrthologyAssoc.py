@@ -1,5 +1,4 @@
 from dipper.models.assoc.Association import Assoc
-from dipper.models.Family import Family
 
 
 __author__ = 'nlw'
@@ -38,15 +37,23 @@ class OrthologyAssoc(Assoc):
         :param g: the graph to modify
         :return:
         """
-        family = Family(self.graph)
+        self.graph.addTriples(self.gene_family_triples(family_id))
+
+        return
+
+    def gene_family_triples(self, family_id):
+        """
+        :return: list  the addTriples tuples add_gene_family_to_graph adds,
+                 for callers with more triples to add in the same batch
+        """
         gene_family = self.globaltt['gene_family']
 
         # make the assumption that the genes
         # have already been added as classes previously
-        self.model.addIndividualToGraph(family_id, None, gene_family)
+        triples = self.model.individual_triples(family_id, None, gene_family)
 
         # add each gene to the family
-        family.addMember(family_id, self.sub)
-        family.addMember(family_id, self.obj)
+        triples.append((family_id, self.globaltt['has member'], self.sub))
+        triples.append((family_id, self.globaltt['has member'], self.obj))
 
-        return
+        return triples
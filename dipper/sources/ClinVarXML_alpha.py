@@ -48,10 +48,11 @@ import logging
 import argparse
 import xml.etree.ElementTree as ET
 from typing import List, Dict
-import yaml
 from dipper.models.ClinVarRecord import ClinVarRecord, Gene,\
     Variant, Allele, Condition, Genotype
 from dipper import curie_map
+from dipper.utils.SortUtil import sort_ntriples
+from dipper.utils.TranslationUtil import load_table
 
 LOG = logging.getLogger(__name__)
 
@@ -66,16 +67,12 @@ LOCAL_TT_PATH = RPATH + '/translationtable/' + INAME + '.yaml'
 # Global translation table
 # Translate labels found in ontologies
 # to the terms they are for
-GLOBALTT = {}
-with open(GLOBAL_TT_PATH) as fh:
-    GLOBALTT = yaml.safe_load(fh)
+GLOBALTT = load_table(GLOBAL_TT_PATH)
 
 # Local translation table
 # Translate external strings found in datasets
 # to specific labels found in ontologies
-LOCALTT = {}
-with open(LOCAL_TT_PATH) as fh:
-    LOCALTT = yaml.safe_load(fh)
+LOCALTT = load_table(LOCAL_TT_PATH)
 
 
 #with open(os.path.join(os.path.dirname(__file__), '../curie_map.yaml'), 'r') as fh:
@@ -535,6 +532,10 @@ def parse():
         '-s', '--skolemize', default=True,
         help='default: True. False keeps plain blank nodes  "_:xxx"')
 
+    argparser.add_argument(
+        '--sort', action='store_true',
+        help='sort the output, keeping one of each triple')
+
     args = argparser.parse_args()
 
     basename = re.sub(r'\.xml.gz$', '', args.filename)
@@ -599,15 +600,13 @@ def parse():
 
     # Override default global translation table
     if args.globaltt:
-        with open(args.globaltt) as globaltt_fh:
-            global GLOBALTT
-            GLOBALTT = yaml.safe_load(globaltt_fh)
+        global GLOBALTT
+        GLOBALTT = load_table(args.globaltt)
 
     # Overide default local translation table
     if args.localtt:
-        with open(args.localtt) as localtt_fh:
-            global LOCALTT
-            LOCALTT = yaml.safe_load(localtt_fh)
+        global LOCALTT
+        LOCALTT = load_table(args.localtt)
 
     # Overide the given Skolem IRI for our blank nodes
     # with an unresovable alternative.
@@ -1198,6 +1197,8 @@ def parse():
     outtmp.close()
     reject.close()
     os.replace(outfile, output)
+    if args.sort:
+        sort_ntriples(output)
 
 
 if __name__ == "__main__":
@@ -1,22 +1,15 @@
-import csv
 import re
 import logging
-import gzip
-import io
-import sys
-import os
-
-import yaml
 
 from dipper.sources.ZFIN import ZFIN
 from dipper.sources.WormBase import WormBase
 from dipper.sources.Source import Source
-from dipper.models.assoc.Association import Assoc
 from dipper.models.assoc.G2PAssoc import G2PAssoc
 from dipper.models.Genotype import Genotype
 from dipper.models.Reference import Reference
 from dipper.models.Model import Model
-from dipper.utils.GraphUtils import GraphUtils
+from dipper.utils.IdMapUtil import UniProtIdMap
+from dipper.utils.GafUtil import GafAssociations, read_gaf
 
 
 LOG = logging.getLogger(__name__)
@@ -171,7 +164,6 @@ class GeneOntology(Source):
         model = Model(graph)
         geno = Genotype(graph)
         LOG.info("Processing Gene Associations from %s", file)
-        line_counter = 0
         uniprot_hit = 0
         uniprot_miss = 0
         if '7955' in self.tax_ids:
@@ -179,247 +171,183 @@ class GeneOntology(Source):
         if '6239' in self.tax_ids:
             wbase = WormBase(self.graph_type, self.are_bnodes_skized)
 
-        with gzip.open(file, 'rb') as csvfile:
-            filereader = csv.reader(
-                io.TextIOWrapper(csvfile, newline=""), delimiter='\t', quotechar='\"')
-            for row in filereader:
-                line_counter += 1
-                # comments start with exclamation
-                if re.match(r'!', ''.join(row)):
-                    continue
-
-                if len(row) > 17 or len(row) < 15:
-                    LOG.warning(
-                        "Wrong number of columns %i, expected 15 or 17\n%s",
-                        len(row), row)
-                    continue
-
-                if 17 > len(row) >= 15:
-                    row += [""] * (17 - len(row))
-
-                (dbase,
-                 gene_num,
-                 gene_symbol,
-                 qualifier,
-                 go_id,
-                 ref,
-                 eco_symbol,
-                 with_or_from,
-                 aspect,
-                 gene_name,
-                 gene_synonym,
-                 object_type,
-                 taxon,
-                 date,
-                 assigned_by,
-                 annotation_extension,
-                 gene_product_form_id) = row
-
-                # test for required fields
-                if (dbase == '' or gene_num == '' or gene_symbol == '' or
-                        go_id == '' or ref == '' or eco_symbol == '' or
-                        aspect == '' or object_type == '' or taxon == '' or
-                        date == '' or assigned_by == ''):
-                    LOG.error(
-                        "Missing required part of annotation on row %d:\n"+'\t'
-                        .join(row), line_counter)
-                    continue
-
-                # deal with qualifier NOT, contributes_to, colocalizes_with
-                if re.search(r'NOT', qualifier):
-                    continue
+        gaf = GafAssociations(self, eco_map)
+        relations = {}      # of each aspect
+        # the test subset may be of any taxon's file
+        reader = read_gaf(
+            file, taxa=None if self.test_mode else self.tax_ids,
+            limit=None if self.test_mode else limit)
+        for row in reader:
+            (dbase,
+             gene_num,
+             gene_symbol,
+             qualifier,
+             go_id,
+             ref,
+             eco_symbol,
+             with_or_from,
+             aspect,
+             gene_name,
+             gene_synonym,
+             object_type,
+             taxon,
+             date,
+             assigned_by) = row
+
+            # test for required fields
+            if (dbase == '' or gene_num == '' or gene_symbol == '' or
+                    go_id == '' or ref == '' or eco_symbol == '' or
+                    aspect == '' or object_type == '' or taxon == '' or
+                    date == '' or assigned_by == ''):
+                LOG.error(
+                    "Missing required part of annotation on row %d:\n"+'\t'
+                    .join(row), reader.line_num)
+                continue
 
-                if dbase in self.localtt:
-                    dbase = self.localtt[dbase]
-                uniprotid = None
-                gene_id = None
-                if dbase == 'UniProtKB':
-                    if id_map is not None and gene_num in id_map:
-                        gene_id = id_map[gene_num]
-                        uniprotid = ':'.join((dbase, gene_num))
-                        (dbase, gene_num) = gene_id.split(':')
-                        uniprot_hit += 1
-                    else:
-                        # LOG.warning(
-                        #   "UniProt id %s  is without a 1:1 mapping to entrez/ensembl",
-                        #    gene_num)
-                        uniprot_miss += 1
-                        continue
+            # qualifier NOT is passed over by the reader,
+            # leaving contributes_to, colocalizes_with
+
+            dbase = gaf.get_prefix(dbase)
+            uniprotid = None
+            gene_id = None
+            if dbase == 'UniProtKB':
+                if id_map is not None and gene_num in id_map:
+                    gene_id = id_map[gene_num]
+                    uniprotid = ':'.join((dbase, gene_num))
+                    (dbase, gene_num) = gene_id.split(':')
+                    uniprot_hit += 1
                 else:
-                    gene_num = gene_num.split(':')[-1]  # last
-                    gene_id = ':'.join((dbase, gene_num))
-
-                if self.test_mode and not(
-                        re.match(r'NCBIGene', gene_id) and
-                        int(gene_num) in self.test_ids):
+                    # LOG.warning(
+                    #   "UniProt id %s  is without a 1:1 mapping to entrez/ensembl",
+                    #    gene_num)
+                    uniprot_miss += 1
                     continue
+            else:
+                gene_num = gene_num.split(':')[-1]  # last
+                gene_id = ':'.join((dbase, gene_num))
 
-                model.addClassToGraph(gene_id, gene_symbol)
-                if gene_name != '':
-                    model.addDescription(gene_id, gene_name)
-                if gene_synonym != '':
-                    for syn in re.split(r'\|', gene_synonym):
-                        model.addSynonym(gene_id, syn.strip())
-                if re.search(r'\|', taxon):
-                    # TODO add annotations with >1 taxon
-                    LOG.info(
-                        ">1 taxon (%s) on line %d.  skipping", taxon, line_counter)
-                else:
-                    tax_id = re.sub(r'taxon:', 'NCBITaxon:', taxon)
-                    geno.addTaxon(tax_id, gene_id)
-
-                assoc = Assoc(graph, self.name)
-                assoc.set_subject(gene_id)
-                assoc.set_object(go_id)
-
-                try:
-                    eco_id = eco_map[eco_symbol]
-                    assoc.add_evidence(eco_id)
-                except KeyError:
-                    LOG.error("Evidence code (%s) not mapped", eco_symbol)
-
-                refs = re.split(r'\|', ref)
-                for ref in refs:
-                    ref = ref.strip()
-                    if ref != '':
-                        prefix = ref.split(':')[0]  # sidestep 'MGI:MGI:'
-                        if prefix in self.localtt:
-                            prefix = self.localtt[prefix]
-                        ref = ':'.join((prefix, ref.split(':')[-1]))
-                        refg = Reference(graph, ref)
-                        if prefix == 'PMID':
-                            ref_type = self.globaltt['journal article']
-                            refg.setType(ref_type)
-                        refg.addRefToGraph()
-                        assoc.add_source(ref)
-
-                # TODO add the source of the annotations from assigned by?
+            if self.test_mode and not(
+                    dbase == 'NCBIGene' and int(gene_num) in self.test_ids):
+                continue
 
-                rel = self.resolve(aspect, mandatory=False)
-                if rel is not None and aspect == rel:
-                    if aspect == 'F' and re.search(r'contributes_to', qualifier):
-                        assoc.set_relationship(self.globaltt['contributes to'])
+            model.addClassToGraph(gene_id, gene_symbol)
+            if gene_name != '':
+                model.addDescription(gene_id, gene_name)
+            if gene_synonym != '':
+                for syn in gene_synonym.split('|'):
+                    model.addSynonym(gene_id, syn.strip())
+            if '|' in taxon:
+                # TODO add annotations with >1 taxon
+                LOG.info(
+                    ">1 taxon (%s) on line %d.  skipping", taxon, reader.line_num)
+            else:
+                tax_id = taxon.replace('taxon:', 'NCBITaxon:')
+                geno.addTaxon(tax_id, gene_id)
+
+            refs = gaf.get_references(row)
+            for ref in refs:
+                refg = Reference(graph, ref)
+                if ref.startswith('PMID:'):
+                    refg.setType(self.globaltt['journal article'])
+                refg.addRefToGraph()
+
+            # TODO add the source of the annotations from assigned by?
+
+            if aspect not in relations:
+                relations[aspect] = self.resolve(aspect, mandatory=False)
+            rel = relations[aspect]
+            assoc = None
+            if rel is not None and aspect == rel:
+                if aspect != 'F' or 'contributes_to' not in qualifier:
+                    LOG.error(
+                        "Aspect: %s with qualifier: %s  is not recognized",
+                        aspect, qualifier)
+                # TODO a contributes_to annotation of an unmapped aspect
+                # is not added to the graph
+            elif rel is not None:
+                assoc = gaf.add_association(
+                    graph, gene_id, go_id, rel, gaf.get_evidence(eco_symbol), refs)
+            else:
+                LOG.warning("No predicate for association of %s to %s", gene_id, go_id)
+
+            if assoc is not None and uniprotid is not None:
+                assoc.set_description('Mapped from ' + uniprotid)
+
+            # object_type should be one of:
+            # protein_complex; protein; transcript; ncRNA; rRNA; tRNA;
+            # snRNA; snoRNA; any subtype of ncRNA in the Sequence Ontology.
+            # If the precise product type is unknown,
+            # gene_product should be used
+            #######################################################################
+
+            # Derive G2P Associations from IMP annotations
+            # in version 2.1 Pipe will indicate 'OR'
+            # and Comma will indicate 'AND'.
+            # in version 2.0, multiple values are separated by pipes
+            # where the pipe has been used to mean 'AND'
+            if eco_symbol == 'IMP' and with_or_from != '':
+                withitems = with_or_from.split('|')
+                phenotypeid = go_id+'PHENOTYPE'
+                # create phenotype associations
+                for i in withitems:
+                    if i == '' or re.match(
+                            r'(UniProtKB|WBPhenotype|InterPro|HGNC)', i):
+                        LOG.warning(
+                            "Don't know what having a uniprot id " +
+                            "in the 'with' column means of %s", uniprotid)
+                        continue
+                    i = re.sub(r'MGI\:MGI\:', 'MGI:', i)
+                    i = re.sub(r'WB:', 'WormBase:', i)
+
+                    # for worms and fish, they might give a RNAi or MORPH
+                    # in these cases make a reagent-targeted gene
+                    if re.search('MRPHLNO|CRISPR|TALEN', i):
+                        targeted_gene_id = zfin.make_targeted_gene_id(gene_id, i)
+                        geno.addReagentTargetedGene(i, gene_id, targeted_gene_id)
+                        assoc = G2PAssoc(
+                            graph, self.name, targeted_gene_id, phenotypeid)
+                    elif re.search(r'WBRNAi', i):
+                        targeted_gene_id = wbase.make_reagent_targeted_gene_id(
+                            gene_id, i)
+                        geno.addReagentTargetedGene(i, gene_id, targeted_gene_id)
+                        assoc = G2PAssoc(
+                            graph, self.name, targeted_gene_id, phenotypeid)
                     else:
-                        LOG.error(
-                            "Aspect: %s with qualifier: %s  is not recognized",
-                            aspect, qualifier)
-                elif rel is not None:
-                    assoc.set_relationship(rel)
+                        assoc = G2PAssoc(graph, self.name, i, phenotypeid)
+                    for ref in refs:
+                        assoc.add_source(ref)
+                        # experimental phenotypic evidence
+                        assoc.add_evidence(
+                            self.globaltt['experimental phenotypic evidence'])
                     assoc.add_association_to_graph()
-                else:
-                    LOG.warning("No predicate for association \n%s\n", str(assoc))
-
-                if uniprotid is not None:
-                    assoc.set_description('Mapped from ' + uniprotid)
-                # object_type should be one of:
-                # protein_complex; protein; transcript; ncRNA; rRNA; tRNA;
-                # snRNA; snoRNA; any subtype of ncRNA in the Sequence Ontology.
-                # If the precise product type is unknown,
-                # gene_product should be used
-                #######################################################################
-
-                # Derive G2P Associations from IMP annotations
-                # in version 2.1 Pipe will indicate 'OR'
-                # and Comma will indicate 'AND'.
-                # in version 2.0, multiple values are separated by pipes
-                # where the pipe has been used to mean 'AND'
-                if eco_symbol == 'IMP' and with_or_from != '':
-                    withitems = re.split(r'\|', with_or_from)
-                    phenotypeid = go_id+'PHENOTYPE'
-                    # create phenotype associations
-                    for i in withitems:
-                        if i == '' or re.match(
-                                r'(UniProtKB|WBPhenotype|InterPro|HGNC)', i):
-                            LOG.warning(
-                                "Don't know what having a uniprot id " +
-                                "in the 'with' column means of %s", uniprotid)
-                            continue
-                        i = re.sub(r'MGI\:MGI\:', 'MGI:', i)
-                        i = re.sub(r'WB:', 'WormBase:', i)
-
-                        # for worms and fish, they might give a RNAi or MORPH
-                        # in these cases make a reagent-targeted gene
-                        if re.search('MRPHLNO|CRISPR|TALEN', i):
-                            targeted_gene_id = zfin.make_targeted_gene_id(gene_id, i)
-                            geno.addReagentTargetedGene(i, gene_id, targeted_gene_id)
-                            # TODO PYLINT why is this needed?
-                            # Redefinition of assoc type from
-                            # dipper.models.assoc.Association.Assoc to
-                            # dipper.models.assoc.G2PAssoc.G2PAssoc
-                            assoc = G2PAssoc(
-                                graph, self.name, targeted_gene_id, phenotypeid)
-                        elif re.search(r'WBRNAi', i):
-                            targeted_gene_id = wbase.make_reagent_targeted_gene_id(
-                                gene_id, i)
-                            geno.addReagentTargetedGene(i, gene_id, targeted_gene_id)
-                            assoc = G2PAssoc(
-                                graph, self.name, targeted_gene_id, phenotypeid)
-                        else:
-                            assoc = G2PAssoc(graph, self.name, i, phenotypeid)
-                        for ref in refs:
-                            ref = ref.strip()
-                            if ref != '':
-                                prefix = ref.split(':')[0]
-                                if prefix in self.localtt:
-                                    prefix = self.localtt[prefix]
-                                ref = ':'.join((prefix, ref.split(':')[-1]))
-                                assoc.add_source(ref)
-                                # experimental phenotypic evidence
-                                assoc.add_evidence(
-                                    self.globaltt['experimental phenotypic evidence'])
-                        assoc.add_association_to_graph()
-                        # TODO should the G2PAssoc be
-                        # the evidence for the GO assoc?
-
-                if not self.test_mode and limit is not None and line_counter > limit:
-                    break
-            uniprot_tot = (uniprot_hit + uniprot_miss)
-            uniprot_per = 0.0
-            if uniprot_tot != 0:
-                uniprot_per = 100.0 * uniprot_hit / uniprot_tot
-            LOG.info(
-                "Uniprot: %.2f%% of %i benefited from the 1/4 day id mapping download",
-                uniprot_per, uniprot_tot)
+                    # TODO should the G2PAssoc be
+                    # the evidence for the GO assoc?
+
+        uniprot_tot = (uniprot_hit + uniprot_miss)
+        uniprot_per = 0.0
+        if uniprot_tot != 0:
+            uniprot_per = 100.0 * uniprot_hit / uniprot_tot
+        LOG.info(
+            "Uniprot: %.2f%% of %i benefited from the 1/4 day id mapping download",
+            uniprot_per, uniprot_tot)
         return
 
     def get_uniprot_entrez_id_map(self):
-        taxon_digest = GraphUtils.digest_id(str(self.tax_ids))
-        id_map = {}
-        smallfile = '/'.join((self.rawdir, 'id_map_' + taxon_digest + '.yaml'))
+        """
+        The UniProt accessions of our taxa which map to a single gene,
+        read from the index of idmapping_selected.tab.gz all ingests share
+        (see IdMapUtil); it is built, for every taxon, when the file is new.
+        :return: dict  accession -> NCBIGene or ENSEMBL curie
+        """
         bigfile = '/'.join((self.rawdir, self.files['id-map']['file']))
-
-        # if processed smallfile exists and is newer use it instesd
-        if os.path.isfile(smallfile) and \
-                os.path.getctime(smallfile) > os.path.getctime(bigfile):
-            LOG.info("Using the cheap mapping file %s", smallfile)
-            with open(smallfile, 'r') as fh:
-                id_map = yaml.safe_load(fh)
-        else:
+        id_map_index = UniProtIdMap(bigfile)
+        if not id_map_index.is_current():
             LOG.info(
                 "Expensive Mapping from Uniprot ids to Entrez/ENSEMBL gene ids for %s",
                 str(self.tax_ids))
             self.fetch_from_url(self.files['id-map']['url'], bigfile)
-            with gzip.open(bigfile, 'rb') as csvfile:
-                csv.field_size_limit(sys.maxsize)
-                filereader = csv.reader(  # warning this file is over 10GB unzipped
-                    io.TextIOWrapper(
-                        csvfile, newline=""), delimiter='\t', quotechar='\"')
-                for row in filereader:
-                    (uniprotkb_ac, uniprotkb_id, geneid, refseq, gi, pdb, go,
-                     uniref100, unifref90, uniref50, uniparc, pir, ncbitaxon, mim,
-                     unigene, pubmed, embl, embl_cds, ensembl, ensembl_trs,
-                     ensembl_pro, other_pubmed) = row
-                    if str(ncbitaxon) not in self.tax_ids:
-                        continue
-                    genid = geneid.strip()
-                    if geneid != '' and ';' not in genid:
-                        id_map[uniprotkb_ac.strip()] = 'NCBIGene:' + genid
-                    elif ensembl.strip() != '' and ';' not in ensembl:
-                        id_map[uniprotkb_ac.strip()] = 'ENSEMBL:' + ensembl.strip()
-
-            LOG.info("Writing id_map out as %s", smallfile)
-            with open(smallfile, 'w') as fh:
-                yaml.dump(id_map, fh)
+        id_map = id_map_index.get_map(self.tax_ids)
+        id_map_index.close()
 
         LOG.info(
             "Acquired %i 1:1 uniprot to [entrez|ensembl] mappings", len(id_map.keys()))
@@ -1,10 +1,10 @@
 import csv
-import gzip
 import re
 import logging
 import os
 
 from dipper.sources.Source import Source
+from dipper.utils.TableUtil import TableReader
 from dipper.models.Genotype import Genotype
 from dipper.models.assoc.G2PAssoc import G2PAssoc
 from dipper.models.Evidence import Evidence
@@ -175,372 +175,379 @@ class IMPC(Source):
         else:
             graph = self.graph
         model = Model(graph)
-        geno = Genotype(graph)
 
         # Add the taxon as a class
         taxon_id = self.globaltt['Mus musculus']
         model.addClassToGraph(taxon_id, None)
 
-        # with open(raw, 'r', encoding="utf8") as csvfile:
-        col = self.files['all']['columns']
-        with gzip.open(raw, 'rt') as csvfile:
-            reader = csv.reader(csvfile, delimiter=',', quotechar='\"')
-            row = next(reader)  # presumed header
-            if not self.check_fileheader(col, row):
-                pass
+        # the columns are found in the header, other markers are passed over
+        # in test mode and reading stops at the limit otherwise
+        reader = TableReader(
+            raw, self.files['all']['columns'], delimiter=',', quotechar='\"',
+            comment=None, strip=True,
+            select={'marker_accession_id': self.gene_ids} if self.test_mode else None,
+            limit=None if self.test_mode else limit)
+        self.process_rows(reader, self._add_genotype_phenotypes, graph, limit)
 
-            for row in reader:
-                # | head -1 | tr ',' '\n' | sed "s|\(.*\)|# \1 = row[col.index('\1')]|g"
-                marker_accession_id = row[col.index('marker_accession_id')].strip()
-                marker_symbol = row[col.index('marker_symbol')].strip()
-                phenotyping_center = row[col.index('phenotyping_center')].strip()
-                colony_raw = row[col.index('colony_id')].strip()
-                sex = row[col.index('sex')].strip()
-                zygosity = row[col.index('zygosity')].strip()
-                allele_accession_id = row[col.index('allele_accession_id')].strip()
-                allele_symbol = row[col.index('allele_symbol')].strip()
-                # allele_name = row[col.index('allele_name')]
-                strain_accession_id = row[col.index('strain_accession_id')].strip()
-                strain_name = row[col.index('strain_name')].strip()
-                # project_name = row[col.index('project_name')]
-                project_fullname = row[col.index('project_fullname')].strip()
-                pipeline_name = row[col.index('pipeline_name')].strip()
-                pipeline_stable_id = row[col.index('pipeline_stable_id')].strip()
-                procedure_stable_id = row[col.index('procedure_stable_id')].strip()
-                procedure_name = row[col.index('procedure_name')].strip()
-                parameter_stable_id = row[col.index('parameter_stable_id')].strip()
-                parameter_name = row[col.index('parameter_name')].strip()
-                # top_level_mp_term_id = row[col.index('top_level_mp_term_id')]
-                # top_level_mp_term_name = row[col.index('top_level_mp_term_name')]
-                mp_term_id = row[col.index('mp_term_id')].strip()
-                mp_term_name = row[col.index('mp_term_name')].strip()
-                p_value = row[col.index('p_value')].strip()
-                percentage_change = row[col.index('percentage_change')].strip()
-                effect_size = row[col.index('effect_size')].strip()
-                statistical_method = row[col.index('statistical_method')].strip()
-                resource_name = row[col.index('resource_name')].strip()
-
-                if self.test_mode and marker_accession_id not in self.gene_ids:
-                    continue
-
-                # ##### cleanup some of the identifiers ######
-                zygosity = zygosity.strip()
-                zygosity_id = self.resolve(zygosity)
-                if zygosity_id == zygosity:
-                    LOG.warning(
-                        "Zygosity '%s' unmapped. detting to indeterminate", zygosity)
-                    zygosity_id = self.globaltt['indeterminate']
-
-                # colony ids sometimes have <> in them, spaces,
-                # or other non-alphanumerics and break our system;
-                # replace these with underscores
-                colony_id = '_:' + re.sub(r'\W+', '_', colony_raw)
-
-                if not re.match(r'MGI', allele_accession_id):
-                    allele_accession_id = '_:IMPC-'+re.sub(
-                        r':', '', allele_accession_id)
-
-                if re.search(r'EUROCURATE', strain_accession_id):
-                    # the eurocurate links don't resolve at IMPC
-                    # TODO blank nodes do not maintain identifiers
-                    strain_accession_id = '_:' + strain_accession_id
-
-                elif not re.match(r'MGI', strain_accession_id):
-                    LOG.info(
-                        "Found a strange strain accession...%s", strain_accession_id)
-                    strain_accession_id = 'IMPC:'+strain_accession_id
-
-                ######################
-                # first, add the marker and variant to the graph as with MGI,
-                # the allele is the variant locus.  IF the marker is not known,
-                # we will call it a sequence alteration.  otherwise,
-                # we will create a BNode for the sequence alteration.
-                sequence_alteration_id = variant_locus_id = None
-                variant_locus_name = sequence_alteration_name = None
-
-                # extract out what's within the <> to get the symbol
-                if re.match(r'.*<.*>', allele_symbol):
-                    sequence_alteration_name = re.match(
-                        r'.*<(.*)>', allele_symbol)
-                    if sequence_alteration_name is not None:
-                        sequence_alteration_name = sequence_alteration_name.group(1)
-                else:
-                    sequence_alteration_name = allele_symbol
-
-                if marker_accession_id is not None and marker_accession_id == '':
-                    LOG.warning("Marker unspecified on row %d", reader.line_num)
-                    marker_accession_id = None
-
-                if marker_accession_id is not None:
-                    variant_locus_id = allele_accession_id
-                    variant_locus_name = allele_symbol
-                    variant_locus_type = self.globaltt['variant_locus']
-                    geno.addGene(
-                        marker_accession_id, marker_symbol, self.globaltt['gene'])
-
-                    geno.addAllele(
-                        variant_locus_id, variant_locus_name, variant_locus_type, None)
-                    geno.addAlleleOfGene(variant_locus_id, marker_accession_id)
-
-                    # TAG bnode
-                    sequence_alteration_id = '_:seqalt' + re.sub(
-                        r':', '', allele_accession_id)
-                    geno.addSequenceAlterationToVariantLocus(
-                        sequence_alteration_id, variant_locus_id)
-
-                else:
-                    sequence_alteration_id = allele_accession_id
-
-                # IMPC contains targeted mutations with either gene traps,
-                # knockouts, insertion/intragenic deletions.
-                # but I don't really know what the SeqAlt is here,
-                # so I don't add it.
-                geno.addSequenceAlteration(
-                    sequence_alteration_id, sequence_alteration_name)
-
-                # #############    BUILD THE COLONY    #############
-                # First, let's describe the colony that the animals come from
-                # The Colony ID refers to the ES cell clone
-                #   used to generate a mouse strain.
-                # Terry sez: we use this clone ID to track
-                #   ES cell -> mouse strain -> mouse phenotyping.
-                # The same ES clone maybe used at multiple centers,
-                # so we have to concatenate the two to have a unique ID.
-                # some useful reading about generating mice from ES cells:
-                # http://ki.mit.edu/sbc/escell/services/details
-
-                # here, we'll make a genotype
-                # that derives from an ES cell with a given allele.
-                # the strain is not really attached to the colony.
-
-                # the colony/clone is reflective of the allele,  with unknown zygosity
-
-                stem_cell_class = self.globaltt['embryonic stem cell line']
-
-                if colony_id is None:
-                    print(colony_raw, stem_cell_class, "\nline:\t", reader.line_num)
-                model.addIndividualToGraph(colony_id, colony_raw, stem_cell_class)
-
-                # vslc of the colony has unknown zygosity
-                # note that we will define the allele
-                # (and it's relationship to the marker, etc.) later
-                # FIXME is it really necessary to create this vslc
-                # when we always know it's unknown zygosity?
-                vslc_colony = '_:'+re.sub(
-                    r':', '', allele_accession_id + self.globaltt['indeterminate'])
-                vslc_colony_label = allele_symbol + '/<?>'
-                # for ease of reading, we make the colony genotype variables.
-                # in the future, it might be desired to keep the vslcs
-                colony_genotype_id = vslc_colony
-                colony_genotype_label = vslc_colony_label
-                geno.addGenotype(colony_genotype_id, colony_genotype_label)
-                geno.addParts(
-                    allele_accession_id, colony_genotype_id,
-                    self.globaltt['has_variant_part'])
-
-                geno.addPartsToVSLC(
-                    vslc_colony, allele_accession_id, None,
-                    self.globaltt['indeterminate'], self.globaltt['has_variant_part'])
-                graph.addTriple(
-                    colony_id, self.globaltt['has_genotype'], colony_genotype_id)
-
-                # ##########    BUILD THE ANNOTATED GENOTYPE    ##########
-                # now, we'll build the genotype of the individual that derives
-                # from the colony/clone genotype that is attached to
-                # phenotype = colony_id + strain + zygosity + sex
-                # (and is derived from a colony)
-
-                # this is a sex-agnostic genotype
-                genotype_id = self.make_id(
-                    (colony_id + phenotyping_center + zygosity + strain_accession_id))
-                geno.addSequenceDerivesFrom(genotype_id, colony_id)
-
-                # build the VSLC of the sex-agnostic genotype
-                # based on the zygosity
-                allele1_id = allele_accession_id
-                allele2_id = allele2_rel = None
-                allele1_label = allele_symbol
-                allele2_label = '<?>'
-                # Making VSLC labels from the various parts,
-                # can change later if desired.
-                if zygosity == 'heterozygote':
-                    allele2_label = re.sub(r'<.*', '<+>', allele1_label)
-                    allele2_id = None
-                elif zygosity == 'homozygote':
-                    allele2_label = allele1_label
-                    allele2_id = allele1_id
-                    allele2_rel = self.globaltt['has_variant_part']
-                elif zygosity == 'hemizygote':
-                    allele2_label = re.sub(r'<.*', '<0>', allele1_label)
-                    allele2_id = None
-                elif zygosity == 'not_applicable':
-                    allele2_label = re.sub(r'<.*', '<?>', allele1_label)
-                    allele2_id = None
-                else:
-                    LOG.warning("found unknown zygosity %s", zygosity)
-                    break
-                vslc_name = '/'.join((allele1_label, allele2_label))
-
-                # Add the VSLC
-                vslc_id = '-'.join(
-                    (marker_accession_id, allele_accession_id, zygosity))
-                vslc_id = re.sub(r':', '', vslc_id)
-                vslc_id = '_:'+vslc_id
-                model.addIndividualToGraph(
-                    vslc_id, vslc_name,
-                    self.globaltt['variant single locus complement'])
-                geno.addPartsToVSLC(
-                    vslc_id, allele1_id, allele2_id, zygosity_id,
-                    self.globaltt['has_variant_part'], allele2_rel)
-
-                # add vslc to genotype
-                geno.addVSLCtoParent(vslc_id, genotype_id)
-
-                # note that the vslc is also the gvc
-                model.addType(vslc_id, self.globaltt['genomic_variation_complement'])
-
-                # Add the genomic background
-                # create the genomic background id and name
-                if strain_accession_id != '':
-                    genomic_background_id = strain_accession_id
-                else:
-                    genomic_background_id = None
-
-                genotype_name = vslc_name
-                if genomic_background_id is not None:
-                    geno.addGenotype(
-                        genomic_background_id, strain_name,
-                        self.globaltt['genomic_background'])
-
-                    # make a phenotyping-center-specific strain
-                    # to use as the background
-                    pheno_center_strain_label = strain_name + '-' + phenotyping_center \
-                        + '-' + colony_raw
-                    pheno_center_strain_id = '-'.join((
-                        re.sub(r':', '', genomic_background_id),
-                        re.sub(r'\s', '_', phenotyping_center),
-                        re.sub(r'\W+', '', colony_raw)))
-                    if not re.match(r'^_', pheno_center_strain_id):
-                        # Tag bnode
-                        pheno_center_strain_id = '_:' + pheno_center_strain_id
-
-                    geno.addGenotype(
-                        pheno_center_strain_id, pheno_center_strain_label,
-                        self.globaltt['genomic_background'])
-                    geno.addSequenceDerivesFrom(
-                        pheno_center_strain_id, genomic_background_id)
-
-                    # Making genotype labels from the various parts,
-                    # can change later if desired.
-                    # since the genotype is reflective of the place
-                    # it got made, should put that in to disambiguate
-                    genotype_name = \
-                        genotype_name + ' [' + pheno_center_strain_label + ']'
-                    geno.addGenomicBackgroundToGenotype(
-                        pheno_center_strain_id, genotype_id)
-                    geno.addTaxon(taxon_id, pheno_center_strain_id)
-                # this is redundant, but i'll keep in in for now
-                geno.addSequenceDerivesFrom(genotype_id, colony_id)
-                geno.addGenotype(genotype_id, genotype_name)
-
-                # Make the sex-qualified genotype,
-                # which is what the phenotype is associated with
-                sex_qualified_genotype_id = \
-                    self.make_id((
-                        colony_id + phenotyping_center + zygosity +
-                        strain_accession_id + sex))
-                sex_qualified_genotype_label = genotype_name + ' (' + sex + ')'
-
-                sq_type_id = self.resolve(sex, False)
-
-                if sq_type_id == sex:
-                    sq_type_id = self.globaltt['intrinsic_genotype']
-                    LOG.warning(
-                        "Unknown sex qualifier %s, adding as intrinsic_genotype",
-                        sex)
+    def _add_genotype_phenotypes(self, reader, graph):
+        """
+        Adds the genotypes, phenotypes and their associations
+        of the rows the reader yields
+        (all of them, or a chunk of them in a worker process)
+        :param reader: TableReader of a genotype_phenotype.csv
+        :param graph:
+        :return: None
+        """
+        model = Model(graph)
+        geno = Genotype(graph)
+        taxon_id = self.globaltt['Mus musculus']
+        for row in reader:
+            # | head -1 | tr ',' '\n' | sed "s|\(.*\)|# \1 = row.\1|g"
+            marker_accession_id = row.marker_accession_id
+            marker_symbol = row.marker_symbol
+            phenotyping_center = row.phenotyping_center
+            colony_raw = row.colony_id
+            sex = row.sex
+            zygosity = row.zygosity
+            allele_accession_id = row.allele_accession_id
+            allele_symbol = row.allele_symbol
+            # allele_name = row.allele_name
+            strain_accession_id = row.strain_accession_id
+            strain_name = row.strain_name
+            # project_name = row.project_name
+            project_fullname = row.project_fullname
+            pipeline_name = row.pipeline_name
+            pipeline_stable_id = row.pipeline_stable_id
+            procedure_stable_id = row.procedure_stable_id
+            procedure_name = row.procedure_name
+            parameter_stable_id = row.parameter_stable_id
+            parameter_name = row.parameter_name
+            # top_level_mp_term_id = row.top_level_mp_term_id
+            # top_level_mp_term_name = row.top_level_mp_term_name
+            mp_term_id = row.mp_term_id
+            mp_term_name = row.mp_term_name
+            p_value = row.p_value
+            percentage_change = row.percentage_change
+            effect_size = row.effect_size
+            statistical_method = row.statistical_method
+            resource_name = row.resource_name
+
+            # ##### cleanup some of the identifiers ######
+            zygosity = zygosity.strip()
+            zygosity_id = self.resolve(zygosity)
+            if zygosity_id == zygosity:
+                LOG.warning(
+                    "Zygosity '%s' unmapped. detting to indeterminate", zygosity)
+                zygosity_id = self.globaltt['indeterminate']
+
+            # colony ids sometimes have <> in them, spaces,
+            # or other non-alphanumerics and break our system;
+            # replace these with underscores
+            colony_id = '_:' + re.sub(r'\W+', '_', colony_raw)
+
+            if not re.match(r'MGI', allele_accession_id):
+                allele_accession_id = '_:IMPC-'+re.sub(
+                    r':', '', allele_accession_id)
+
+            if re.search(r'EUROCURATE', strain_accession_id):
+                # the eurocurate links don't resolve at IMPC
+                # TODO blank nodes do not maintain identifiers
+                strain_accession_id = '_:' + strain_accession_id
+
+            elif not re.match(r'MGI', strain_accession_id):
+                LOG.info(
+                    "Found a strange strain accession...%s", strain_accession_id)
+                strain_accession_id = 'IMPC:'+strain_accession_id
+
+            ######################
+            # first, add the marker and variant to the graph as with MGI,
+            # the allele is the variant locus.  IF the marker is not known,
+            # we will call it a sequence alteration.  otherwise,
+            # we will create a BNode for the sequence alteration.
+            sequence_alteration_id = variant_locus_id = None
+            variant_locus_name = sequence_alteration_name = None
+
+            # extract out what's within the <> to get the symbol
+            if re.match(r'.*<.*>', allele_symbol):
+                sequence_alteration_name = re.match(
+                    r'.*<(.*)>', allele_symbol)
+                if sequence_alteration_name is not None:
+                    sequence_alteration_name = sequence_alteration_name.group(1)
+            else:
+                sequence_alteration_name = allele_symbol
+
+            if marker_accession_id is not None and marker_accession_id == '':
+                LOG.warning("Marker unspecified on row %d", reader.line_num)
+                marker_accession_id = None
+
+            if marker_accession_id is not None:
+                variant_locus_id = allele_accession_id
+                variant_locus_name = allele_symbol
+                variant_locus_type = self.globaltt['variant_locus']
+                geno.addGene(
+                    marker_accession_id, marker_symbol, self.globaltt['gene'])
+
+                geno.addAllele(
+                    variant_locus_id, variant_locus_name, variant_locus_type, None)
+                geno.addAlleleOfGene(variant_locus_id, marker_accession_id)
+
+                # TAG bnode
+                sequence_alteration_id = '_:seqalt' + re.sub(
+                    r':', '', allele_accession_id)
+                geno.addSequenceAlterationToVariantLocus(
+                    sequence_alteration_id, variant_locus_id)
+
+            else:
+                sequence_alteration_id = allele_accession_id
+
+            # IMPC contains targeted mutations with either gene traps,
+            # knockouts, insertion/intragenic deletions.
+            # but I don't really know what the SeqAlt is here,
+            # so I don't add it.
+            geno.addSequenceAlteration(
+                sequence_alteration_id, sequence_alteration_name)
+
+            # #############    BUILD THE COLONY    #############
+            # First, let's describe the colony that the animals come from
+            # The Colony ID refers to the ES cell clone
+            #   used to generate a mouse strain.
+            # Terry sez: we use this clone ID to track
+            #   ES cell -> mouse strain -> mouse phenotyping.
+            # The same ES clone maybe used at multiple centers,
+            # so we have to concatenate the two to have a unique ID.
+            # some useful reading about generating mice from ES cells:
+            # http://ki.mit.edu/sbc/escell/services/details
+
+            # here, we'll make a genotype
+            # that derives from an ES cell with a given allele.
+            # the strain is not really attached to the colony.
+
+            # the colony/clone is reflective of the allele,  with unknown zygosity
+
+            stem_cell_class = self.globaltt['embryonic stem cell line']
+
+            if colony_id is None:
+                print(colony_raw, stem_cell_class, "\nline:\t", reader.line_num)
+            model.addIndividualToGraph(colony_id, colony_raw, stem_cell_class)
+
+            # vslc of the colony has unknown zygosity
+            # note that we will define the allele
+            # (and it's relationship to the marker, etc.) later
+            # FIXME is it really necessary to create this vslc
+            # when we always know it's unknown zygosity?
+            vslc_colony = '_:'+re.sub(
+                r':', '', allele_accession_id + self.globaltt['indeterminate'])
+            vslc_colony_label = allele_symbol + '/<?>'
+            # for ease of reading, we make the colony genotype variables.
+            # in the future, it might be desired to keep the vslcs
+            colony_genotype_id = vslc_colony
+            colony_genotype_label = vslc_colony_label
+            geno.addGenotype(colony_genotype_id, colony_genotype_label)
+            geno.addParts(
+                allele_accession_id, colony_genotype_id,
+                self.globaltt['has_variant_part'])
+
+            geno.addPartsToVSLC(
+                vslc_colony, allele_accession_id, None,
+                self.globaltt['indeterminate'], self.globaltt['has_variant_part'])
+            graph.addTriple(
+                colony_id, self.globaltt['has_genotype'], colony_genotype_id)
+
+            # ##########    BUILD THE ANNOTATED GENOTYPE    ##########
+            # now, we'll build the genotype of the individual that derives
+            # from the colony/clone genotype that is attached to
+            # phenotype = colony_id + strain + zygosity + sex
+            # (and is derived from a colony)
+
+            # this is a sex-agnostic genotype
+            genotype_id = self.make_id(
+                (colony_id + phenotyping_center + zygosity + strain_accession_id))
+            geno.addSequenceDerivesFrom(genotype_id, colony_id)
+
+            # build the VSLC of the sex-agnostic genotype
+            # based on the zygosity
+            allele1_id = allele_accession_id
+            allele2_id = allele2_rel = None
+            allele1_label = allele_symbol
+            allele2_label = '<?>'
+            # Making VSLC labels from the various parts,
+            # can change later if desired.
+            if zygosity == 'heterozygote':
+                allele2_label = re.sub(r'<.*', '<+>', allele1_label)
+                allele2_id = None
+            elif zygosity == 'homozygote':
+                allele2_label = allele1_label
+                allele2_id = allele1_id
+                allele2_rel = self.globaltt['has_variant_part']
+            elif zygosity == 'hemizygote':
+                allele2_label = re.sub(r'<.*', '<0>', allele1_label)
+                allele2_id = None
+            elif zygosity == 'not_applicable':
+                allele2_label = re.sub(r'<.*', '<?>', allele1_label)
+                allele2_id = None
+            else:
+                # passed over alone, as any chunk of the rows would be
+                LOG.warning("found unknown zygosity %s", zygosity)
+                continue
+            vslc_name = '/'.join((allele1_label, allele2_label))
+
+            # Add the VSLC
+            vslc_id = '-'.join(
+                (marker_accession_id, allele_accession_id, zygosity))
+            vslc_id = re.sub(r':', '', vslc_id)
+            vslc_id = '_:'+vslc_id
+            model.addIndividualToGraph(
+                vslc_id, vslc_name,
+                self.globaltt['variant single locus complement'])
+            geno.addPartsToVSLC(
+                vslc_id, allele1_id, allele2_id, zygosity_id,
+                self.globaltt['has_variant_part'], allele2_rel)
+
+            # add vslc to genotype
+            geno.addVSLCtoParent(vslc_id, genotype_id)
+
+            # note that the vslc is also the gvc
+            model.addType(vslc_id, self.globaltt['genomic_variation_complement'])
+
+            # Add the genomic background
+            # create the genomic background id and name
+            if strain_accession_id != '':
+                genomic_background_id = strain_accession_id
+            else:
+                genomic_background_id = None
+
+            genotype_name = vslc_name
+            if genomic_background_id is not None:
+                geno.addGenotype(
+                    genomic_background_id, strain_name,
+                    self.globaltt['genomic_background'])
+
+                # make a phenotyping-center-specific strain
+                # to use as the background
+                pheno_center_strain_label = strain_name + '-' + phenotyping_center \
+                    + '-' + colony_raw
+                pheno_center_strain_id = '-'.join((
+                    re.sub(r':', '', genomic_background_id),
+                    re.sub(r'\s', '_', phenotyping_center),
+                    re.sub(r'\W+', '', colony_raw)))
+                if not re.match(r'^_', pheno_center_strain_id):
+                    # Tag bnode
+                    pheno_center_strain_id = '_:' + pheno_center_strain_id
 
                 geno.addGenotype(
-                    sex_qualified_genotype_id, sex_qualified_genotype_label, sq_type_id)
-                geno.addParts(
-                    genotype_id, sex_qualified_genotype_id,
-                    self.globaltt['has_variant_part'])
-
-                if genomic_background_id is not None and genomic_background_id != '':
-                    # Add the taxon to the genomic_background_id
-                    geno.addTaxon(taxon_id, genomic_background_id)
-                else:
-                    # add it as the genomic background
-                    geno.addTaxon(taxon_id, genotype_id)
-
-                # #############    BUILD THE G2P ASSOC    #############
-                # from an old email dated July 23 2014:
-                # Phenotypes associations are made to
-                # imits colony_id+center+zygosity+gender
-
-                phenotype_id = mp_term_id
-
-                # it seems that sometimes phenotype ids are missing.
-                # indicate here
-                if phenotype_id is None or phenotype_id == '':
-                    LOG.warning(
-                        "No phenotype id specified for row %d: %s",
-                        reader.line_num, str(row))
-                    continue
-                # hard coded ECO code
-                eco_id = self.globaltt['mutant phenotype evidence']
-
-                # the association comes as a result of a g2p from
-                # a procedure in a pipeline at a center and parameter tested
-
-                assoc = G2PAssoc(
-                    graph, self.name, sex_qualified_genotype_id, phenotype_id)
-                assoc.add_evidence(eco_id)
-                # assoc.set_score(float(p_value))
-
-                # TODO add evidence instance using
-                # pipeline_stable_id +
-                # procedure_stable_id +
-                # parameter_stable_id
-
-                assoc.add_association_to_graph()
-                assoc_id = assoc.get_association_id()
-
-                model._addSexSpecificity(assoc_id, self.resolve(sex))
-
-                # add a free-text description
-                try:
-                    description = ' '.join((
-                        mp_term_name, 'phenotype determined by', phenotyping_center,
-                        'in an', procedure_name, 'assay where', parameter_name.strip(),
-                        'was measured with an effect_size of',
-                        str(round(float(effect_size), 5)),
-                        '(p =', "{:.4e}".format(float(p_value)), ').'))
-                except ValueError:
-                    description = ' '.join((
-                        mp_term_name, 'phenotype determined by', phenotyping_center,
-                        'in an', procedure_name, 'assay where', parameter_name.strip(),
-                        'was measured with an effect_size of', str(effect_size),
-                        '(p =', "{0}".format(p_value), ').'))
-
-                study_bnode = self._add_study_provenance(
-                    phenotyping_center, colony_raw, project_fullname, pipeline_name,
-                    pipeline_stable_id, procedure_stable_id, procedure_name,
-                    parameter_stable_id, parameter_name, statistical_method,
-                    resource_name)
-
-                evidence_line_bnode = self._add_evidence(
-                    assoc_id, eco_id, p_value, percentage_change, effect_size,
-                    study_bnode)
-
-                self._add_assertion_provenance(assoc_id, evidence_line_bnode)
-
-                model.addDescription(evidence_line_bnode, description)
-
-                # resource_id = resource_name
-                # assoc.addSource(graph, assoc_id, resource_id)
-
-                if not self.test_mode and limit is not None and reader.line_num > limit:
-                    break
+                    pheno_center_strain_id, pheno_center_strain_label,
+                    self.globaltt['genomic_background'])
+                geno.addSequenceDerivesFrom(
+                    pheno_center_strain_id, genomic_background_id)
+
+                # Making genotype labels from the various parts,
+                # can change later if desired.
+                # since the genotype is reflective of the place
+                # it got made, should put that in to disambiguate
+                genotype_name = \
+                    genotype_name + ' [' + pheno_center_strain_label + ']'
+                geno.addGenomicBackgroundToGenotype(
+                    pheno_center_strain_id, genotype_id)
+                geno.addTaxon(taxon_id, pheno_center_strain_id)
+            # this is redundant, but i'll keep in in for now
+            geno.addSequenceDerivesFrom(genotype_id, colony_id)
+            geno.addGenotype(genotype_id, genotype_name)
+
+            # Make the sex-qualified genotype,
+            # which is what the phenotype is associated with
+            sex_qualified_genotype_id = \
+                self.make_id((
+                    colony_id + phenotyping_center + zygosity +
+                    strain_accession_id + sex))
+            sex_qualified_genotype_label = genotype_name + ' (' + sex + ')'
+
+            sq_type_id = self.resolve(sex, False)
+
+            if sq_type_id == sex:
+                sq_type_id = self.globaltt['intrinsic_genotype']
+                LOG.warning(
+                    "Unknown sex qualifier %s, adding as intrinsic_genotype",
+                    sex)
+
+            geno.addGenotype(
+                sex_qualified_genotype_id, sex_qualified_genotype_label, sq_type_id)
+            geno.addParts(
+                genotype_id, sex_qualified_genotype_id,
+                self.globaltt['has_variant_part'])
+
+            if genomic_background_id is not None and genomic_background_id != '':
+                # Add the taxon to the genomic_background_id
+                geno.addTaxon(taxon_id, genomic_background_id)
+            else:
+                # add it as the genomic background
+                geno.addTaxon(taxon_id, genotype_id)
+
+            # #############    BUILD THE G2P ASSOC    #############
+            # from an old email dated July 23 2014:
+            # Phenotypes associations are made to
+            # imits colony_id+center+zygosity+gender
+
+            phenotype_id = mp_term_id
+
+            # it seems that sometimes phenotype ids are missing.
+            # indicate here
+            if phenotype_id is None or phenotype_id == '':
+                LOG.warning(
+                    "No phenotype id specified for row %d: %s",
+                    reader.line_num, str(row))
+                continue
+            # hard coded ECO code
+            eco_id = self.globaltt['mutant phenotype evidence']
+
+            # the association comes as a result of a g2p from
+            # a procedure in a pipeline at a center and parameter tested
+
+            assoc = G2PAssoc(
+                graph, self.name, sex_qualified_genotype_id, phenotype_id)
+            assoc.add_evidence(eco_id)
+            # assoc.set_score(float(p_value))
+
+            # TODO add evidence instance using
+            # pipeline_stable_id +
+            # procedure_stable_id +
+            # parameter_stable_id
+
+            assoc.add_association_to_graph()
+            assoc_id = assoc.get_association_id()
+
+            model._addSexSpecificity(assoc_id, self.resolve(sex))
+
+            # add a free-text description
+            try:
+                description = ' '.join((
+                    mp_term_name, 'phenotype determined by', phenotyping_center,
+                    'in an', procedure_name, 'assay where', parameter_name.strip(),
+                    'was measured with an effect_size of',
+                    str(round(float(effect_size), 5)),
+                    '(p =', "{:.4e}".format(float(p_value)), ').'))
+            except ValueError:
+                description = ' '.join((
+                    mp_term_name, 'phenotype determined by', phenotyping_center,
+                    'in an', procedure_name, 'assay where', parameter_name.strip(),
+                    'was measured with an effect_size of', str(effect_size),
+                    '(p =', "{0}".format(p_value), ').'))
+
+            study_bnode = self._add_study_provenance(
+                phenotyping_center, colony_raw, project_fullname, pipeline_name,
+                pipeline_stable_id, procedure_stable_id, procedure_name,
+                parameter_stable_id, parameter_name, statistical_method,
+                resource_name)
+
+            evidence_line_bnode = self._add_evidence(
+                assoc_id, eco_id, p_value, percentage_change, effect_size,
+                study_bnode)
+
+            self._add_assertion_provenance(assoc_id, evidence_line_bnode)
+
+            model.addDescription(evidence_line_bnode, description)
+
+            # resource_id = resource_name
+            # assoc.addSource(graph, assoc_id, resource_id)
 
     def _add_assertion_provenance(
             self,
@@ -756,7 +763,8 @@ class IMPC(Source):
             self.files['checksum']['file'])
         for md5, file in reference_checksums.items():
             if os.path.isfile('/'.join((self.rawdir, file))):
-                if self.get_file_md5(self.rawdir, file) != md5:
+                if self.get_file_checksum(
+                        '/'.join((self.rawdir, file)), 'md5') != md5:
                     is_match = False
                     LOG.warning('%s was not downloaded completely', file)
                     return is_match
@@ -1,6 +1,7 @@
 import re
 import gzip
 import logging
+import functools
 
 from dipper.sources.OMIMSource import OMIMSource
 from dipper.models.Model import Model
@@ -182,12 +183,9 @@ class NCBIGene(OMIMSource):
 
         # not unzipping the file
         LOG.info("Processing 'Gene Info' records")
-        line_counter = 0
-        gene_info = '/'.join((self.rawdir, self.files[src_key]['file']))
-        LOG.info("FILE: %s", gene_info)
+        LOG.info("FILE: %s", '/'.join((self.rawdir, self.files[src_key]['file'])))
         # Add taxa and genome classes for those in our filter
 
-        band_regex = re.compile(r'[0-9A-Z]+[pq](\d+)?(\.\d+)?$')
         for tax_num in self.tax_ids:
             tax_id = ':'.join(('NCBITaxon', tax_num))
             # tax label can get added elsewhere
@@ -195,179 +193,185 @@ class NCBIGene(OMIMSource):
             # label added elsewhere
             model.addClassToGraph(tax_id, None)
 
-        col = self.files[src_key]['columns']
-        with gzip.open(gene_info, 'rb') as tsv:
-            row = tsv.readline().decode().strip().split('\t')
-            row[0] = row[0][1:]  # strip comment
-            if not self.check_fileheader(col, row):
-                pass
-
-            for line in tsv:
-                line = line.strip()
-                line_counter += 1
-                if line[0] == '#':  # skip comments
-                    continue
-                row = line.decode().strip().split('\t')
-
-                # ##set filter=None in init if you don't want to have a filter
-                # if self.id_filter is not None:
-                #     if ((self.id_filter == 'taxids' and \
-                #          (tax_num not in self.tax_ids))
-                #           or (self.id_filter == 'geneids' and \
-                #               (int(gene_num) not in self.gene_ids))):
-                #         continue
-                # #### end filter
+        # ##set filter=None in init if you don't want to have a filter
+        # rows of other genes or taxa are passed over before they are split out
+        if self.test_mode:
+            select = {'GeneID': [str(gene_num) for gene_num in self.gene_ids]}
+        else:
+            select = {'tax_id': self.tax_ids}
+        # every row of our taxa is read, past the limit, to know its class_or_indiv
+        reader = self.read_table(src_key, select=select)
+        for class_or_indiv in self.process_rows(
+                reader, functools.partial(self._add_gene_info, limit=limit),
+                graph, limit):
+            self.class_or_indiv.update(class_or_indiv)
+
+    def _add_gene_info(self, reader, graph, limit=None):
+        """
+        Adds the genes of the gene_info rows the reader yields
+        (all of them, or a chunk of them in a worker process)
+        :param reader: TableReader of gene_info
+        :param graph:
+        :param limit:
+        :return: dict  of the genes added, id -> 'C' (class) or 'I' (individual)
 
-                tax_num = row[col.index('tax_id')]
-                gene_num = row[col.index('GeneID')]
-                symbol = row[col.index('Symbol')]
-                # = row[col.index('LocusTag')]
-                synonyms = row[col.index('Synonyms')].strip()
-                dbxrefs = row[col.index('dbXrefs')].strip()
-                chrom = row[col.index('chromosome')].strip()
-                map_loc = row[col.index('map_location')].strip()
-                desc = row[col.index('description')]
-                gtype = row[col.index('type_of_gene')].strip()
-                # = row[col.index('Symbol_from_nomenclature_authority')]
-                name = row[col.index('Full_name_from_nomenclature_authority')]
-                # = row[col.index('Nomenclature_status')]
-                other_designations = row[col.index('Other_designations')].strip()
-                # = row[col.index('Modification_date')}
-                # = row[col.index('Feature_type')]
+        """
+        geno = Genotype(graph)
+        model = Model(graph)
+        band_regex = re.compile(r'[0-9A-Z]+[pq](\d+)?(\.\d+)?$')
+        class_or_indiv = {}
+        for row in reader:
+            tax_num = row.tax_id
+            gene_num = row.GeneID
+            symbol = row.Symbol
+            # = row.LocusTag
+            synonyms = row.Synonyms.strip()
+            dbxrefs = row.dbXrefs.strip()
+            chrom = row.chromosome.strip()
+            map_loc = row.map_location.strip()
+            desc = row.description
+            gtype = row.type_of_gene.strip()
+            # = row.Symbol_from_nomenclature_authority
+            name = row.Full_name_from_nomenclature_authority
+            # = row.Nomenclature_status
+            other_designations = row.Other_designations.strip()
+            # = row.Modification_date
+            # = row.Feature_type
+            # lines of the file after its header, as were counted
+            line_counter = reader.line_num - 1
 
-                if self.test_mode and int(gene_num) not in self.gene_ids:
-                    continue
-                if not self.test_mode and tax_num not in self.tax_ids:
+            tax_id = ':'.join(('NCBITaxon', tax_num))
+            gene_id = ':'.join(('NCBIGene', gene_num))
+
+            gene_type_id = self.resolve(gtype)
+
+            if symbol == 'NEWENTRY':
+                label = None
+            else:
+                label = symbol
+            # sequence feature, not a gene
+            if gene_type_id == self.globaltt['sequence_feature']:
+                self.class_or_indiv[gene_id] = 'I'
+            else:
+                self.class_or_indiv[gene_id] = 'C'
+            class_or_indiv[gene_id] = self.class_or_indiv[gene_id]
+
+            if not self.test_mode and limit is not None and line_counter > limit:
+                continue
+
+            if self.class_or_indiv[gene_id] == 'C':
+                model.addClassToGraph(gene_id, label, gene_type_id, desc)
+                # NCBI will be the default leader (for non mods),
+                # so we will not add the leader designation here.
+            else:
+                model.addIndividualToGraph(gene_id, label, gene_type_id, desc)
+                # in this case, they aren't genes.
+                # so we want someone else to be the leader
+
+            if name != '-':
+                model.addSynonym(gene_id, name)
+            if synonyms != '-':
+                for syn in synonyms.split('|'):
+                    model.addSynonym(
+                        gene_id, syn.strip(), model.globaltt['has_related_synonym'])
+            if other_designations != '-':
+                for syn in other_designations.split('|'):
+                    model.addSynonym(
+                        gene_id, syn.strip(), model.globaltt['has_related_synonym'])
+            if dbxrefs != '-':
+                self._add_gene_equivalencies(dbxrefs, gene_id, tax_id)
+
+            # edge cases of id | symbol | chr | map_loc:
+            # 263     AMD1P2    X|Y  with   Xq28 and Yq12
+            # 438     ASMT      X|Y  with   Xp22.3 or Yp11.3    # in PAR
+            # no idea why there's two bands listed - possibly 2 assemblies
+            # 419     ART3      4    with   4q21.1|4p15.1-p14
+            # 28227   PPP2R3B   X|Y  Xp22.33; Yp11.3            # in PAR
+            # this is of "unknown" type == susceptibility
+            # 619538  OMS     10|19|3 10q26.3;19q13.42-q13.43;3p25.3
+            # unlocated scaffold
+            # 101928066       LOC101928066    1|Un    -\
+            # mouse --> 2C3
+            # 11435   Chrna1  2       2 C3|2 43.76 cM
+            # mouse --> 11B1.1
+            # 11548   Adra1b  11      11 B1.1|11 25.81 cM
+            # 11717   Ampd3   7       7 57.85 cM|7 E2-E3        # mouse
+            # 14421   B4galnt1        10      10 D3|10 74.5 cM  # mouse
+            # 323212  wu:fb92e12      19|20   -                 # fish
+            # 323368  ints10  6|18    -                         # fish
+            # 323666  wu:fc06e02      11|23   -                 # fish
+
+            # feel that the chr placement can't be trusted in this table
+            # when there is > 1 listed
+            # with the exception of human X|Y,
+            # we will only take those that align to one chr
+
+            # FIXME remove the chr mapping below
+            # when we pull in the genomic coords
+            if chrom != '-' and chrom != '':
+                if re.search(r'\|', chrom) and chrom not in ['X|Y', 'X; Y']:
+                    # means that there's uncertainty in the mapping.
+                    # so skip it
+                    # TODO we'll need to figure out how to deal with
+                    # >1 loc mapping
+                    LOG.info(
+                        '%s is non-uniquely mapped to %s. Skipping for now.',
+                        gene_id, chrom)
                     continue
-                tax_id = ':'.join(('NCBITaxon', tax_num))
-                gene_id = ':'.join(('NCBIGene', gene_num))
-
-                gene_type_id = self.resolve(gtype)
-
-                if symbol == 'NEWENTRY':
-                    label = None
-                else:
-                    label = symbol
-                # sequence feature, not a gene
-                if gene_type_id == self.globaltt['sequence_feature']:
-                    self.class_or_indiv[gene_id] = 'I'
-                else:
-                    self.class_or_indiv[gene_id] = 'C'
+                    # X|Y	Xp22.33;Yp11.3
+
+                # if(not re.match(
+                #        r'(\d+|(MT)|[XY]|(Un)$',str(chr).strip())):
+                #    print('odd chr=',str(chr))
+                if chrom == 'X; Y':
+                    chrom = 'X|Y'  # rewrite the PAR regions for processing
+                # do this in a loop to allow PAR regions like X|Y
+                for chromosome in re.split(r'\|', chrom):
+                    # assume that the chromosome label is added elsewhere
+                    geno.addChromosomeClass(chromosome, tax_id, None)
+                    mychrom = makeChromID(chromosome, tax_num, 'CHR')
+                    # temporarily use taxnum for the disambiguating label
+                    mychrom_syn = makeChromLabel(chromosome, tax_num)
+                    model.addSynonym(mychrom, mychrom_syn)
+
+                    band_match = re.match(band_regex, map_loc)
+                    if band_match is not None and len(band_match.groups()) > 0:
+                        # if tax_num != '9606':
+                        #     continue
+                        # this matches the regular kind of chrs,
+                        # so make that kind of band
+                        # not sure why this matches?
+                        #   chrX|Y or 10090chr12|Un"
+                        # TODO we probably need a different regex
+                        # per organism
+                        # the maploc_id already has the numeric chromosome
+                        # in it, strip it first
+                        bid = re.sub(r'^' + chromosome, '', map_loc)
+                        # the generic location (no coordinates)
+                        maploc_id = makeChromID(chromosome + bid, tax_num, 'CHR')
+                        # print(map_loc,'-->',bid,'-->',maploc_id)
+                        # Assume it's type will be added elsewhere
+                        band = Feature(graph, maploc_id, None, None)
+                        band.addFeatureToGraph()
+                        # add the band as the containing feature
+                        graph.addTriple(
+                            gene_id,
+                            self.globaltt['is subsequence of'],
+                            maploc_id)
+                    else:
+                        # TODO handle these cases: examples are:
+                        # 15q11-q22,Xp21.2-p11.23,15q22-qter,10q11.1-q24,
+                        # 12p13.3-p13.2|12p13-p12,1p13.3|1p21.3-p13.1,
+                        # 12cen-q21,22q13.3|22q13.3
+                        LOG.debug(
+                            'not regular band pattern for %s: %s', gene_id, map_loc)
+                        # add the gene as a subsequence of the chromosome
+                        graph.addTriple(
+                            gene_id, self.globaltt['is subsequence of'], mychrom)
 
-                if not self.test_mode and limit is not None and line_counter > limit:
-                    continue
+            geno.addTaxon(tax_id, gene_id)
 
-                if self.class_or_indiv[gene_id] == 'C':
-                    model.addClassToGraph(gene_id, label, gene_type_id, desc)
-                    # NCBI will be the default leader (for non mods),
-                    # so we will not add the leader designation here.
-                else:
-                    model.addIndividualToGraph(gene_id, label, gene_type_id, desc)
-                    # in this case, they aren't genes.
-                    # so we want someone else to be the leader
-
-                if name != '-':
-                    model.addSynonym(gene_id, name)
-                if synonyms != '-':
-                    for syn in synonyms.split('|'):
-                        model.addSynonym(
-                            gene_id, syn.strip(), model.globaltt['has_related_synonym'])
-                if other_designations != '-':
-                    for syn in other_designations.split('|'):
-                        model.addSynonym(
-                            gene_id, syn.strip(), model.globaltt['has_related_synonym'])
-                if dbxrefs != '-':
-                    self._add_gene_equivalencies(dbxrefs, gene_id, tax_id)
-
-                # edge cases of id | symbol | chr | map_loc:
-                # 263     AMD1P2    X|Y  with   Xq28 and Yq12
-                # 438     ASMT      X|Y  with   Xp22.3 or Yp11.3    # in PAR
-                # no idea why there's two bands listed - possibly 2 assemblies
-                # 419     ART3      4    with   4q21.1|4p15.1-p14
-                # 28227   PPP2R3B   X|Y  Xp22.33; Yp11.3            # in PAR
-                # this is of "unknown" type == susceptibility
-                # 619538  OMS     10|19|3 10q26.3;19q13.42-q13.43;3p25.3
-                # unlocated scaffold
-                # 101928066       LOC101928066    1|Un    -\
-                # mouse --> 2C3
-                # 11435   Chrna1  2       2 C3|2 43.76 cM
-                # mouse --> 11B1.1
-                # 11548   Adra1b  11      11 B1.1|11 25.81 cM
-                # 11717   Ampd3   7       7 57.85 cM|7 E2-E3        # mouse
-                # 14421   B4galnt1        10      10 D3|10 74.5 cM  # mouse
-                # 323212  wu:fb92e12      19|20   -                 # fish
-                # 323368  ints10  6|18    -                         # fish
-                # 323666  wu:fc06e02      11|23   -                 # fish
-
-                # feel that the chr placement can't be trusted in this table
-                # when there is > 1 listed
-                # with the exception of human X|Y,
-                # we will only take those that align to one chr
-
-                # FIXME remove the chr mapping below
-                # when we pull in the genomic coords
-                if chrom != '-' and chrom != '':
-                    if re.search(r'\|', chrom) and chrom not in ['X|Y', 'X; Y']:
-                        # means that there's uncertainty in the mapping.
-                        # so skip it
-                        # TODO we'll need to figure out how to deal with
-                        # >1 loc mapping
-                        LOG.info(
-                            '%s is non-uniquely mapped to %s. Skipping for now.',
-                            gene_id, chrom)
-                        continue
-                        # X|Y	Xp22.33;Yp11.3
-
-                    # if(not re.match(
-                    #        r'(\d+|(MT)|[XY]|(Un)$',str(chr).strip())):
-                    #    print('odd chr=',str(chr))
-                    if chrom == 'X; Y':
-                        chrom = 'X|Y'  # rewrite the PAR regions for processing
-                    # do this in a loop to allow PAR regions like X|Y
-                    for chromosome in re.split(r'\|', chrom):
-                        # assume that the chromosome label is added elsewhere
-                        geno.addChromosomeClass(chromosome, tax_id, None)
-                        mychrom = makeChromID(chromosome, tax_num, 'CHR')
-                        # temporarily use taxnum for the disambiguating label
-                        mychrom_syn = makeChromLabel(chromosome, tax_num)
-                        model.addSynonym(mychrom, mychrom_syn)
-
-                        band_match = re.match(band_regex, map_loc)
-                        if band_match is not None and len(band_match.groups()) > 0:
-                            # if tax_num != '9606':
-                            #     continue
-                            # this matches the regular kind of chrs,
-                            # so make that kind of band
-                            # not sure why this matches?
-                            #   chrX|Y or 10090chr12|Un"
-                            # TODO we probably need a different regex
-                            # per organism
-                            # the maploc_id already has the numeric chromosome
-                            # in it, strip it first
-                            bid = re.sub(r'^' + chromosome, '', map_loc)
-                            # the generic location (no coordinates)
-                            maploc_id = makeChromID(chromosome + bid, tax_num, 'CHR')
-                            # print(map_loc,'-->',bid,'-->',maploc_id)
-                            # Assume it's type will be added elsewhere
-                            band = Feature(graph, maploc_id, None, None)
-                            band.addFeatureToGraph()
-                            # add the band as the containing feature
-                            graph.addTriple(
-                                gene_id,
-                                self.globaltt['is subsequence of'],
-                                maploc_id)
-                        else:
-                            # TODO handle these cases: examples are:
-                            # 15q11-q22,Xp21.2-p11.23,15q22-qter,10q11.1-q24,
-                            # 12p13.3-p13.2|12p13-p12,1p13.3|1p21.3-p13.1,
-                            # 12cen-q21,22q13.3|22q13.3
-                            LOG.debug(
-                                'not regular band pattern for %s: %s', gene_id, map_loc)
-                            # add the gene as a subsequence of the chromosome
-                            graph.addTriple(
-                                gene_id, self.globaltt['is subsequence of'], mychrom)
-
-                geno.addTaxon(tax_id, gene_id)
+        return class_or_indiv
 
     def _add_gene_equivalencies(self, xrefs, gene_id, taxon):
         """
@@ -595,7 +599,8 @@ class NCBIGene(OMIMSource):
 
         return test_suite
 
-    def add_orthologs_by_gene_group(self, graph, gene_ids):
+    @classmethod
+    def add_orthologs_by_gene_group(cls, graph, gene_ids, rawdir=None, globaltt=None):
         """
         This will get orthologies between human and other vertebrate genomes
         based on the gene_group annotation pipeline from NCBI.
@@ -609,16 +614,23 @@ class NCBIGene(OMIMSource):
         and should not be considered complete.
 
         We do not run this within the NCBI parser itself;
-        rather it is a convenience function for others parsers to call.
+        rather it is a convenience function for others parsers to call,
+        without making an NCBIGene ingest (which would open its output).
 
         :param graph:
         :param gene_ids:  Gene ids to fetch the orthology
+        :param rawdir: str  where gene_group was fetched (default raw/ncbigene)
+        :param globaltt: dict  the global translation table (default the graph's)
         :return:
 
         """
+        if rawdir is None:
+            rawdir = cls.get_rawdir()
+        if globaltt is None:
+            globaltt = graph.globaltt
         src_key = 'gene_group'
         LOG.info("getting gene groups")
-        src_file = '/'.join((self.rawdir, self.files[src_key]['file']))
+        src_file = '/'.join((rawdir, cls.files[src_key]['file']))
         found_counter = 0
         # because many of the orthologous groups are grouped by human gene,
         # we need to do this by generating two-way hash
@@ -631,12 +643,12 @@ class NCBIGene(OMIMSource):
         group_to_orthology = {}
         gene_to_group = {}
         gene_to_taxon = {}
-        col = self.files[src_key]['columns']
+        col = cls.files[src_key]['columns']
 
         with gzip.open(src_file, 'rb') as tsv:
             row = tsv.readline().decode().strip().split('\t')
             row[0] = row[0][1:]  # strip octothorp
-            if not self.check_fileheader(col, row):
+            if not cls.check_fileheader(col, row):
                 pass
             for row in tsv:
                 row = row.decode().strip().split('\t')
@@ -675,10 +687,10 @@ class NCBIGene(OMIMSource):
                     if orthologs is not None:
                         for orth in orthologs:
                             oid = 'NCBIGene:' + str(orth)
-                            model.addClassToGraph(oid, None, self.globaltt['gene'])
+                            model.addClassToGraph(oid, None, globaltt['gene'])
                             otaxid = 'NCBITaxon:' + str(gene_to_taxon[orth])
                             geno.addTaxon(otaxid, oid)
-                            assoc = OrthologyAssoc(graph, self.name, gid, oid)
+                            assoc = OrthologyAssoc(graph, 'ncbigene', gid, oid)
                             assoc.add_source('PMID:24063302')
                             assoc.add_association_to_graph()
                             # todo get gene label for orthologs -
@@ -70,6 +70,11 @@ class OMIA(OMIMSource):
         },
     }
 
+    # orthology is pulled from NCBI's gene_group file
+    dependencies = {
+        'NCBIGene': ['gene_group'],
+    }
+
     def __init__(self, graph_type, are_bnodes_skolemized):
 
         super().__init__(
@@ -123,12 +128,7 @@ class OMIA(OMIMSource):
         :return:
         """
         self.get_files(is_dl_forced)
-
-        ncbi = NCBIGene(self.graph_type, self.are_bnodes_skized)
-        # ncbi.fetch()
-        gene_group = ncbi.files['gene_group']
-        self.fetch_from_url(
-            gene_group['url'], '/'.join((ncbi.rawdir, gene_group['file'])), False)
+        self.fetch_dependencies()
 
     def parse(self, limit=None):
         # names of tables to iterate - probably don't need all these:
@@ -165,8 +165,7 @@ class OMIA(OMIMSource):
 
         # process the vertebrate orthology for genes
         # that are annotated with phenotypes
-        ncbi = NCBIGene(self.graph_type, self.are_bnodes_skized)
-        ncbi.add_orthologs_by_gene_group(self.graph, self.annotated_genes)
+        NCBIGene.add_orthologs_by_gene_group(self.graph, self.annotated_genes)
 
         LOG.info("Done parsing.")
 
@@ -1,15 +1,17 @@
-import tarfile
 import re
 import logging
+import functools
 
 from dipper.sources.Source import Source
 from dipper.models.assoc.OrthologyAssoc import OrthologyAssoc
-from dipper.models.Model import Model
 
 __author__ = 'nicole'
 
 LOG = logging.getLogger(__name__)
 
+# triples of orthologs added to the graph at once
+BATCH_TRIPLES = 2 ** 14
+
 
 class Panther(Source):
     """
@@ -86,6 +88,11 @@ class Panther(Source):
         else:
             self.tax_ids = [str(x) for x in tax_ids]
 
+        # remembered as they are translated & cleaned up
+        self.species_taxon = None
+        self.ortholog_rels = {}
+        self.gene_curies = {}
+
         if 'protein' in self.all_test_ids:
             self.test_ids = self.all_test_ids['protein']
         else:
@@ -163,138 +170,187 @@ class Panther(Source):
 
         else:
             graph = self.graph
-        model = Model(graph)
+
+        # the files are parsed at once when there are processes to spare
         unprocessed_gene_ids = set()  # may be faster to make a set after
+        for unprocessed in self.process_files(
+                list(self.files), functools.partial(self._add_orthologs, limit=limit),
+                graph):
+            unprocessed_gene_ids.update(unprocessed)
+
+        # make report on unprocessed_gene_ids
+        LOG.warning(
+            "The following gene ids were unable to be processed: %s",
+            str(unprocessed_gene_ids))
+
+    def _add_orthologs(self, src_key, graph, limit=None):
+        """
+        Adds the orthologs of one of the files to the graph, a batch of
+        triples at a time, as OrthologyAssoc adds them
+        (see _ortholog_triples).
+        Rows of other species are passed over before they are split.
+
+        :param src_key:
+        :param graph:
+        :param limit:
+        :return: set of the gene ids of the file we could not make curies of
 
-        for src_key in self.files:
-            src_file = '/'.join((self.rawdir, self.files[src_key]['file']))
-            matchcounter = line_counter = 0
-            col = self.files[src_key]['columns']
-            reader = tarfile.open(src_file, 'r:gz')
-
-            # assume that the first entry is the item
-            fname = reader.getmembers()[0]
-            LOG.info("Parsing %s", fname.name)
-
-            with reader.extractfile(fname) as csvfile:
-                for line in csvfile:
-                    # skip comment lines
-                    if re.match(r'^#', line.decode()):
-                        LOG.info("Skipping header line")
-                        continue
-                    line_counter += 1
-
-                    # a little feedback to the user since there's so many
-                    if line_counter % 1000000 == 0:
-                        LOG.info(
-                            "Processed %d lines from %s",
-                            line_counter, fname.name)
-
-                    line = line.decode().strip()
-                    row = line.split('\t')
-                    # parse each row. ancestor_taxons is unused
-                    # HUMAN|Ensembl=ENSG00000184730|UniProtKB=Q0VD83
-                    #   	MOUSE|MGI=MGI=2176230|UniProtKB=Q8VBT6
-                    #       	LDO	Euarchontoglires	PTHR15964
-                    thing1 = row[col.index('thing1')].strip()
-                    thing2 = row[col.index('thing2')].strip()
-                    orthology_class = row[col.index('orthology_class')].strip()
-                    # ancestor_taxons  = row[col.index('')].strip()
-                    panther_id = row[col.index('panther_id')].strip()
-
-                    (species_a, gene_a, protein_a) = thing1.split('|')
-                    (species_b, gene_b, protein_b) = thing2.split('|')
-
-                    # skip the entries that don't have homolog relationships
-                    # with the test ids
-                    if self.test_mode and not (
-                            re.sub(r'UniProtKB=', '',
-                                   protein_a) in self.test_ids or
-                            re.sub(r'UniProtKB=', '', protein_b)
-                            in self.test_ids):
-                        continue
-
-                    # map the taxon abbreviations to ncbi taxon id numbers
-                    taxon_a = self.resolve(species_a).split(':')[1].strip()
-                    taxon_b = self.resolve(species_b).split(':')[1].strip()
-
-                    # ###uncomment the following code block
-                    # if you want to filter based on taxid of favorite animals
-                    # taxids = [9606,10090,10116,7227,7955,6239,8355]
-                    # taxids = [9606] #human only
-                    # retain only those orthologous relationships to genes
-                    # in the specified taxids
-                    # using AND will get you only those associations where
-                    # gene1 AND gene2 are in the taxid list (most-filter)
-                    # using OR will get you any associations where
-                    # gene1 OR gene2 are in the taxid list (some-filter)
-                    if self.tax_ids is not None and \
-                            (taxon_a not in self.tax_ids) and \
-                            (taxon_b not in self.tax_ids):
-                        continue
-                    else:
-                        matchcounter += 1
-                        if limit is not None and matchcounter > limit:
-                            break
-
-                    # ### end code block for filtering on taxon
-
-                    # fix the gene identifiers
-                    gene_a = re.sub(r'=', ':', gene_a)
-                    gene_b = re.sub(r'=', ':', gene_b)
-
-                    clean_gene = self._clean_up_gene_id(
-                        gene_a, species_a, self.curie_map)
-                    if clean_gene is None:
-                        unprocessed_gene_ids.add(gene_a)
-                    gene_a = clean_gene
-                    clean_gene = self._clean_up_gene_id(
-                        gene_b, species_b, self.curie_map)
-                    if clean_gene is None:
-                        unprocessed_gene_ids.add(gene_b)
-                    gene_b = clean_gene
-
-                    # a special case here; mostly some rat genes
-                    # they use symbols instead of identifiers.  will skip
-                    if gene_a is None or gene_b is None:
-                        continue
-
-                    rel = self.resolve(orthology_class)
-
-                    evidence_id = self.globaltt['phylogenetic evidence']
-
-                    # add the association and relevant nodes to graph
-                    assoc = OrthologyAssoc(graph, self.name, gene_a, gene_b, rel)
-                    assoc.add_evidence(evidence_id)
-
-                    # add genes to graph;
-                    # assume labels will be taken care of elsewhere
-                    model.addClassToGraph(gene_a, None)
-                    model.addClassToGraph(gene_b, None)
-
-                    # might as well add the taxon info for completeness
-                    graph.addTriple(
-                        gene_a, self.globaltt['in taxon'], 'NCBITaxon:' + taxon_a)
-                    graph.addTriple(
-                        gene_b, self.globaltt['in taxon'], 'NCBITaxon:' + taxon_b)
-
-                    assoc.add_association_to_graph()
-
-                    # note this is incomplete...
-                    # it won't construct the full family hierarchy,
-                    # just the top-grouping
-                    assoc.add_gene_family_to_graph(
-                        ':'.join(('PANTHER', panther_id)))
-
-                    if not self.test_mode \
-                            and limit is not None and line_counter > limit:
-                        break
-                # make report on unprocessed_gene_ids
-
-            LOG.info("finished processing %s", src_file)
-            LOG.warning(
-                "The following gene ids were unable to be processed: %s",
-                str(unprocessed_gene_ids))
+        """
+        src_file = '/'.join((self.rawdir, self.files[src_key]['file']))
+        matchcounter = line_counter = 0
+        unprocessed_gene_ids = set()
+        evidence_id = self.globaltt['phylogenetic evidence']
+        species_taxon = self.get_species_taxa()
+
+        # OR filter: a line naming one of our species, before either is checked
+        prefilter = None
+        if self.tax_ids is not None:
+            prefilter = r'(?:^|\t)(?:{})\|'.format('|'.join(
+                re.escape(species) for (species, taxon) in species_taxon.items()
+                if taxon in self.tax_ids))
+
+        # the first (only) table in the tar; its comment lines are skipped
+        reader = self.read_table(src_key, header=False, strip=True, prefilter=prefilter)
+        LOG.info("Parsing %s", src_file)
+
+        triples = []
+        for row in reader:
+            line_counter = reader.rows_read
+
+            # a little feedback to the user since there's so many
+            if line_counter % 1000000 == 0:
+                LOG.info(
+                    "Processed %d lines from %s",
+                    line_counter, src_file)
+
+            # parse each row. ancestor_taxons is unused
+            # HUMAN|Ensembl=ENSG00000184730|UniProtKB=Q0VD83
+            #   	MOUSE|MGI=MGI=2176230|UniProtKB=Q8VBT6
+            #       	LDO	Euarchontoglires	PTHR15964
+            thing1 = row.thing1
+            thing2 = row.thing2
+            orthology_class = row.orthology_class
+            # ancestor_taxons  = row.ancestor_taxon
+            panther_id = row.panther_id
+
+            (species_a, gene_a, protein_a) = thing1.split('|')
+            (species_b, gene_b, protein_b) = thing2.split('|')
+
+            # skip the entries that don't have homolog relationships
+            # with the test ids
+            if self.test_mode and not (
+                    protein_a.replace('UniProtKB=', '') in self.test_ids or
+                    protein_b.replace('UniProtKB=', '') in self.test_ids):
+                continue
+
+            # map the taxon abbreviations to ncbi taxon id numbers
+            taxon_a = species_taxon.get(species_a) or self._get_taxon(species_a)
+            taxon_b = species_taxon.get(species_b) or self._get_taxon(species_b)
+
+            # ###uncomment the following code block
+            # if you want to filter based on taxid of favorite animals
+            # taxids = [9606,10090,10116,7227,7955,6239,8355]
+            # taxids = [9606] #human only
+            # retain only those orthologous relationships to genes
+            # in the specified taxids
+            # using AND will get you only those associations where
+            # gene1 AND gene2 are in the taxid list (most-filter)
+            # using OR will get you any associations where
+            # gene1 OR gene2 are in the taxid list (some-filter)
+            if self.tax_ids is not None and \
+                    (taxon_a not in self.tax_ids) and \
+                    (taxon_b not in self.tax_ids):
+                continue
+            else:
+                matchcounter += 1
+                if limit is not None and matchcounter > limit:
+                    break
+
+            # ### end code block for filtering on taxon
+
+            # fix the gene identifiers
+            clean_gene = self._get_gene_curie(gene_a, species_a)
+            if clean_gene is None:
+                unprocessed_gene_ids.add(gene_a.replace('=', ':'))
+            gene_a = clean_gene
+            clean_gene = self._get_gene_curie(gene_b, species_b)
+            if clean_gene is None:
+                unprocessed_gene_ids.add(gene_b.replace('=', ':'))
+            gene_b = clean_gene
+
+            # a special case here; mostly some rat genes
+            # they use symbols instead of identifiers.  will skip
+            if gene_a is None or gene_b is None:
+                continue
+
+            rel = self.ortholog_rels.get(orthology_class)
+            if rel is None:
+                rel = self.ortholog_rels[orthology_class] = self.resolve(orthology_class)
+
+            # note the gene family is incomplete...
+            # it won't construct the full family hierarchy,
+            # just the top-grouping
+            triples += self._ortholog_triples(
+                graph, gene_a, gene_b, rel, evidence_id, taxon_a, taxon_b,
+                ':'.join(('PANTHER', panther_id)))
+            if len(triples) >= BATCH_TRIPLES:
+                graph.addTriples(triples)
+                triples = []
+
+            if not self.test_mode \
+                    and limit is not None and line_counter > limit:
+                break
+
+        graph.addTriples(triples)
+        LOG.info("finished processing %s", src_file)
+        return unprocessed_gene_ids
+
+    def get_species_taxa(self):
+        """
+        :return: dict  of the species abbreviations panther uses (i.e. HUMAN)
+                 to their NCBITaxon numbers, as translated
+        """
+        if self.species_taxon is None:
+            self.species_taxon = {}
+            for word in self.localtt:
+                term_id = self.resolve(word, False)
+                if term_id.startswith('NCBITaxon:'):
+                    self.species_taxon[word] = term_id.split(':')[1].strip()
+        return self.species_taxon
+
+    def _get_taxon(self, species):
+        taxon = self.species_taxon[species] = self.resolve(species).split(':')[1].strip()
+        return taxon
+
+    def _get_gene_curie(self, gene, species):
+        """
+        The _clean_up_gene_id of a gene as panther has it, i.e. MGI=MGI=97490
+        (remembered, most genes are in many pairs)
+        :return: str or None
+        """
+        key = (gene, species)
+        if key not in self.gene_curies:
+            self.gene_curies[key] = self._clean_up_gene_id(
+                gene.replace('=', ':'), species, self.curie_map)
+        return self.gene_curies[key]
+
+    def _ortholog_triples(
+            self, graph, gene_a, gene_b, rel, evidence_id, taxon_a, taxon_b, family_id):
+        """
+        The triples an OrthologyAssoc of the pair adds, with the genes as
+        classes in their taxa and members of the family, to be added to
+        the graph in batches
+
+        :return: list of addTriples tuples
+        """
+        assoc = OrthologyAssoc(graph, self.name, gene_a, gene_b, rel)
+        assoc.add_evidence(evidence_id)
+        in_taxon = self.globaltt['in taxon']
+        return (
+            assoc.model.class_triples(gene_a) + assoc.model.class_triples(gene_b) + [
+                (gene_a, in_taxon, 'NCBITaxon:' + taxon_a),
+                (gene_b, in_taxon, 'NCBITaxon:' + taxon_b)] +
+            assoc.association_triples() + assoc.gene_family_triples(family_id))
 
     @staticmethod
     def _clean_up_gene_id(geneid, species, curie_map):
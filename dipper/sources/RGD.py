@@ -1,10 +1,9 @@
 import logging
 
-from ontobio.io.gafparser import GafParser
 from dipper.sources.Source import Source
-from dipper.models.assoc.Association import Assoc
 from dipper.models.Model import Model
 from dipper.models.Reference import Reference
+from dipper.utils.GafUtil import GafAssociations, read_gaf
 
 __author__ = 'timputman'
 
@@ -35,6 +34,8 @@ class RGD(Source):
             # file_handle=None
         )
         self.dataset.set_citation('https://rgd.mcw.edu/wg/citing-rgd/')
+        # evidence codes are mapped by our translation tables
+        self.gaf = GafAssociations(self)
 
     def fetch(self, is_dl_forced=False):
         """
@@ -61,43 +62,31 @@ class RGD(Source):
 
         rgd_file = '/'.join(
             (self.rawdir, self.files['rat_gene2mammalian_phenotype']['file']))
-        # ontobio gafparser implemented here
-        p = GafParser()
-        assocs = p.parse(open(rgd_file, "r"))
-
-        for i, assoc in enumerate(assocs):
-            if 'relation' in assoc.keys():
-                self.make_association(assoc)
-            if limit is not None and i > limit:
-                break
+        for row in read_gaf(rgd_file, limit=limit):
+            self.make_association(row)
         return
 
-    def make_association(self, record):
+    def make_association(self, row):
         """
         contstruct the association
-        :param record:
+        :param row: GafRow of the gaf file (NOT annotations are not read)
         :return: modeled association of  genotype to mammalian phenotype
         """
         model = Model(self.graph)
 
-        record['relation']['id'] = self.resolve("has phenotype")
         # define the triple
-        gene = record['subject']['id']
-        relation = record['relation']['id']
-        phenotype = record['object']['id']
-
-        # instantiate the association
-        g2p_assoc = Assoc(self.graph, self.name, sub=gene, obj=phenotype, pred=relation)
+        gene = self.gaf.get_gene_id(row)
+        relation = self.resolve("has phenotype")
+        phenotype = row.go_id
 
         # add the references
-        references = record['evidence']['has_supporting_reference']
         # created RGDRef prefix in curie map to route to proper reference URL in RGD
         references = [
-            x.replace('RGD', 'RGDRef') if 'PMID' not in x else x for x in references]
+            'RGDRef:' + ref[4:] if ref.startswith('RGD:') else ref
+            for ref in self.gaf.get_references(row)]
 
         if len(references) > 0:
             # make first ref in list the source
-            g2p_assoc.add_source(identifier=references[0])
             ref_model = Reference(
                 self.graph, references[0],
                 self.globaltt['publication']
@@ -111,9 +100,9 @@ class RGD(Source):
             for ref in references[1:]:
                 model.addSameIndividual(sub=references[0], obj=ref)
 
-        # add the date created on
-        g2p_assoc.add_date(date=record['date'])
-        g2p_assoc.add_evidence(self.resolve(record['evidence']['type']))  # ?set where?
-        g2p_assoc.add_association_to_graph()
+        # with the date created on
+        self.gaf.add_association(
+            self.graph, gene, phenotype, relation,
+            self.gaf.get_evidence(row.evidence_code), references[:1], row.date)
 
         return
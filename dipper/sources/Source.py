@@ -5,6 +5,7 @@ import time
 import logging
 import urllib
 import csv
+import importlib
 from datetime import datetime
 from stat import ST_CTIME, ST_SIZE
 
@@ -12,11 +13,16 @@ import yaml
 from dipper.graph.RDFGraph import RDFGraph
 from dipper.graph.StreamedGraph import StreamedGraph
 from dipper.utils.GraphUtils import GraphUtils
+from dipper.utils.SortUtil import sort_ntriples
+from dipper.utils.FetchUtil import FetchUtil, FetchMetadata, ContentStore
+from dipper.utils.TranslationUtil import load_table, compose
+from dipper.utils.MetricsUtil import Metrics, count_rows
+from dipper.utils.TableUtil import TableReader
+from dipper.utils.ShardUtil import process_sharded, process_each
 from dipper.models.Model import Model
 from dipper.models.Dataset import Dataset
 
 LOG = logging.getLogger(__name__)
-CHUNK = 16 * 1024  # read remote urls of unknown size in 16k chunks
 USER_AGENT = "The Monarch Initiative (https://monarchinitiative.org/; " \
              "info@monarchinitiative.org)"
 
@@ -38,9 +44,39 @@ class Source:
     namespaces = {}
     files = {}
 
+    # files belonging to other ingests which this ingest also reads
+    # as {'OtherSourceClass': ['key in its files dict', ...]}
+    # the scheduler in dipper-etl.py fetches each of these only once per run
+    dependencies = {}
+
+    # pooled connections & per host limits, shared by every ingest in a process
+    # an ingest may set its own i.e. FetchUtil(workers=1) for a fragile server
+    fetcher = FetchUtil()
+
+    # how a streamed_graph is written, the same for every ingest in a process
+    # (None, 'gzip' or 'zstd'; see StreamedGraph.open)
+    stream_compression = None
+    stream_threaded = False     # compress & write in a background thread
+    stream_dedup = None         # None, 'exact' or 'bloom'
+    stream_sort = False         # sort & uniquify the output once written
+    stream_fmt = 'nt'           # nt, nquads, turtle, n3 or rdfxml
+
+    # processes parsing each of the large tables an ingest reads with
+    # process_rows, the same for every ingest in a process
+    parse_shards = 1
+
+    # output file name suffix of each serialization format
+    fmt_ext = {
+        'rdfxml': 'xml',
+        'turtle': 'ttl',
+        'nt': 'nt',         # ntriples
+        'nquads':  'nq',
+        'n3': 'n3'          # notation3
+    }
+
     def __init__(
             self,
-            graph_type='rdf_graph',     # or streamed_graph
+            graph_type='rdf_graph',     # or compact_graph, sqlite_graph, streamed_graph
             are_bnodes_skized=False,    # typically True
             name=None,                  # identifier; make an IRI for nquads
             ingest_title=None,
@@ -67,6 +103,8 @@ class Source:
         LOG.info("Processing Source \"%s\"", self.name)
         self.test_only = False
         self.path = ""
+        # 'SourceClass:file_key' dependencies already fetched during this run
+        self.fetched_artifacts = set()
         # to be used to store a subset of data for testing downstream.
         self.triple_count = 0
         self.outdir = 'out'
@@ -96,26 +134,51 @@ class Source:
         # note: tools such as protoge need slolemized blank nodes
         self.testgraph = RDFGraph(True, self.testname)
 
-        if graph_type == 'rdf_graph':
-            graph_id = ':MONARCH_' + str(self.name) + "_" + \
-                datetime.now().isoformat(' ').split()[0]
+        graph_id = ':MONARCH_' + str(self.name) + "_" + \
+            datetime.now().isoformat(' ').split()[0]
 
+        if graph_type == 'rdf_graph':
             LOG.info("Creating graph  %s", graph_id)
             self.graph = RDFGraph(are_bnodes_skized, graph_id)
 
+        elif graph_type == 'compact_graph':
+            LOG.info("Creating compact graph  %s", graph_id)
+            # numpy is only needed by the compact graph
+            from dipper.graph.CompactGraph import CompactGraph
+            self.graph = CompactGraph(are_bnodes_skized, graph_id)
+
+        elif graph_type == 'sqlite_graph':
+            dbfile = '/'.join((self.outdir, self.name + '.sqlite'))
+            LOG.info("Creating graph  %s in %s", graph_id, dbfile)
+            from dipper.graph.SQLiteGraph import SQLiteGraph
+            self.graph = SQLiteGraph(are_bnodes_skized, graph_id, dbfile)
+
         elif graph_type == 'streamed_graph':
-            # need to expand on export formats
-            dest_file = open(pth + '/' + name + '.nt', 'w')    # where is the close?
-            self.graph = StreamedGraph(are_bnodes_skized, dest_file)
+            dest_file = '/'.join((
+                self.outdir,
+                self.name + '.' + self.fmt_ext.get(self.stream_fmt, self.stream_fmt)))
+            if self.stream_compression is not None:
+                dest_file += StreamedGraph.compression_ext[self.stream_compression]
+            self.streamfile = dest_file
+            LOG.info("Streaming graph %s to %s", graph_id, dest_file)
+            self.graph = StreamedGraph(
+                are_bnodes_skized, graph_id,
+                StreamedGraph.open(dest_file, self.stream_compression),
+                fmt=self.stream_fmt, threaded=self.stream_threaded,
+                dedup=self.stream_dedup)
             # leave test files as turtle (better human readibility)
         else:
             LOG.error(
                 "%s graph type not supported\n"
-                "valid types: rdf_graph, streamed_graph", graph_type)
+                "valid types: rdf_graph, compact_graph, sqlite_graph, streamed_graph",
+                graph_type)
 
         # pull in global ontology mapping datastructures
         self.globaltt = self.graph.globaltt
         self.globaltcid = self.graph.globaltcid
+        # what resolve() makes of each word, added to as words are first met
+        self.resolvett = compose(self.localtt, self.globaltt)
+        self.unresolved = set()     # words resolve() has reported
 
         self.curie_map = self.graph.curie_map
         # self.prefix_base = {v: k for k, v in self.curie_map.items()}
@@ -126,6 +189,8 @@ class Source:
         self.test_mode = False
 
         # this may eventually support Bagits
+        # the description is small and always written as turtle by write()
+        # so it is kept in memory whatever the graph_type
         self.dataset = Dataset(
             self.archive_url,
             self.ingest_title,
@@ -133,13 +198,17 @@ class Source:
             None,           # description
             license_url,    # only _OUR_ lic
             data_rights,    # tries to point to others lics
-            graph_type,
+            'rdf_graph',
             file_handle
         )
 
         for graph in [self.graph, self.testgraph]:
             self.declareAsOntology(graph)
 
+        # seconds, triples and rows of each _process_* method (and stage)
+        self.metrics = Metrics(self.name)
+        self.metrics.instrument(self)
+
     def fetch(self, is_dl_forced=False):
         """
         abstract method to fetch all data from an external resource.
@@ -172,20 +241,12 @@ class Source:
         :return: None
 
         """
-        fmt_ext = {
-            'rdfxml': 'xml',
-            'turtle': 'ttl',
-            'nt': 'nt',         # ntriples
-            'nquads':  'nq',
-            'n3': 'n3'          # notation3
-        }
-
         # make the regular graph output file
         dest = None
         if self.name is not None:
             dest = '/'.join((self.outdir, self.name))
-            if fmt in fmt_ext:
-                dest = '.'.join((dest, fmt_ext.get(fmt)))
+            if fmt in self.fmt_ext:
+                dest = '.'.join((dest, self.fmt_ext.get(fmt)))
             else:
                 dest = '.'.join((dest, fmt))
             LOG.info("Setting outfile to %s", dest)
@@ -220,7 +281,36 @@ class Source:
         else:
             LOG.error("I don't understand our stream.")
             return
-        gu.write(self.graph, fmt, filename=outfile)
+        if isinstance(self.graph, StreamedGraph):
+            # already written (in self.stream_fmt) as it was parsed
+            self.close()
+            if self.stream_sort and self.graph.fmt in ('nt', 'nquads'):
+                sort_ntriples(self.streamfile)
+            elif self.stream_sort:
+                LOG.warning("Only nt and nquads are sorted, not %s", self.graph.fmt)
+        else:
+            gu.write(self.graph, fmt, filename=outfile)
+            self.close()
+
+    def flush(self):
+        """
+        Make sure triples streamed so far are in the output file
+        (or those added to an sqlite_graph are in its database)
+        :return: None
+        """
+        if isinstance(self.graph, StreamedGraph):
+            self.graph.flush()
+        elif self.graph_type == 'sqlite_graph':
+            self.graph.commit()
+
+    def close(self):
+        """
+        Finish the output of a streamed graph, or the file of an sqlite_graph.
+        Called by write(), or call once parse() is done when not writing.
+        :return: None
+        """
+        if isinstance(self.graph, StreamedGraph) or self.graph_type == 'sqlite_graph':
+            self.graph.close()
 
     def whoami(self):
         '''
@@ -260,7 +350,8 @@ class Source:
         """
         return 'b' + hashlib.sha1(wordage.encode('utf-8')).hexdigest()[1:20]
 
-    def checkIfRemoteIsNewer(self, remote, local, headers):
+    @classmethod
+    def checkIfRemoteIsNewer(cls, remote, local, headers):
         """
         Given a remote file location, and the corresponding local file
         this will check the datetime stamp on the files to see if the remote
@@ -284,7 +375,7 @@ class Source:
 
         # get remote file details
         if headers is None:
-            headers = self._get_default_request_headers()
+            headers = cls._get_default_request_headers()
 
         req = urllib.request.Request(remote, headers=headers)
         LOG.info("Request header: %s", str(req.header_items()))
@@ -348,6 +439,7 @@ class Source:
         fstat = None
         if files is None:
             files = self.files
+        jobs = []
         for fname in files:
             headers = None
             filesource = files[fname]
@@ -362,11 +454,15 @@ class Source:
                 self.dataset.setFileAccessUrl(filesource['url'])
                 LOG.info('Fetching %s', filesource['url'])
 
-            self.fetch_from_url(
+            jobs.append((
                 filesource['url'], '/'.join((self.rawdir, filesource['file'])),
-                is_dl_forced, headers)
+                is_dl_forced, headers))
+
+        # files are fetched concurrently
+        self.fetcher.fetch_all(self.fetch_from_url, jobs)
 
-            fstat = os.stat('/'.join((self.rawdir, filesource['file'])))
+        for job in jobs:
+            fstat = os.stat(job[1])
 
         # only keeping the date from the last file
         filedate = datetime.utcfromtimestamp(fstat[ST_CTIME]).strftime("%Y-%m-%d")
@@ -375,55 +471,163 @@ class Source:
         # change this so the date is attached only to each file, not the entire dataset
         self.dataset.set_date_issued(filedate)
 
+    @classmethod
+    def get_artifacts(cls):
+        """
+        Name each file this ingest needs from other ingests
+        :return: list of 'SourceClass:file_key' strings
+        """
+        return [
+            ':'.join((src, key))
+            for src in sorted(cls.dependencies) for key in cls.dependencies[src]]
+
+    @staticmethod
+    def get_source_class(src):
+        """
+        :param src: str name of a Source subclass (and its module)
+        :return: the class
+        """
+        module = importlib.import_module("dipper.sources." + src)
+        return getattr(module, src)
+
+    @classmethod
+    def get_rawdir(cls):
+        """
+        The raw directory of an ingest, without making the ingest.
+        An ingest whose files others depend on is named after its class.
+        :return: str
+        """
+        return '/'.join(('raw', cls.__name__.lower()))
+
+    @staticmethod
+    def fetch_artifact(artifact, is_dl_forced=False):
+        """
+        Fetch a single file into the raw directory of the ingest it belongs to.
+        The owning ingest is not made, which would open (and so truncate)
+        its output graph as well.
+        :param artifact: str 'SourceClass:file_key'
+        :return: dict of the file's metadata (None if it was not fetched)
+        """
+        (src, key) = artifact.split(':')
+        owner = Source.get_source_class(src)
+        rawdir = owner.get_rawdir()
+        if not os.path.exists(rawdir):
+            os.makedirs(rawdir)
+        filesource = owner.files[key]
+        LOG.info('Fetching %s', filesource['url'])
+        return owner.fetch_from_url(
+            filesource['url'], '/'.join((rawdir, filesource['file'])),
+            is_dl_forced, filesource.get('headers'))
+
+    def fetch_dependencies(self, is_dl_forced=False):
+        """
+        Fetch the files declared in `self.dependencies`
+        skipping any the scheduler has already fetched during this run.
+        :return: None
+        """
+        for artifact in self.get_artifacts():
+            if artifact in self.fetched_artifacts:
+                LOG.info("Already fetched %s during this run", artifact)
+                continue
+            self.fetch_artifact(artifact, is_dl_forced)
+            self.fetched_artifacts.add(artifact)
+
+    @classmethod
     def fetch_from_url(
-            self, remotefile, localfile=None, is_dl_forced=False, headers=None):
+            cls, remotefile, localfile=None, is_dl_forced=False, headers=None):
         """
         Given a remote url and a local filename, attempt to determine
         if the remote file is newer; if it is,
         fetch the remote file and save it to the specified localfile,
-        reporting the basic file information once it is downloaded
+        reporting the basic file information once it is downloaded.
+
+        For http(s) what was fetched is recorded in the `FetchMetadata`
+        of the local file's directory, and the download is made conditional
+        on the remote file having changed since (one round trip if it has not).
+        ftp falls back to comparing the remote size and date to the local file.
+        Downloads land in `<localfile>.part` until complete; an interrupted
+        http download resumes from there (see `FetchUtil.download`).
+
         :param remotefile: URL of remote file to fetch
         :param localfile: pathname of file to save locally
-        :return: None
+        :return: dict of the file's metadata (None if it was not fetched)
 
         """
 
-        response = None
-        if ((is_dl_forced is True) or localfile is None or
-                (self.checkIfRemoteIsNewer(remotefile, localfile, headers))):
-            # TODO url verification, etc
-            if headers is None:
-                headers = self._get_default_request_headers()
-
-            request = urllib.request.Request(remotefile, headers=headers)
-            response = urllib.request.urlopen(request)
-
-            if localfile is not None:
-                with open(localfile, 'wb') as binwrite:
-                    while True:
-                        chunk = response.read(CHUNK)
-                        if not chunk:
-                            break
-                        binwrite.write(chunk)
-
-                LOG.info("Finished.  Wrote file to %s", localfile)
-                if self.compare_local_remote_bytes(remotefile, localfile, headers):
-                    LOG.debug("local file is same size as remote after download")
-                else:
-                    raise Exception(
-                        "Error downloading file: local file size  != remote file size")
-
-                fstat = os.stat(localfile)
-                LOG.info("file size: %s", fstat[ST_SIZE])
-                LOG.info(
-                    "file created: %s", time.asctime(time.localtime(fstat[ST_CTIME])))
-            else:
-                LOG.error('Local filename is required')
-                exit(-1)
+        if localfile is None:
+            LOG.error('Local filename is required')
+            exit(-1)
+
+        if headers is None:
+            headers = cls._get_default_request_headers()
+
+        entry = None
+        if remotefile[:4] == 'http':
+            cached = None
+            if not is_dl_forced and os.path.exists(localfile):
+                cached = FetchMetadata.for_directory(
+                    os.path.dirname(localfile)).get(os.path.basename(localfile))
+                if cached is None or cached.get('size') != \
+                        cls.get_local_file_size(localfile):
+                    # fetched before metadata was kept, or since altered
+                    cached = FetchUtil.describe_local(localfile)
+
+            entry = cls.fetcher.download(remotefile, localfile, headers, cached)
+            if not entry['changed'] and entry['sha256'] is None:
+                entry.update(FetchUtil.get_file_checksums(localfile))
+            cls.store_fetched(localfile, entry)
+            if not entry['changed']:
+                LOG.info("Using existing file %s", localfile)
+                return entry
+
+        elif is_dl_forced is True or \
+                cls.checkIfRemoteIsNewer(remotefile, localfile, headers):
+            entry = cls.fetcher.download(remotefile, localfile, headers)
+            cls.store_fetched(localfile, entry)
         else:
             LOG.info("Using existing file %s", localfile)
+            return entry
+
+        LOG.info("Finished.  Wrote file to %s", localfile)
+        fstat = os.stat(localfile)
+        LOG.info("file size: %s", fstat[ST_SIZE])
+        LOG.info(
+            "file created: %s", time.asctime(time.localtime(fstat[ST_CTIME])))
+
+        return entry
 
-        return response
+    @staticmethod
+    def store_fetched(localfile, entry):
+        """
+        Share the contents of a fetched file through the `ContentStore`
+        and record it in the `FetchMetadata` of its directory
+        :param localfile: str  path of the fetched file
+        :param entry: dict  its metadata, as `FetchUtil.download` returns
+        :return: None
+        """
+        directory = os.path.dirname(localfile)
+        ContentStore.for_directory(directory).add(localfile, entry['sha256'])
+        entry['mtime'] = int(os.stat(localfile).st_mtime)
+        FetchMetadata.for_directory(directory).set(
+            os.path.basename(localfile), entry)
+
+    def get_file_checksum(self, localfile, algorithm='sha256'):
+        """
+        The checksum taken as the file was downloaded, so long as the file
+        is unchanged since; otherwise read the file to compute it.
+        :param localfile: str
+        :param algorithm: str  'sha256' or 'md5'
+        :return: str  hex digest
+        """
+        entry = FetchMetadata.for_directory(
+            os.path.dirname(localfile)).get(os.path.basename(localfile))
+        fstat = os.stat(localfile)
+        if entry is not None and entry.get(algorithm) is not None and \
+                entry.get('size') == fstat[ST_SIZE] and \
+                entry.get('mtime') == int(fstat.st_mtime):
+            return entry[algorithm]
+        LOG.info("No recorded %s for %s, reading it", algorithm, localfile)
+        return FetchUtil.get_file_checksums(localfile)[algorithm]
 
     # TODO: rephrase as mysql-dump-xml specific format
     def process_xml_table(self, elem, table_name, processing_function, limit):
@@ -455,11 +659,66 @@ class Source:
                     row[atts['name']] = field.text
                 processing_function(row)
                 line_counter += 1
+                count_rows()
                 if self.test_mode and limit is not None and line_counter > limit:
                     continue
 
             elem.clear()  # discard the element
 
+    def read_table(self, src_key, limit=None, select=None, **kwargs):
+        """
+        A TableReader over one of this source's raw files,
+        expecting the columns listed for it in `self.files`
+
+        :param src_key: key of the file in `self.files`
+        :param limit: int  rows to read, at most
+        :param select: dict  column name -> values; only rows with these are read
+        :param kwargs: passed on to TableReader (delimiter, header, strip ...)
+        :return: TableReader of namedtuples of the columns
+        """
+        entry = self.files[src_key]
+        kwargs.setdefault('columns', entry.get('columns'))
+        return TableReader(
+            '/'.join((self.rawdir, entry['file'])), limit=limit, select=select,
+            **kwargs)
+
+    def process_rows(self, reader, transform, graph, limit=None):
+        """
+        Have transform(reader, graph) parse the rows of a table, in
+        `parse_shards` processes if there are several (see ShardUtil):
+        each then parses a chunk of the rows, with a copy of the reader.
+        The test subset or a limited parse is always read in this process.
+
+        :param reader: TableReader (see read_table)
+        :param transform: function (reader, graph) adding the rows it iterates
+                          over to the graph; it may return something of them
+        :param graph: the graph to add to
+        :param limit: int  the parse's limit
+        :return: list of what transform returned, for each chunk in file order
+        """
+        if self.parse_shards < 2 or self.test_mode or limit is not None \
+                or reader.limit is not None:
+            return [transform(reader, graph)]
+        return process_sharded(self, reader, transform, graph, self.parse_shards)
+
+    def process_files(self, src_keys, transform, graph):
+        """
+        Have transform(src_key, graph) parse each of these files,
+        in as many as `parse_shards` processes (see ShardUtil),
+        their triples added in the order of the keys either way.
+        The test subset is always read in this process.
+
+        :param src_keys: list of keys of `self.files`
+        :param transform: function (src_key, graph)
+        :param graph: the graph to add to
+        :return: list of what transform returned for each file
+        """
+        if self.parse_shards < 2 or self.test_mode:
+            return [transform(src_key, graph) for src_key in src_keys]
+        return process_each(
+            self, transform, [(src_key,) for src_key in src_keys], graph,
+            self.parse_shards)
+
     @staticmethod
     def _check_list_len(row, length):
         """
@@ -468,6 +727,7 @@ class Source:
         :param length
         :return:None
         """
+        count_rows()
         if len(row) != length:
             raise Exception(
                 "row length does not match expected length of " +
@@ -675,9 +935,10 @@ class Source:
         with open(filename, 'r', encoding=encoding, newline=r'\n') as filereader:
             contents = filereader.read()
         contents = re.sub(r'\r', '', contents)
-        with open(filename, "w") as filewriter:
-            filewriter.truncate()
+        # replace rather than rewrite, the file may be shared (see ContentStore)
+        with open(filename + '.tmp', "w") as filewriter:
             filewriter.write(contents)
+        os.replace(filename + '.tmp', filename)
 
     @staticmethod
     def open_and_parse_yaml(yamlfile):
@@ -744,20 +1005,15 @@ class Source:
         '---\n# %s.yaml\n"": ""  # example'
         '''
 
-        localtt_file = '../../translationtable/' + name + '.yaml'
+        localtt_file = os.path.join(
+            os.path.dirname(__file__), '../../translationtable/' + name + '.yaml')
 
-        try:
-            with open(os.path.join(os.path.dirname(__file__), localtt_file)):
-                pass
-        except IOError:
+        if not os.path.exists(localtt_file):
             # write a stub file as a place holder if none exists
-            with open(os.path.join(os.path.dirname(__file__),
-                                   localtt_file), 'w') as write_yaml:
+            with open(localtt_file, 'w') as write_yaml:
                 print('---\n# %s.yaml\n"": ""  # example' % name, file=write_yaml)
-        finally:
-            with open(os.path.join(os.path.dirname(__file__),
-                                   localtt_file), 'r') as read_yaml:
-                localtt = yaml.safe_load(read_yaml)
+        # compiled once, shared by every ingest of this name (see TranslationUtil)
+        localtt = load_table(localtt_file)
 
         # inverse local translation.
         # note: keeping this invertable will be work.
@@ -778,6 +1034,10 @@ class Source:
         This may be specialized further from any mapping
         to a global mapping only; if need be.
 
+        Each word is looked up once in the composite of the two
+        built with the ingest (see TranslationUtil.compose);
+        a word without a translation is reported the first time only.
+
         :param word:  the srting to find as a key in translation tables
         :param  mandatory: boolean to cauae failure when no key exists
 
@@ -790,22 +1050,22 @@ class Source:
 
         assert word is not None
 
+        if word in self.resolvett:
+            return self.resolvett[word]
+
         # we may not agree with a remote sources use of a global term we have
         # this provides opportunity for us to override
         if word in self.localtt:
-            label = self.localtt[word]
-            if label in self.globaltt:
-                term_id = self.globaltt[label]
-            else:
-                logging.info(
-                    "Translated to '%s' but no global term_id for: '%s'", label, word)
-                term_id = label
-        elif word in self.globaltt:
-            term_id = self.globaltt[word]
+            term_id = self.localtt[word]
+            logging.info(
+                "Translated to '%s' but no global term_id for: '%s'", term_id, word)
+            self.resolvett[word] = term_id
         else:
             if mandatory:
                 raise KeyError("Mapping required for: ", word)
-            logging.warning("We have no translation for: '%s'", word)
+            if word not in self.unresolved:
+                logging.warning("We have no translation for: '%s'", word)
+                self.unresolved.add(word)
 
             if default is not None:
                 term_id = default
@@ -129,8 +129,8 @@ class StringDB(Source):
 
         protein_paths = self._get_file_paths(self.tax_ids, 'protein_links')
         col = ['NCBI taxid', 'entrez', 'STRING']
+        ensembl = Ensembl(self.graph_type, self.are_bnodes_skized)
         for taxon in protein_paths:
-            ensembl = Ensembl(self.graph_type, self.are_bnodes_skized)
             string_file_path = '/'.join((
                 self.rawdir, protein_paths[taxon]['file']))
 
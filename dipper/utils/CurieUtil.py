@@ -26,8 +26,24 @@ class CurieUtil(object):
             self.uri_map = {}
             for key, value in curie_map.items():
                 self.uri_map[value] = key
+            self.uri_trie = self._build_trie(self.uri_map)
         return
 
+    @staticmethod
+    def _build_trie(uri_map):
+        '''
+        Character trie of the URI prefixes,
+        nested dicts with the CURIE prefix under the key None
+        where a URI prefix ends.
+        '''
+        trie = {}
+        for uri, prefix in uri_map.items():
+            node = trie
+            for char in uri:
+                node = node.setdefault(char, {})
+            node[None] = prefix
+        return trie
+
     def get_curie(self, uri):
         '''Get a CURIE from a URI '''
         prefix = self.get_curie_prefix(uri)
@@ -37,11 +53,40 @@ class CurieUtil(object):
         return None
 
     def get_curie_prefix(self, uri):
-        ''' Return the CURIE's prefix:'''
-        for key, value in self.uri_map.items():
-            if uri.startswith(key):
-                return value
-        return None
+        '''
+        Return the CURIE's prefix:
+        that of the longest URI prefix the URI starts with
+        '''
+        prefix = None
+        node = self.uri_trie
+        for char in uri:
+            node = node.get(char)
+            if node is None:
+                break
+            prefix = node.get(None, prefix)
+        return prefix
+
+    def get_curies(self, uris):
+        '''
+        Get a CURIE for each of a column of URIs
+        :param uris: iterable of str
+        :return: list of CURIE or None where there is no matching prefix
+        '''
+        known = {}  # identifiers in a column tend to repeat
+        curies = []
+        for uri in uris:
+            if uri not in known:
+                known[uri] = self.get_curie(uri)
+            curies.append(known[uri])
+        return curies
+
+    def get_uris(self, curies):
+        '''
+        Get a URI for each of a column of CURIEs
+        :param curies: iterable of str
+        :return: list of URI or None where the CURIE can not be expanded
+        '''
+        return [self.get_uri(curie) for curie in curies]
 
     def get_uri(self, curie):
         ''' Get a URI from a CURIE '''
@@ -0,0 +1,149 @@
+import logging
+import hashlib
+import math
+import os
+import sqlite3
+import tempfile
+
+LOG = logging.getLogger(__name__)
+
+# bytes of blake2b digest kept per item;
+# 128 bits makes a collision in billions of triples vanishingly unlikely
+DIGEST_SIZE = 16
+
+
+def digest(text):
+    '''
+    :param text: str
+    :return: bytes  fixed size digest of the text
+    '''
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=DIGEST_SIZE).digest()
+
+
+class BloomFilter:
+    """
+    Fixed memory set membership, with false positives at about `error_rate`
+    once `capacity` items are in.  Items are digests (see `digest()`)
+    so their bits supply the hash functions.
+    """
+
+    def __init__(self, capacity=10 ** 8, error_rate=0.001):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        # double hashing: two 64 bit halves of the digest generate the rest
+        hash1 = int.from_bytes(item[:8], 'little')
+        hash2 = int.from_bytes(item[8:16], 'little') | 1
+        return [(hash1 + num * hash2) % self.size for num in range(self.hashes)]
+
+    def add(self, item):
+        '''
+        :param item: bytes digest
+        :return: bool  True if the item was (certainly) not in the filter before
+        '''
+        is_new = False
+        for pos in self._positions(item):
+            byte, bit = divmod(pos, 8)
+            if not self.bits[byte] & (1 << bit):
+                self.bits[byte] |= 1 << bit
+                is_new = True
+        if is_new:
+            self.count += 1
+        return is_new
+
+    def __contains__(self, item):
+        for pos in self._positions(item):
+            byte, bit = divmod(pos, 8)
+            if not self.bits[byte] & (1 << bit):
+                return False
+        return True
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        self.bits = bytearray()
+
+
+class DigestSet:
+    """
+    Exact set of digests (see `digest()`) which holds up to `max_memory` of
+    them in memory, then spills them to an SQLite table in `spill_dir`.
+    A Bloom filter over the spilled digests means the table is only read
+    for (probable) repeats, not for every new item.
+    """
+
+    def __init__(self, max_memory=2 ** 23, spill_dir=None):
+        self.max_memory = max_memory
+        self.spill_dir = spill_dir
+        self.memory = set()
+        self.spilled = None     # Bloom filter of what is in the table
+        self.dbfile = None
+        self.dbconn = None
+        self.count = 0
+
+    def add(self, item):
+        '''
+        :param item: bytes digest
+        :return: bool  True if the item was not in the set before
+        '''
+        if item in self.memory:
+            return False
+        if self.spilled is not None and item in self.spilled and \
+                self.dbconn.execute(
+                    'SELECT 1 FROM seen WHERE digest = ?', (item,)).fetchone():
+            return False
+        self.memory.add(item)
+        self.count += 1
+        if len(self.memory) >= self.max_memory:
+            self._spill()
+        return True
+
+    def __contains__(self, item):
+        return item in self.memory or (
+            self.spilled is not None and item in self.spilled and
+            self.dbconn.execute(
+                'SELECT 1 FROM seen WHERE digest = ?', (item,)).fetchone() is not None)
+
+    def __len__(self):
+        return self.count
+
+    def _spill(self):
+        if self.dbconn is None:
+            handle, self.dbfile = tempfile.mkstemp(
+                prefix='dedup_', suffix='.sqlite', dir=self.spill_dir)
+            os.close(handle)
+            self.dbconn = sqlite3.connect(self.dbfile)
+            self.dbconn.execute('PRAGMA journal_mode = OFF')
+            self.dbconn.execute('PRAGMA synchronous = OFF')
+            self.dbconn.execute(
+                'CREATE TABLE seen (digest BLOB PRIMARY KEY) WITHOUT ROWID')
+            # sized for some multiple of what fits in memory;
+            # a false positive only costs a read of the table
+            self.spilled = BloomFilter(capacity=self.max_memory * 8, error_rate=0.01)
+        LOG.info(
+            "Spilling %i digests to %s (%i so far)",
+            len(self.memory), self.dbfile, self.count)
+        # sorted inserts keep the b-tree appends mostly sequential
+        self.dbconn.executemany(
+            'INSERT INTO seen VALUES (?)', ((item,) for item in sorted(self.memory)))
+        self.dbconn.commit()
+        for item in self.memory:
+            self.spilled.add(item)
+        self.memory = set()
+
+    def close(self):
+        '''
+        Release the memory and remove the spill file
+        '''
+        self.memory = set()
+        if self.dbconn is not None:
+            self.dbconn.close()
+            os.remove(self.dbfile)
+            self.dbconn = None
+            self.spilled = None
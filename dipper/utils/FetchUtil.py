@@ -0,0 +1,489 @@
+import os
+import logging
+import threading
+import time
+import hashlib
+import urllib
+import concurrent.futures
+from datetime import datetime
+from email.utils import formatdate
+
+import yaml
+import requests
+import urllib3
+
+LOG = logging.getLogger(__name__)
+
+CHUNK = 1024 * 1024     # stream downloads in 1M chunks
+CHECKSUMS = ('sha256', 'md5')   # taken of every file as it is downloaded
+PROGRESS = 30           # seconds between progress reports on a single download
+
+
+class IncompleteDownload(IOError):
+    """
+    The connection closed before all of the remote file arrived
+    """
+
+
+# failures part way through a transfer, worth resuming
+# (connecting is already retried by the session's adapter; 404s are final)
+RETRYABLE = (
+    IncompleteDownload,
+    requests.exceptions.ChunkedEncodingError,
+    ConnectionError,    # socket resets reading ftp
+    TimeoutError,
+)
+
+
+class FetchUtil:
+    """
+    Shared machinery for fetching the remote files of a Source.
+
+    Downloads over http(s) go through one pooled `requests.Session`
+    so connections to a host are kept alive and reused between files.
+    The number of simultaneous downloads from any one host is capped,
+    independently of how many worker threads are fetching in total.
+    ftp urls still go through urllib, one connection per file.
+
+    """
+
+    def __init__(self, workers=4, host_limit=2, timeout=300, retries=5):
+        '''
+        :param workers: int  files fetched concurrently by `fetch_all()`
+        :param host_limit: int  simultaneous downloads allowed from one host
+        :param timeout: int  seconds to wait on a stalled connection
+        :param retries: int  attempts at completing an interrupted download
+        '''
+        self.workers = workers
+        self.host_limit = host_limit
+        self.timeout = timeout
+        self.retries = retries
+
+        self.session = requests.Session()
+        # keep the bytes exactly as served, as urllib would
+        self.session.headers['Accept-Encoding'] = 'identity'
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=workers, pool_maxsize=host_limit, max_retries=3)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self._host_slots = {}
+        self._lock = threading.Lock()
+
+    def host_slot(self, url):
+        '''
+        :param url: str
+        :return: semaphore limiting the concurrent downloads from url's host
+        '''
+        host = urllib.parse.urlsplit(url).netloc
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(
+                    self.host_limit)
+            return self._host_slots[host]
+
+    def open(self, url, headers=None):
+        '''
+        Start streaming a remote file.
+        The caller must close() the response.
+
+        :param url: str  http(s) or ftp url
+        :param headers: dict  request headers
+        :return: response with `status`, `headers` and `read(size)`
+        '''
+        if url[:4] == 'http':
+            response = self.session.get(
+                url, headers=headers, stream=True, timeout=self.timeout)
+            if response.status_code != 304:     # Not Modified is no error
+                response.raise_for_status()
+            return _StreamedResponse(response)
+        request = urllib.request.Request(url, headers=headers or {})
+        return urllib.request.urlopen(request, timeout=self.timeout)
+
+    def download(self, url, localfile, headers=None, cached=None):
+        '''
+        Stream a remote file into localfile, logging throughput as it goes.
+        When the metadata recorded for the local copy is supplied the request
+        is made conditional on the remote file having changed since,
+        so a file we already have costs one round trip (a 304 Not Modified).
+
+        The file is written to `<localfile>.part` and only renamed
+        to localfile once it is complete and its size verified.
+        An interrupted http transfer is retried, resuming with a Range
+        request from where the `.part` file left off,
+        provided the remote file is still the same (If-Range).
+        A `.part` left by an earlier run is resumed the same way.
+
+        :param url: str
+        :param localfile: str  path to write
+        :param headers: dict  request headers
+        :param cached: dict  metadata (see `FetchMetadata`) of the local copy
+        :return: dict  metadata of the file; its 'changed' is False
+            when the local copy was kept
+        '''
+        for attempt in range(1, self.retries + 1):
+            try:
+                return self._download(url, localfile, headers, cached)
+            except RETRYABLE as err:
+                if attempt == self.retries:
+                    LOG.error(
+                        "Giving up on %s after %i attempts; "
+                        "the partial download is kept to resume later", url, attempt)
+                    raise
+                LOG.warning(
+                    "Download of %s interrupted (%s), resuming. Attempt %i of %i",
+                    url, err, attempt + 1, self.retries)
+        return None
+
+    def _download(self, url, localfile, headers, cached):
+        part = localfile + '.part'
+        partmeta = part + '.yaml'   # which version of the remote file is in part
+
+        headers = dict(headers or {})
+        if cached is not None and url[:4] == 'http':
+            if cached.get('etag') is not None:
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified') is not None:
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        partial = self._read_partial(url, part, partmeta)
+        if partial is not None:
+            headers['Range'] = 'bytes={}-'.format(partial['offset'])
+            headers['If-Range'] = partial['etag'] or partial['last_modified']
+
+        with self.host_slot(url):
+            start = last_report = time.perf_counter()
+            byte_count = 0
+            response = self.open(url, headers)
+            try:
+                entry = self.describe_response(url, response)
+                if cached is not None and (
+                        response.status == 304 or self.is_same(cached, entry)):
+                    LOG.info("Remote file is unchanged: %s", url)
+                    entry['size'] = cached.get('size')
+                    for algorithm in CHECKSUMS:
+                        entry[algorithm] = cached.get(algorithm)
+                    for key in ('etag', 'last_modified'):
+                        if entry[key] is None:
+                            entry[key] = cached.get(key)
+                    entry['changed'] = False
+                    return entry
+
+                digests = [hashlib.new(algorithm) for algorithm in CHECKSUMS]
+                offset = 0
+                if response.status == 206:
+                    offset = partial['offset']
+                    LOG.info("Resuming %s from byte %i", url, offset)
+                    with open(part, 'rb') as bin_reader:
+                        for buff in iter(lambda: bin_reader.read(CHUNK), b''):
+                            for digest in digests:
+                                digest.update(buff)
+                else:
+                    with open(partmeta, 'w') as write_yaml:
+                        yaml.safe_dump(entry, write_yaml, default_flow_style=False)
+
+                total = entry['size']
+                with open(part, 'ab' if offset else 'wb') as binwrite:
+                    while True:
+                        try:
+                            chunk = response.read(CHUNK)
+                        except urllib3.exceptions.HTTPError as err:
+                            raise IncompleteDownload(str(err)) from err
+                        if not chunk:
+                            break
+                        binwrite.write(chunk)
+                        for digest in digests:
+                            digest.update(chunk)
+                        byte_count += len(chunk)
+                        now = time.perf_counter()
+                        if now - last_report > PROGRESS:
+                            last_report = now
+                            LOG.info(
+                                "%s: %s of %s bytes at %s", localfile,
+                                offset + byte_count,
+                                total if total is not None else '?',
+                                self.rate(byte_count, now - start))
+            finally:
+                response.close()
+
+        LOG.info(
+            "Fetched %i bytes from %s in %.1f sec (%s)", byte_count, url,
+            time.perf_counter() - start,
+            self.rate(byte_count, time.perf_counter() - start))
+
+        if total is not None and offset + byte_count != total:
+            raise IncompleteDownload(
+                "Error downloading {}: got {} of {} bytes".format(
+                    url, offset + byte_count, total))
+
+        os.replace(part, localfile)
+        os.remove(partmeta)
+        entry['size'] = offset + byte_count
+        for digest in digests:
+            entry[digest.name] = digest.hexdigest()
+        entry['changed'] = True
+        return entry
+
+    @staticmethod
+    def _read_partial(url, part, partmeta):
+        '''
+        :return: dict  the validators and length of a resumable partial download
+            or None if there is nothing to resume
+        '''
+        if url[:4] != 'http' or not os.path.exists(part) or \
+                not os.path.exists(partmeta):
+            return None
+        with open(partmeta) as read_yaml:
+            partial = yaml.safe_load(read_yaml) or {}
+        partial['offset'] = os.path.getsize(part)
+        if partial.get('url') != url or \
+                (partial.get('etag') is None and
+                 partial.get('last_modified') is None) or \
+                partial['offset'] == 0 or \
+                (partial.get('size') is not None and
+                 partial['offset'] >= partial['size']):
+            return None
+        return partial
+
+    @staticmethod
+    def describe_response(url, response):
+        '''
+        :return: dict  the metadata of a remote file, as far as the headers tell
+        '''
+        size = response.headers.get('Content-Length')
+        if response.headers.get('Content-Range') is not None:
+            # partial content:  bytes first-last/size
+            size = response.headers['Content-Range'].split('/')[-1]
+        return {
+            'url': url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'size': int(size) if size not in (None, '', '*') else None,
+            'fetched': datetime.utcnow().isoformat(timespec='seconds'),
+        }
+
+    @staticmethod
+    def is_same(cached, entry):
+        '''
+        For servers ignoring conditional requests,
+        judge from the headers of a full response if the remote file is unchanged
+        '''
+        if entry['etag'] is not None:
+            return entry['etag'] == cached.get('etag')
+        return entry['last_modified'] is not None and \
+            entry['last_modified'] == cached.get('last_modified') and \
+            entry['size'] == cached.get('size')
+
+    @staticmethod
+    def describe_local(localfile):
+        '''
+        Metadata for a local file fetched before any was recorded;
+        only its modification time and size can be vouched for.
+        '''
+        fstat = os.stat(localfile)
+        return {
+            'etag': None,
+            'last_modified': formatdate(fstat.st_mtime, usegmt=True),
+            'size': fstat.st_size,
+            'sha256': None,
+            'md5': None,
+        }
+
+    @staticmethod
+    def get_file_checksums(localfile, blocksize=CHUNK):
+        '''
+        :return: dict  hex digest of the file's contents by algorithm
+        '''
+        digests = [hashlib.new(algorithm) for algorithm in CHECKSUMS]
+        with open(localfile, 'rb') as bin_reader:
+            while True:
+                buff = bin_reader.read(blocksize)
+                if not buff:
+                    break
+                for digest in digests:
+                    digest.update(buff)
+        return {digest.name: digest.hexdigest() for digest in digests}
+
+    def fetch_all(self, func, jobs):
+        '''
+        Call func(*job) for every job using a bounded pool of threads.
+        Every job is given the chance to finish before
+        the first failure (if any) is raised.
+
+        :param func: callable
+        :param jobs: list of argument tuples
+        :return: list of results, in the order of jobs
+        '''
+        if self.workers < 2 or len(jobs) < 2:
+            return [func(*job) for job in jobs]
+
+        start = time.perf_counter()
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.workers) as pool:
+            futures = [pool.submit(func, *job) for job in jobs]
+            concurrent.futures.wait(futures)
+        LOG.info(
+            "Fetched %i files with %i threads in %.1f sec",
+            len(jobs), self.workers, time.perf_counter() - start)
+        return [future.result() for future in futures]
+
+    @staticmethod
+    def rate(byte_count, seconds):
+        '''
+        :return: str human readable throughput
+        '''
+        if seconds <= 0:
+            return '- MB/s'
+        return '{:.2f} MB/s'.format(byte_count / seconds / 2**20)
+
+
+class FetchMetadata:
+    """
+    What was fetched into a raw directory, and when,
+    kept in `<rawdir>/fetch_metadata.yaml` as
+
+        filename:
+          url: remote location
+          etag: validator from the server (if any)
+          last_modified: validator from the server (if any)
+          size: bytes
+          sha256: checksum of the contents
+          md5: checksum of the contents (as many sources publish)
+          fetched: UTC timestamp
+          mtime: of the local file, as fetched (seconds)
+
+    There is one instance per directory so concurrent fetches share it.
+    """
+
+    FILENAME = 'fetch_metadata.yaml'
+
+    _stores = {}
+    _stores_lock = threading.Lock()
+
+    def __init__(self, directory):
+        self.path = os.path.join(directory, self.FILENAME)
+        self._lock = threading.Lock()
+        self.entries = {}
+        if os.path.exists(self.path):
+            with open(self.path) as read_yaml:
+                self.entries = yaml.safe_load(read_yaml) or {}
+
+    @classmethod
+    def for_directory(cls, directory):
+        '''
+        :return: the store for the directory, shared within this process
+        '''
+        directory = os.path.abspath(directory)
+        with cls._stores_lock:
+            if directory not in cls._stores:
+                cls._stores[directory] = cls(directory)
+            return cls._stores[directory]
+
+    def get(self, fname):
+        with self._lock:
+            return self.entries.get(fname)
+
+    def set(self, fname, entry):
+        '''
+        Record a file's metadata and rewrite the store
+        '''
+        entry = {key: val for key, val in entry.items() if key != 'changed'}
+        with self._lock:
+            self.entries[fname] = entry
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w') as write_yaml:
+                yaml.safe_dump(self.entries, write_yaml, default_flow_style=False)
+            os.replace(tmp_path, self.path)
+
+
+class ContentStore:
+    """
+    Content addressed copies of the raw files: `<root>/<sha256[:2]>/<sha256>`.
+
+    Each is a hard link to every raw file with those contents, so a file
+    fetched by more than one ingest (or unchanged between releases) is kept
+    on disk once.  Raw files are only ever replaced, never rewritten in place,
+    so the links stay true to their name.
+    A blob no raw file links to anymore is removed by `prune()`, which
+    dipper-etl.py runs once all the ingests of a run have fetched their files.
+    """
+
+    DIRNAME = '.sha256'
+
+    def __init__(self, root):
+        self.root = root
+
+    @classmethod
+    def for_directory(cls, directory):
+        '''
+        The store beside a raw directory, i.e. raw/.sha256 for raw/ncbigene
+        '''
+        return cls(os.path.join(
+            os.path.dirname(os.path.abspath(directory)), cls.DIRNAME))
+
+    def path(self, sha256):
+        return os.path.join(self.root, sha256[:2], sha256)
+
+    def add(self, localfile, sha256):
+        '''
+        Link localfile into the store or, if the contents are already there,
+        replace localfile with a link to the stored copy
+
+        :return: bool  True if localfile now shares an earlier copy
+        '''
+        blob = self.path(sha256)
+        try:
+            if not os.path.exists(blob):
+                os.makedirs(os.path.dirname(blob), exist_ok=True)
+                os.link(localfile, blob)
+                return False
+            if os.path.samefile(blob, localfile):
+                return False
+            tmp_link = localfile + '.link'
+            os.link(blob, tmp_link)
+            os.replace(tmp_link, localfile)
+        except FileExistsError:     # another process stored it first
+            return self.add(localfile, sha256)
+        except OSError as err:      # i.e. no hard links across filesystems
+            LOG.warning("Not keeping a content addressed copy of %s: %s", localfile, err)
+            return False
+        LOG.info("%s is identical to an earlier fetch; sharing it", localfile)
+        return True
+
+    def prune(self):
+        '''
+        Remove the stored copies no raw file links to anymore
+        :return: int  count removed
+        '''
+        removed = 0
+        if not os.path.isdir(self.root):
+            return removed
+        for subdir in os.listdir(self.root):
+            for sha256 in os.listdir(os.path.join(self.root, subdir)):
+                blob = os.path.join(self.root, subdir, sha256)
+                if os.stat(blob).st_nlink == 1:
+                    os.remove(blob)
+                    removed += 1
+        return removed
+
+
+class _StreamedResponse:
+    """
+    Give a `requests.Response` the read()/info() face of a urllib response
+    so callers need not care which library fetched the file.
+    """
+
+    def __init__(self, response):
+        self.response = response
+        self.status = response.status_code
+        self.headers = response.headers
+        self.url = response.url
+
+    def read(self, size=None):
+        return self.response.raw.read(size)
+
+    def info(self):
+        return self.headers
+
+    def close(self):
+        self.response.close()
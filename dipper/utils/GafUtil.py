@@ -0,0 +1,148 @@
+"""
+    Read the Gene Association Format (GAF 2.x) files of GO and the model
+    organism databases, and build the associations of their annotations.
+
+    Lines are passed over before being split into fields when a regular
+    expression finds them NOT annotations, or of taxa not asked for;
+    the curie prefixes, evidence codes and references of annotations are
+    translated once for each distinct value, rather than for every row.
+"""
+
+import re
+import logging
+
+from dipper.models.assoc.Association import Assoc
+from dipper.utils.TableUtil import TableReader, make_row_class
+
+LOG = logging.getLogger(__name__)
+
+# the columns every GAF 2.x annotation has; the two which may follow
+# (annotation extension, gene product form id) are not read
+GAF_COLUMNS = [
+    'db', 'db_object_id', 'db_object_symbol', 'qualifier', 'go_id',
+    'reference', 'evidence_code', 'with_or_from', 'aspect', 'db_object_name',
+    'db_object_synonym', 'db_object_type', 'taxon', 'date', 'assigned_by']
+
+GafRow = make_row_class(GAF_COLUMNS)
+
+
+def gaf_prefilter(taxa=None, negated=False):
+    '''
+    A regular expression of the annotation lines to split into rows
+    :param taxa: NCBITaxon numbers the (first) taxon of a row must be one of
+                 (default any)
+    :param negated: bool  whether to keep annotations qualified NOT
+    :return: str, or None to keep every line
+    '''
+    if negated and taxa is None:
+        return None
+    pattern = r'^(?:[^\t]*\t){3}'     # to the qualifier
+    if not negated:
+        pattern += r'(?![^\t]*NOT)'
+    if taxa is not None:
+        pattern += r'(?:[^\t]*\t){{9}}taxon:(?:{})[\t|]'.format(
+            '|'.join(sorted(re.escape(str(taxon)) for taxon in taxa)))
+    return pattern
+
+
+def read_gaf(filename, taxa=None, negated=False, limit=None):
+    '''
+    :param filename: str  GAF file, gzipped or not
+    :param taxa: NCBITaxon numbers of the annotations to read (default any)
+    :param negated: bool  whether to read annotations qualified NOT
+    :param limit: int  stop after reading this many annotations
+    :return: TableReader of GafRow like rows
+    '''
+    return TableReader(
+        filename, GAF_COLUMNS, comment='!', header=False, limit=limit,
+        prefilter=gaf_prefilter(taxa, negated))
+
+
+class GafAssociations:
+    """
+    Build the associations of GAF annotations for an ingest
+
+        gaf = GafAssociations(self, eco_map=self.get_eco_map(url))
+        for row in read_gaf(gaf_file):
+            gene_id = gaf.get_gene_id(row)
+            gaf.add_association(
+                graph, gene_id, row.go_id, relation,
+                gaf.get_evidence(row.evidence_code), gaf.get_references(row))
+
+    :param source: the Source whose local translation table maps prefixes
+                   (and evidence codes, without an eco_map)
+    :param eco_map: dict  evidence code -> ECO curie (see Source.get_eco_map)
+    """
+
+    def __init__(self, source, eco_map=None):
+        self.source = source
+        self.prefixes = {}
+        if eco_map is None:
+            self.evidence = {}
+        else:
+            # the default of each code, not those of a code with a GO_REF
+            self.evidence = {
+                code: eco_id for (code, eco_id) in eco_map.items() if '-' not in code}
+        self.eco_map = eco_map
+        self.unmapped = set()
+
+    def get_prefix(self, prefix):
+        '''
+        :param prefix: str  as the GAF has it ('WB', 'MGI')
+        :return: str  the curie prefix of it ('WormBase', 'MGI')
+        '''
+        if prefix not in self.prefixes:
+            self.prefixes[prefix] = self.source.localtt.get(prefix, prefix)
+        return self.prefixes[prefix]
+
+    def get_gene_id(self, row):
+        '''
+        :return: str  curie of the annotated object (sidestepping 'MGI:MGI:')
+        '''
+        return ':'.join((self.get_prefix(row.db), row.db_object_id.split(':')[-1]))
+
+    def get_references(self, row):
+        '''
+        :return: list of curies of the references of an annotation, in order
+        '''
+        refs = []
+        for ref in row.reference.split('|'):
+            ref = ref.strip()
+            if ref != '':
+                refs.append(':'.join((
+                    self.get_prefix(ref.split(':')[0]), ref.split(':')[-1])))
+        return refs
+
+    def get_evidence(self, code):
+        '''
+        :param code: str  GAF evidence code ('IMP')
+        :return: str  its ECO curie, or None when it is not mapped
+        '''
+        if code in self.evidence:
+            return self.evidence[code]
+        if self.eco_map is None:
+            self.evidence[code] = self.source.resolve(code)
+            return self.evidence[code]
+        if code not in self.unmapped:
+            LOG.error("Evidence code (%s) not mapped", code)
+            self.unmapped.add(code)
+        return None
+
+    def add_association(
+            self, graph, gene_id, term_id, relation, evidence=None, sources=(),
+            date=None):
+        '''
+        :param evidence: str  ECO curie
+        :param sources: list of reference curies
+        :param date: str  YYYYMMDD as the GAF has it
+        :return: the Assoc added to the graph
+        '''
+        assoc = Assoc(graph, self.source.name, sub=gene_id, obj=term_id, pred=relation)
+        if evidence is not None:
+            assoc.add_evidence(evidence)
+        for ref in sources:
+            assoc.add_source(ref)
+        if date is not None and len(date) == 8:
+            assoc.add_date('-'.join((date[:4], date[4:6], date[6:])))
+        assoc.add_association_to_graph()
+        return assoc
@@ -1,20 +1,56 @@
+import os
+import sys
+import json
+import time
 import logging
 import hashlib
+from datetime import datetime
 
 from xml.sax import SAXParseException
-from rdflib import URIRef, ConjunctiveGraph, util as rdflib_util
+from rdflib import URIRef, BNode, ConjunctiveGraph, util as rdflib_util
 from rdflib.namespace import DC, RDF, OWL
 
 
 from dipper.utils.CurieUtil import CurieUtil
+from dipper.utils.SerializeUtil import TripleSerializer
+from dipper.graph.Graph import Graph as DipperGraph
+from dipper.graph.StreamedGraph import StreamedGraph
 
 __author__ = 'nlw'
 
 LOG = logging.getLogger(__name__)
 
+# formats written by GraphUtils.write_triples rather than rdflib
+NATIVE_FORMATS = ('turtle', 'ttl', 'nt', 'ntriples', 'nquads')
+# lines gathered per write
+WRITE_LINES = 2 ** 16
+
+GH = 'https://raw.githubusercontent.com'
+MI = '/monarch-initiative'
+# where the types of the properties used in ingests are declared
+PROPERTY_ONTOLOGIES = [
+    GH + MI + '/SEPIO-ontology/master/src/ontology/sepio.owl',
+    GH + MI + '/GENO-ontology/develop/src/ontology/geno.owl',
+    GH + '/oborel/obo-relations/master/ro.owl',
+    'http://purl.obolibrary.org/obo/iao.owl',
+    'http://purl.obolibrary.org/obo/ero.owl',
+    GH + '/jamesmalone/OBAN/master/ontology/oban_core.ttl',
+    'http://purl.obolibrary.org/obo/pco.owl',
+    'http://purl.obolibrary.org/obo/xco.owl'
+]
+PROPERTY_TYPES = ('ObjectProperty', 'AnnotationProperty', 'DatatypeProperty')
+# bump when the property index is built differently, so old ones are rebuilt
+PROPERTY_INDEX_VERSION = 1
+
 
 class GraphUtils:
 
+    # the property index built from PROPERTY_ONTOLOGIES is kept here,
+    # and rebuilt once older than property_index_max_age seconds
+    property_index_file = os.path.join('raw', 'property_index.json')
+    property_index_max_age = 30 * 24 * 60 * 60
+    property_index = None   # loaded once per process
+
     def __init__(self, curie_map):
         self.curie_map = curie_map
         self.cu = CurieUtil(curie_map)
@@ -28,6 +64,9 @@ class GraphUtils:
         this will write raw triples in rdfxml, unless specified.
         to write turtle, specify format='turtle'
         an optional file can be supplied instead of stdout
+
+        turtle, nt and nquads are streamed a subject at a time
+        by write_triples(); other formats are left to rdflib.
         :return: None
 
         """
@@ -35,23 +74,133 @@ class GraphUtils:
         filewriter = None
         if fileformat is None:
             fileformat = 'turtle'
-        if filename is not None:
-
+        if fileformat in NATIVE_FORMATS:
+            start = time.perf_counter()
+            if filename is not None:
+                LOG.info("Writing triples in %s to %s", fileformat, filename)
+                with open(filename, 'wb') as filewriter:
+                    count = GraphUtils.write_graph(graph, filewriter, fileformat)
+            else:
+                count = GraphUtils.write_graph(graph, sys.stdout.buffer, fileformat)
+                sys.stdout.buffer.flush()
+            elapsed = time.perf_counter() - start
+            LOG.info(
+                "Wrote %i triples in %.1f sec (%i triples/sec)",
+                count, elapsed, count / max(elapsed, 1e-6))
+        elif filename is not None:
             with open(filename, 'wb') as filewriter:
                 LOG.info("Writing triples in %s to %s", fileformat, filename)
                 # rdflib serialize
                 graph.serialize(filewriter, format=fileformat)
         else:
-            print(graph.serialize(fileformat).decode())
+            print(graph.serialize(format=fileformat).decode())
         return
 
+    @staticmethod
+    def write_graph(graph, stream, fileformat):
+        """
+        Write a dipper (or rdflib) graph as turtle, nt or nquads
+        :param graph: RDFGraph, CompactGraph, SQLiteGraph or an rdflib.Graph
+        :param stream: binary file handle
+        :param fileformat: str
+        :return: int  count of triples written
+        """
+        if hasattr(graph, 'text_rows'):
+            rows = graph.text_rows()
+        else:
+            rows = GraphUtils.get_text_rows(graph)
+        return GraphUtils.write_triples(
+            stream, fileformat, rows, dict(graph.namespaces()),
+            GraphUtils.get_graph_iri(graph))
+
+    @staticmethod
+    def get_text_rows(graph):
+        """
+        Every triple of an rdflib graph as N-Triples text,
+        a subject at a time and sorted so the output is reproducible
+        :param graph: rdflib.Graph
+        :return: generator of (subject, predicate, object) str
+        """
+        encode = GraphUtils.get_nt_term
+        for subject_text, subject in sorted(
+                (encode(subject), subject) for subject in set(graph.subjects())):
+            for (predicate_text, obj_text) in sorted(
+                    (encode(predicate), encode(obj))
+                    for (predicate, obj) in graph.predicate_objects(subject)):
+                yield subject_text, predicate_text, obj_text
+
+    @staticmethod
+    def get_nt_term(term):
+        """
+        :param term: rdflib URIRef, BNode or Literal
+        :return: str  N-Triples text of the term
+        """
+        if isinstance(term, URIRef):
+            return '<{}>'.format(term)
+        if isinstance(term, BNode):
+            return '_:{}'.format(term)
+        text = StreamedGraph._quote_encode(str(term))
+        if term.language is not None:
+            return '{}@{}'.format(text, term.language)
+        if term.datatype is not None:
+            return '{}^^<{}>'.format(text, term.datatype)
+        return text
+
+    @staticmethod
+    def get_graph_iri(graph):
+        """
+        :return: str  the IRI naming the graph, for nquads; or None
+        """
+        identifier = getattr(graph, 'identifier', None)
+        if identifier is None or isinstance(identifier, BNode):
+            return None
+        identifier = str(identifier)
+        if hasattr(graph, 'curie_util') and ':' in identifier and \
+                identifier.split(':')[0].lower() not in ('http', 'https', 'ftp'):
+            return graph.curie_util.get_uri(identifier)
+        return identifier
+
+    @staticmethod
+    def write_triples(stream, fileformat, rows, prefixes=None, graph_iri=None):
+        """
+        Write triples as nt, nquads or turtle, incrementally.
+        Turtle groups the triples of a subject (and of its predicates)
+        and compacts IRIs to curies using the prefixes
+
+        :param stream: binary file handle
+        :param fileformat: str  turtle, nt or nquads (see TripleSerializer)
+        :param rows: iterable of (subject, predicate, object) N-Triples text,
+                     with the triples of each subject adjacent
+        :param prefixes: dict  prefix -> namespace IRI, declared in turtle
+        :param graph_iri: str  the IRI naming the graph, for nquads
+        :return: int  count of triples written
+        """
+        serializer = TripleSerializer(fileformat, prefixes, graph_iri)
+        stream.write(serializer.header().encode('utf-8'))
+        count = 0
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= WRITE_LINES:
+                stream.write(''.join(serializer.format(batch)).encode('utf-8'))
+                count += len(batch)
+                batch = []
+        lines = serializer.format(batch)
+        lines.append(serializer.footer())
+        stream.write(''.join(lines).encode('utf-8'))
+        return count + len(batch)
+
     @staticmethod
     def get_properties_from_graph(graph):
         """
-        Wrapper for RDFLib.graph.predicates() that returns a unique set
-        :param graph: RDFLib.graph
+        Wrapper for RDFLib.graph.predicates() that returns a unique set;
+        a dipper graph already knows the predicates added to it
+        :param graph: dipper Graph or RDFLib.graph
         :return: set, set of properties
         """
+        if isinstance(graph, DipperGraph):
+            return graph.get_properties()
+
         # collapse to single list
         property_set = set()
         for row in graph.predicates():
@@ -61,72 +210,145 @@ class GraphUtils:
 
     @staticmethod
     def add_property_axioms(graph, properties):
-        ontology_graph = ConjunctiveGraph()
-        GH = 'https://raw.githubusercontent.com'
-        MI = '/monarch-initiative'
-        ontologies = [
-            GH + MI + '/SEPIO-ontology/master/src/ontology/sepio.owl',
-            GH + MI + '/GENO-ontology/develop/src/ontology/geno.owl',
-            GH + '/oborel/obo-relations/master/ro.owl',
-            'http://purl.obolibrary.org/obo/iao.owl',
-            'http://purl.obolibrary.org/obo/ero.owl',
-            GH + '/jamesmalone/OBAN/master/ontology/oban_core.ttl',
-            'http://purl.obolibrary.org/obo/pco.owl',
-            'http://purl.obolibrary.org/obo/xco.owl'
-        ]
+        """
+        Type each of the properties as the ontologies do
+        (see get_property_index), plus a few of our own
+        :param graph: dipper Graph (streamed too) or RDFLib.graph
+        :param properties: iterable of property IRIs
+        :return: the graph
+        """
+        index = GraphUtils.get_property_index()
+        axioms = []
+        for prop in sorted(str(prop) for prop in properties):
+            for property_type in index.get(prop, ()):
+                axioms.append((URIRef(prop), RDF['type'], OWL[property_type]))
 
-        # random timeouts can waste hours. (too many redirects?)
-        # there is a timeout param in urllib.request,
-        # but it is not exposed by rdflib.parsing
-        # so retry once on URLError
-        for ontology in ontologies:
-            LOG.info("parsing: " + ontology)
-            try:
-                ontology_graph.parse(
-                    ontology, format=rdflib_util.guess_format(ontology))
-            except SAXParseException as e:
-                LOG.error(e)
-                LOG.error('Retrying as turtle: ' + ontology)
-                ontology_graph.parse(ontology, format="turtle")
-            except OSError as e:  # URLError:
-                # simple retry
-                LOG.error(e)
-                LOG.error('Retrying: ' + ontology)
-                ontology_graph.parse(
-                    ontology, format=rdflib_util.guess_format(ontology))
-
-        # Get object properties
-        graph = GraphUtils.add_property_to_graph(
-            ontology_graph.subjects(RDF['type'], OWL['ObjectProperty']),
-            graph, OWL['ObjectProperty'], properties)
-
-        # Get annotation properties
-        graph = GraphUtils.add_property_to_graph(
-            ontology_graph.subjects(RDF['type'], OWL['AnnotationProperty']),
-            graph, OWL['AnnotationProperty'], properties)
-
-        # Get data properties
-        graph = GraphUtils.add_property_to_graph(
-            ontology_graph.subjects(RDF['type'], OWL['DatatypeProperty']),
-            graph, OWL['DatatypeProperty'], properties)
-
-        for row in graph.predicates(DC['source'], OWL['AnnotationProperty']):
-            if row == RDF['type']:
-                graph.remove(
-                    (DC['source'], RDF['type'], OWL['AnnotationProperty']))
-        graph.add((DC['source'], RDF['type'], OWL['ObjectProperty']))
+        if not isinstance(graph, StreamedGraph):
+            graph.remove((DC['source'], RDF['type'], OWL['AnnotationProperty']))
+        axioms = [axiom for axiom in axioms if axiom[0] != DC['source']]
+        axioms.append((DC['source'], RDF['type'], OWL['ObjectProperty']))
 
         # Hardcoded properties
-        graph.add((
+        axioms.append((
             URIRef('https://monarchinitiative.org/MONARCH_cliqueLeader'), RDF['type'],
             OWL['AnnotationProperty']))
 
-        graph.add((
+        axioms.append((
             URIRef('https://monarchinitiative.org/MONARCH_anonymous'), RDF['type'],
             OWL['AnnotationProperty']))
 
+        if isinstance(graph, DipperGraph):
+            graph.addTriples(
+                (str(subj), str(pred), str(obj), False) for (subj, pred, obj) in axioms)
+        else:
+            for axiom in axioms:
+                graph.add(axiom)
+        LOG.info("Added %i property axioms", len(axioms))
         return graph
 
+    @staticmethod
+    def get_property_index(refresh=False):
+        """
+        The type(s) of each property declared in PROPERTY_ONTOLOGIES,
+        read from GraphUtils.property_index_file when it is the current
+        version of the index and not too old, otherwise built from the
+        ontologies and saved there.
+        :param refresh: bool  rebuild the index regardless
+        :return: dict  property IRI -> list of OWL property types
+        """
+        if GraphUtils.property_index is not None and not refresh:
+            return GraphUtils.property_index['properties']
+
+        filename = GraphUtils.property_index_file
+        index = None
+        if os.path.exists(filename):
+            with open(filename) as fhandle:
+                index = json.load(fhandle)
+            age = time.time() - os.path.getmtime(filename)
+            if index.get('version') != PROPERTY_INDEX_VERSION or \
+                    sorted(index.get('ontologies', ())) != sorted(PROPERTY_ONTOLOGIES):
+                LOG.info("Property index %s is out of date", filename)
+                index = None
+            elif refresh or age > GraphUtils.property_index_max_age:
+                LOG.info("Refreshing property index %s built %s", filename, index['built'])
+                try:
+                    index = GraphUtils.build_property_index(filename)
+                except OSError as err:
+                    LOG.error(err)
+                    LOG.warning("Using the property index built %s", index['built'])
+        if index is None:
+            index = GraphUtils.build_property_index(filename)
+        else:
+            LOG.info(
+                "Read %i properties from %s", len(index['properties']), filename)
+
+        GraphUtils.property_index = index
+        return index['properties']
+
+    @staticmethod
+    def build_property_index(filename):
+        """
+        Read the property types and version of each of PROPERTY_ONTOLOGIES
+        and save them to filename as json
+        :return: dict  the index
+        """
+        properties = {}
+        ontologies = {}
+        for ontology in PROPERTY_ONTOLOGIES:
+            ontology_graph = GraphUtils.parse_ontology(ontology)
+            versions = list(ontology_graph.objects(None, OWL['versionIRI'])) + \
+                list(ontology_graph.objects(None, OWL['versionInfo']))
+            ontologies[ontology] = str(versions[0]) if versions else None
+            for property_type in PROPERTY_TYPES:
+                for prop in ontology_graph.subjects(RDF['type'], OWL[property_type]):
+                    if not isinstance(prop, URIRef):
+                        continue
+                    types = properties.setdefault(str(prop), [])
+                    if property_type not in types:
+                        types.append(property_type)
+
+        index = {
+            'version': PROPERTY_INDEX_VERSION,
+            'built': datetime.now().isoformat(timespec='seconds'),
+            'ontologies': ontologies,
+            'properties': properties,
+        }
+        dirname = os.path.dirname(filename)
+        if dirname and not os.path.exists(dirname):
+            os.makedirs(dirname)
+        with open(filename + '.tmp', 'w') as fhandle:
+            json.dump(index, fhandle, indent=1, sort_keys=True)
+        os.replace(filename + '.tmp', filename)
+        LOG.info("Wrote %i properties to %s", len(properties), filename)
+        return index
+
+    @staticmethod
+    def parse_ontology(ontology):
+        """
+        :param ontology: str  url
+        :return: rdflib.ConjunctiveGraph of it
+        """
+        ontology_graph = ConjunctiveGraph()
+        # random timeouts can waste hours. (too many redirects?)
+        # there is a timeout param in urllib.request,
+        # but it is not exposed by rdflib.parsing
+        # so retry once on URLError
+        LOG.info("parsing: " + ontology)
+        try:
+            ontology_graph.parse(
+                ontology, format=rdflib_util.guess_format(ontology))
+        except SAXParseException as e:
+            LOG.error(e)
+            LOG.error('Retrying as turtle: ' + ontology)
+            ontology_graph.parse(ontology, format="turtle")
+        except OSError as e:  # URLError:
+            # simple retry
+            LOG.error(e)
+            LOG.error('Retrying: ' + ontology)
+            ontology_graph.parse(
+                ontology, format=rdflib_util.guess_format(ontology))
+        return ontology_graph
+
     @staticmethod
     def add_property_to_graph(results, graph, property_type, property_list):
 
@@ -0,0 +1,170 @@
+#! /usr/bin/env python3
+
+"""
+    An index of the UniProt accessions which map to a single gene
+    (NCBIGene, else ENSEMBL) kept in an SQLite file shared by the ingests,
+    built in one pass of UniProt's idmapping_selected.tab.gz
+    (over 10GB unzipped) for every taxon at once.
+
+    Mappings are keyed by taxon then accession, so the map of a few taxa
+    is read as ranges of the index, and an accession looked up on its own
+    through a second index; neither needs the mapping file read again.
+    The index is rebuilt once the mapping file is newer than it.
+
+    ./dipper/utils/IdMapUtil.py raw/go/idmapping_selected.tab.gz
+"""
+
+import os
+import time
+import logging
+import sqlite3
+import argparse
+
+from dipper.utils.TableUtil import TableReader
+
+LOG = logging.getLogger(__name__)
+
+# where the ingests keep the index unless told otherwise
+ID_MAP_FILE = os.path.join('raw', 'uniprot_id_map.sqlite')
+
+# mappings inserted per statement as the index is built
+BATCH_SIZE = 2 ** 16
+
+# the columns of idmapping_selected.tab used, of its 22
+(ACCESSION, GENEID, TAXON, ENSEMBL) = (0, 2, 12, 18)
+
+
+class UniProtIdMap:
+    """
+    The 1:1 mappings of UniProt accessions to genes of one mapping file
+
+        id_map = UniProtIdMap('raw/go/idmapping_selected.tab.gz')
+        gene_ids = id_map.get_map(['9606', '10090'])
+        id_map.lookup('P04637')    # 'NCBIGene:7157'
+
+    :param mapping_file: str  UniProt's idmapping_selected.tab(.gz)
+    :param dbfile: str  the index to read, built (or rebuilt) if need be
+    """
+
+    def __init__(self, mapping_file, dbfile=ID_MAP_FILE):
+        self.mapping_file = mapping_file
+        self.dbfile = dbfile
+        self.dbconn = None
+
+    def is_current(self):
+        '''
+        :return: bool  whether the index is there and newer than the mapping file
+        '''
+        if not os.path.exists(self.dbfile):
+            return False
+        if not os.path.exists(self.mapping_file):
+            return True
+        return os.path.getmtime(self.dbfile) > os.path.getmtime(self.mapping_file)
+
+    def build(self):
+        '''
+        Index the 1:1 mappings of every taxon in the mapping file,
+        replacing the index once it is complete
+        :return: int  mappings indexed
+        '''
+        LOG.info("Indexing the UniProt id mappings of %s", self.mapping_file)
+        self.close()
+        start = time.perf_counter()
+        # of this process alone; another may be building the index as well
+        tmpfile = '{}.{}.tmp'.format(self.dbfile, os.getpid())
+        if os.path.exists(tmpfile):
+            os.remove(tmpfile)
+        dbdir = os.path.dirname(self.dbfile)
+        if dbdir:
+            os.makedirs(dbdir, exist_ok=True)
+
+        dbconn = sqlite3.connect(tmpfile)
+        dbconn.execute('PRAGMA journal_mode = OFF')
+        dbconn.execute('PRAGMA synchronous = OFF')
+        dbconn.execute(
+            'CREATE TABLE id_map (taxon INTEGER, accession TEXT, gene_id TEXT, '
+            'PRIMARY KEY (taxon, accession)) WITHOUT ROWID')
+        count = 0
+        batch = []
+        insert = 'INSERT OR REPLACE INTO id_map VALUES (?, ?, ?)'
+        for row in TableReader(self.mapping_file, header=False, comment=None):
+            if len(row) <= ENSEMBL or not row[TAXON].isdigit():
+                continue
+            geneid = row[GENEID].strip()
+            ensembl = row[ENSEMBL].strip()
+            if geneid != '' and ';' not in geneid:
+                gene_id = 'NCBIGene:' + geneid
+            elif ensembl != '' and ';' not in ensembl:
+                gene_id = 'ENSEMBL:' + ensembl
+            else:
+                continue
+            batch.append((int(row[TAXON]), row[ACCESSION].strip(), gene_id))
+            if len(batch) >= BATCH_SIZE:
+                dbconn.executemany(insert, batch)
+                count += len(batch)
+                batch = []
+        dbconn.executemany(insert, batch)
+        count += len(batch)
+        dbconn.execute('CREATE INDEX accession ON id_map (accession)')
+        dbconn.commit()
+        dbconn.close()
+        os.replace(tmpfile, self.dbfile)
+        LOG.info(
+            "Indexed %i UniProt id mappings in %s in %.0f sec",
+            count, self.dbfile, time.perf_counter() - start)
+        return count
+
+    def connect(self):
+        '''
+        :return: sqlite3 connection to the index, built first if need be
+        '''
+        if self.dbconn is None:
+            if not self.is_current():
+                self.build()
+            self.dbconn = sqlite3.connect(self.dbfile)
+        return self.dbconn
+
+    def close(self):
+        if self.dbconn is not None:
+            self.dbconn.close()
+            self.dbconn = None
+
+    def get_map(self, tax_ids):
+        '''
+        :param tax_ids: list of NCBITaxon numbers
+        :return: dict  UniProt accession -> gene curie, of those taxa
+        '''
+        taxa = [int(taxon) for taxon in tax_ids]
+        return dict(self.connect().execute(
+            'SELECT accession, gene_id FROM id_map WHERE taxon IN ({})'.format(
+                ','.join('?' * len(taxa))), taxa))
+
+    def lookup(self, accession, tax_ids=None):
+        '''
+        :param accession: str  UniProt accession (without a UniProtKB: prefix)
+        :param tax_ids: list of NCBITaxon numbers the gene may be of (default any)
+        :return: str  the gene curie the accession maps to, or None
+        '''
+        if tax_ids is None:
+            query = ('SELECT gene_id FROM id_map WHERE accession = ?', (accession,))
+        else:
+            taxa = [int(taxon) for taxon in tax_ids]
+            query = (
+                'SELECT gene_id FROM id_map WHERE taxon IN ({}) AND accession = ?'.format(
+                    ','.join('?' * len(taxa))), taxa + [accession])
+        row = self.connect().execute(*query).fetchone()
+        return None if row is None else row[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='index the 1:1 UniProt to gene id mappings of every taxon')
+    parser.add_argument('mapping_file', help="UniProt's idmapping_selected.tab.gz")
+    parser.add_argument('--dbfile', default=ID_MAP_FILE, help='the index to write')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    UniProtIdMap(args.mapping_file, args.dbfile).build()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+    Lightweight, always on, measurements of an ingest:
+    the seconds, triples and rows of each stage (fetch, parse, axioms, write)
+    and of each `_process_*` method of a Source, and the triples per predicate.
+    A stage may also be profiled (cProfile, saved as pstats) and have its
+    memory traced (tracemalloc peak and top allocating lines).
+
+    dipper-etl.py writes them to out/<source>_metrics.json
+"""
+
+import os
+import json
+import time
+import logging
+import cProfile
+import functools
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+LOG = logging.getLogger(__name__)
+
+# allocating lines kept per traced stage
+TOP_ALLOCATORS = 10
+
+# records of the stages and methods being measured, innermost last;
+# one ingest runs per process, so rows are counted process wide
+_ACTIVE = []
+
+
+def count_rows(count=1):
+    '''
+    Count rows read by whatever stage and methods are being measured
+    :param count: int
+    '''
+    for record in _ACTIVE:
+        record['rows'] += count
+
+
+@contextmanager
+def rows_counted():
+    '''
+    Count the rows read within apart from any stage, i.e. in a worker
+    process, for the stage of its parent process to count
+    :yield: dict  {'rows': int}
+    '''
+    record = {'rows': 0}
+    saved = _ACTIVE[:]
+    _ACTIVE[:] = [record]
+    try:
+        yield record
+    finally:
+        _ACTIVE[:] = saved
+
+
+def _triple_count(graph):
+    if graph is None or not hasattr(graph, 'get_triple_count'):
+        return 0
+    return graph.get_triple_count()
+
+
+class Metrics:
+    """
+    Seconds, triples & rows of the stages and `_process_*` methods of an ingest.
+    Counts are inclusive: a method called by another adds to both.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.stages = {}
+        self.methods = {}
+
+    @staticmethod
+    def _record(records, name):
+        if name not in records:
+            records[name] = {'calls': 0, 'seconds': 0.0, 'triples': 0, 'rows': 0}
+        return records[name]
+
+    @contextmanager
+    def measure(self, records, name, graph):
+        '''
+        add the time, triples added to the graph and rows counted
+        within the block to records[name]
+        '''
+        record = self._record(records, name)
+        record['calls'] += 1
+        counted = {'rows': 0}
+        _ACTIVE.append(counted)
+        triples = _triple_count(graph)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['seconds'] += time.perf_counter() - start
+            record['triples'] += _triple_count(graph) - triples
+            record['rows'] += counted['rows']
+            _ACTIVE.pop()   # blocks nest, so this one is innermost
+
+    def instrument(self, source, prefix='_process'):
+        '''
+        Measure each call of the source's methods named prefix*
+        :param source: Source
+        '''
+        for name in dir(type(source)):
+            if name.startswith(prefix) and callable(getattr(source, name)):
+                setattr(source, name, self._wrap(source, name, getattr(source, name)))
+
+    def _wrap(self, source, name, method):
+        @functools.wraps(method)
+        def measured(*args, **kwargs):
+            with self.measure(self.methods, name, source.graph):
+                return method(*args, **kwargs)
+        return measured
+
+    @contextmanager
+    def stage(self, name, graph=None, profile_dir=None, trace_memory=False):
+        '''
+        Measure a stage of the ingest
+        :param name: str  fetch, parse, axioms or write
+        :param graph: the graph triples are added to
+        :param profile_dir: str  if given, cProfile the stage and save the
+                            stats in profile_dir/<source>_<stage>.pstats
+        :param trace_memory: bool  record the peak memory of the stage and
+                             the lines which allocated the most
+        '''
+        profiler = None
+        if profile_dir is not None:
+            profiler = cProfile.Profile()
+        is_tracing = trace_memory and not tracemalloc.is_tracing()
+        if is_tracing:
+            tracemalloc.start()
+        elif trace_memory and hasattr(tracemalloc, 'reset_peak'):  # python 3.9
+            tracemalloc.reset_peak()
+        with self.measure(self.stages, name, graph) as record:
+            if profiler is not None:
+                profiler.enable()
+            try:
+                yield record
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+        if profiler is not None:
+            record['profile'] = os.path.join(
+                profile_dir, '{}_{}.pstats'.format(self.name, name))
+            profiler.dump_stats(record['profile'])
+            LOG.info("Saved the %s profile to %s", name, record['profile'])
+        if trace_memory:
+            snapshot = tracemalloc.take_snapshot()
+            record['memory_peak_kib'] = tracemalloc.get_traced_memory()[1] // 1024
+            record['top_allocators'] = [
+                {'line': str(stat.traceback), 'kib': stat.size // 1024,
+                 'blocks': stat.count}
+                for stat in snapshot.statistics('lineno')[:TOP_ALLOCATORS]]
+            if is_tracing:
+                tracemalloc.stop()
+            LOG.info("Peak memory during %s: %i KiB", name, record['memory_peak_kib'])
+        LOG.info(
+            "%s: %.1f sec, %i triples, %i rows", name, record['seconds'],
+            record['triples'], record['rows'])
+
+    @staticmethod
+    def _rates(records):
+        rates = {}
+        for name, record in records.items():
+            rates[name] = dict(record)
+            seconds = max(record['seconds'], 1e-6)
+            rates[name]['triples_per_sec'] = round(record['triples'] / seconds, 1)
+            rates[name]['rows_per_sec'] = round(record['rows'] / seconds, 1)
+        return rates
+
+    def report(self, graph=None):
+        '''
+        :return: dict  of every measurement, with rates
+        '''
+        report = {
+            'source': self.name,
+            'date': datetime.now().isoformat(timespec='seconds'),
+            'stages': self._rates(self.stages),
+            'methods': self._rates(self.methods),
+        }
+        if graph is not None and hasattr(graph, 'get_property_counts'):
+            report['triples'] = graph.get_triple_count()
+            report['triples_per_predicate'] = dict(sorted(
+                graph.get_property_counts().items()))
+        return report
+
+    def write(self, filename, graph=None):
+        '''
+        Save the report as json
+        '''
+        with open(filename, 'w') as fhandle:
+            json.dump(self.report(graph), fhandle, indent=1)
+        LOG.info("Wrote metrics to %s", filename)
@@ -0,0 +1,200 @@
+import re
+import logging
+from functools import lru_cache
+from xml.sax.saxutils import escape, quoteattr
+
+from rdflib.namespace import RDF
+
+from dipper.utils.CurieUtil import CurieUtil
+
+LOG = logging.getLogger(__name__)
+
+# conservative subsets of the turtle PN_PREFIX and PN_LOCAL productions
+PN_PREFIX = re.compile(r'^([A-Za-z]([A-Za-z0-9_.-]*[A-Za-z0-9_-])?)?$')
+PN_LOCAL = re.compile(r'^([A-Za-z0-9_]([A-Za-z0-9_.-]*[A-Za-z0-9_-])?)?$')
+# the local name an rdfxml property element can end a predicate IRI with
+NC_NAME = re.compile(r'[A-Za-z_][A-Za-z0-9_.-]*$')
+# escapes in an N-Triples string
+NT_ESCAPE = re.compile(r'\\(.)')
+NT_UNESCAPE = {'n': '\n', 'r': '\r', 't': '\t', '"': '"', '\\': '\\'}
+
+RDF_TYPE = '<{}>'.format(RDF['type'])
+
+
+class TripleSerializer:
+    """
+    Formats triples given as the N-Triples text of their terms, a batch at
+    a time, so a graph can be written while it is read (or parsed).
+
+        nt, nquads  a line per triple (nquads in the graph named graph_iri)
+        turtle, n3  consecutive triples of a subject (and of its predicates)
+                    are grouped and IRIs compacted to curies using prefixes
+        rdfxml      an rdf:Description per run of a subject's triples
+
+    Grouping only spans consecutive triples, so the output is always valid;
+    it is as compact as a subject sorted graph when given one.
+    """
+
+    formats = ('nt', 'ntriples', 'nquads', 'turtle', 'ttl', 'n3', 'rdfxml', 'xml')
+
+    def __init__(self, fileformat='nt', prefixes=None, graph_iri=None):
+        """
+        :param fileformat: str  one of TripleSerializer.formats
+        :param prefixes: dict  prefix -> namespace IRI, for turtle and rdfxml
+        :param graph_iri: str  the IRI naming the graph, for nquads
+        """
+        if fileformat not in self.formats:
+            raise ValueError("{} is not one of {}".format(
+                fileformat, ', '.join(self.formats)))
+        if fileformat in ('turtle', 'ttl', 'n3'):
+            self.kind = 'turtle'
+        elif fileformat in ('rdfxml', 'xml'):
+            self.kind = 'rdfxml'
+        else:
+            self.kind = 'lines'
+        if fileformat == 'nquads' and graph_iri is not None:
+            self.end = ' <{}> .\n'.format(graph_iri)
+        else:
+            self.end = ' .\n'
+        self.prefixes = {
+            prefix: str(iri) for (prefix, iri) in (prefixes or {}).items()
+            if PN_PREFIX.match(prefix) and (prefix or self.kind != 'rdfxml')}
+        self.compact = self._get_compactor(self.prefixes)
+        self.namespaces = {iri: prefix for (prefix, iri) in self.prefixes.items()}
+        self._xml_predicate = lru_cache(maxsize=2 ** 12)(self._split_predicate)
+        self.subj = self.pred = None
+
+    def header(self):
+        """
+        :return: str  written before the first triple
+        """
+        if self.kind == 'turtle':
+            return ''.join(
+                '@prefix {}: <{}> .\n'.format(prefix, self.prefixes[prefix])
+                for prefix in sorted(self.prefixes)) + '\n'
+        if self.kind == 'rdfxml':
+            namespaces = dict(self.prefixes, rdf=str(RDF))
+            return '<?xml version="1.0" encoding="UTF-8"?>\n<rdf:RDF\n' + ''.join(
+                '   xmlns:{}={}\n'.format(prefix, quoteattr(namespaces[prefix]))
+                for prefix in sorted(namespaces)) + '>\n'
+        return ''
+
+    def format(self, rows):
+        """
+        :param rows: iterable of (subject, predicate, object) N-Triples text
+        :return: list of str  the text of the triples
+        """
+        if self.kind == 'lines':
+            end = self.end
+            return [subj + ' ' + pred + ' ' + obj + end for (subj, pred, obj) in rows]
+        if self.kind == 'rdfxml':
+            return self._format_rdfxml(rows)
+        return self._format_turtle(rows)
+
+    def footer(self):
+        """
+        :return: str  written after the last triple
+        """
+        text = ''
+        if self.subj is not None:
+            text = ' .\n' if self.kind == 'turtle' else '  </rdf:Description>\n'
+        self.subj = self.pred = None
+        if self.kind == 'rdfxml':
+            text += '</rdf:RDF>\n'
+        return text
+
+    def _format_turtle(self, rows):
+        compact = self.compact
+        lines = []
+        (subj, pred) = (self.subj, self.pred)
+        for (row_subj, row_pred, row_obj) in rows:
+            if row_subj != subj:
+                if subj is not None:
+                    lines.append(' .\n\n')
+                lines.append(
+                    compact(row_subj) + ' ' + self._compact_predicate(row_pred) +
+                    ' ' + compact(row_obj))
+            elif row_pred != pred:
+                lines.append(
+                    ' ;\n    ' + self._compact_predicate(row_pred) + ' ' +
+                    compact(row_obj))
+            else:
+                lines.append(' ,\n        ' + compact(row_obj))
+            (subj, pred) = (row_subj, row_pred)
+        (self.subj, self.pred) = (subj, pred)
+        return lines
+
+    def _compact_predicate(self, text):
+        return 'a' if text == RDF_TYPE else self.compact(text)
+
+    def _format_rdfxml(self, rows):
+        lines = []
+        subj = self.subj
+        for (row_subj, row_pred, row_obj) in rows:
+            if row_subj != subj:
+                if subj is not None:
+                    lines.append('  </rdf:Description>\n')
+                lines.append('  <rdf:Description {}>\n'.format(
+                    self._xml_node(row_subj, 'about')))
+                subj = row_subj
+            lines.append('    ' + self._xml_property(row_pred, row_obj) + '\n')
+        self.subj = subj
+        return lines
+
+    @staticmethod
+    def _xml_node(text, attribute):
+        if text[0] == '_':
+            return 'rdf:nodeID={}'.format(quoteattr(text[2:]))
+        return 'rdf:{}={}'.format(attribute, quoteattr(text[1:-1]))
+
+    def _split_predicate(self, text):
+        """
+        :return: (element name, namespace declaration) of a predicate
+        """
+        iri = text[1:-1]
+        local = NC_NAME.search(iri)
+        if local is None or local.start() == 0:
+            raise ValueError("Can't split {} into a namespace and name".format(iri))
+        namespace = iri[:local.start()]
+        prefix = self.namespaces.get(namespace)
+        if prefix is not None:
+            return prefix + ':' + local.group(0), ''
+        return 'ns0:' + local.group(0), ' xmlns:ns0={}'.format(quoteattr(namespace))
+
+    def _xml_property(self, pred, obj):
+        (name, xmlns) = self._xml_predicate(pred)
+        if obj[0] != '"':
+            return '<{}{} {}/>'.format(name, xmlns, self._xml_node(obj, 'resource'))
+        end = obj.rfind('"')
+        value = NT_ESCAPE.sub(lambda match: NT_UNESCAPE.get(
+            match.group(1), match.group(0)), obj[1:end])
+        attributes = xmlns
+        if obj[end + 1:end + 2] == '@':
+            attributes += ' xml:lang={}'.format(quoteattr(obj[end + 2:]))
+        elif obj[end + 1:end + 3] == '^^':
+            attributes += ' rdf:datatype={}'.format(quoteattr(obj[end + 4:-1]))
+        return '<{}{}>{}</{}>'.format(name, attributes, escape(value), name)
+
+    @staticmethod
+    def _get_compactor(prefixes):
+        """
+        :return: function from the N-Triples text of a term to its turtle
+        """
+        curie_util = CurieUtil(prefixes)
+
+        def compact_iri(iri):
+            curie = curie_util.get_curie(iri)
+            if curie is not None and PN_LOCAL.match(curie.split(':', 1)[1]):
+                return curie
+            return '<' + iri + '>'
+
+        @lru_cache(maxsize=2 ** 16)
+        def compact(text):
+            if text[0] == '<':
+                return compact_iri(text[1:-1])
+            if text[0] == '"' and text[-1] == '>':
+                datatype = text.rfind('^^<')
+                return text[:datatype + 2] + compact_iri(text[datatype + 3:-1])
+            return text
+
+        return compact
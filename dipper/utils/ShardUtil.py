@@ -0,0 +1,150 @@
+"""
+    Parse the rows of one large table, or several files, in several processes.
+
+    The table is read (and decompressed) once, into chunks of lines which
+    end where a row ends. Each chunk is parsed in a forked worker, which
+    is a copy of the ingest whose graph is a ShardGraph recording the
+    triples made. The ingest's graph then adds each shard's triples in
+    the order of the chunks, so its content (and the order a streamed graph
+    writes it in) is as a single process would leave it.
+
+    Workers are forked so the ingest, its translation tables and its
+    reader need not be pickled; where processes cannot be forked,
+    the rows are parsed in this one.
+
+    process_each parses whole files (or any other jobs) the same way,
+    a file to a worker, adding their triples in the order of the files.
+"""
+
+import time
+import logging
+import collections
+import multiprocessing
+import concurrent.futures
+
+from dipper.graph.ShardGraph import ShardGraph
+from dipper.utils.MetricsUtil import count_rows, rows_counted
+from dipper.utils.TableUtil import CHUNK_LINES
+
+LOG = logging.getLogger(__name__)
+
+# the ingest, reader and transform of the running parse, inherited by the workers
+_JOB = {}
+
+
+def can_fork():
+    return 'fork' in multiprocessing.get_all_start_methods()
+
+
+def process_sharded(
+        source, reader, transform, graph, workers, chunk_lines=CHUNK_LINES):
+    '''
+    transform(reader, graph) each chunk of a table in a worker process,
+    adding each shard's triples to `graph` in the order of the table
+
+    :param source: the ingest (its graph & testgraph become the shard's in a worker)
+    :param reader: TableReader of the table, without a limit
+    :param transform: function (reader, graph) parsing the rows it iterates over
+    :param graph: the ingest's graph to add the triples to
+    :param workers: int  processes to parse in
+    :param chunk_lines: int  lines of the table each worker is given at a time
+    :return: list of what transform returned for each chunk, in table order
+    '''
+    if not can_fork():
+        LOG.warning("Cannot fork workers here, parsing %s in one process", reader.filename)
+        return [transform(reader, graph)]
+
+    LOG.info("Parsing %s in %i processes", reader.filename, workers)
+    start = time.perf_counter()
+    _JOB.update(source=source, reader=reader, transform=transform, graph=graph)
+    results = []
+    rows = [0, 0, 0]      # read, kept, malformed
+    pending = collections.deque()
+    context = multiprocessing.get_context('fork')
+    try:
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=workers, mp_context=context) as executor:
+            for (line_num, lines) in reader.chunks(chunk_lines):
+                # keep the workers busy, holding few chunks' triples at once
+                if len(pending) >= 2 * workers:
+                    results.append(_merge(pending.popleft().result(), graph, rows))
+                pending.append(executor.submit(_parse_chunk, line_num, lines))
+            while pending:
+                results.append(_merge(pending.popleft().result(), graph, rows))
+    finally:
+        _JOB.clear()
+
+    (reader.rows_read, reader.rows_kept, reader.malformed) = rows
+    reader.seconds = time.perf_counter() - start
+    count_rows(reader.rows_read)
+    reader.log_rate()
+    return results
+
+
+def process_each(source, transform, jobs, graph, workers):
+    '''
+    transform(*job, graph) each job (i.e. the key of a file) in a worker
+    process, adding the triples of each to `graph` in the order of the jobs
+
+    :param source: the ingest (its graph & testgraph become the shard's in a worker)
+    :param transform: function (*job, graph)
+    :param jobs: list of tuples of transform's arguments
+    :param graph: the ingest's graph to add the triples to
+    :param workers: int  processes to parse in
+    :return: list of what transform returned for each job, in order
+    '''
+    workers = min(workers, len(jobs))
+    if workers < 2 or not can_fork():
+        return [transform(*job, graph) for job in jobs]
+
+    LOG.info("Parsing %i files in %i processes", len(jobs), workers)
+    _JOB.update(source=source, transform=transform, graph=graph)
+    context = multiprocessing.get_context('fork')
+    results = []
+    try:
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=workers, mp_context=context) as executor:
+            for future in [executor.submit(_run_job, job) for job in jobs]:
+                (result, triples, rows) = future.result()
+                graph.addTriples(triples)
+                count_rows(rows)
+                results.append(result)
+    finally:
+        _JOB.clear()
+    return results
+
+
+def _run_job(job):
+    '''
+    In a worker: transform a job into a ShardGraph
+    :return: tuple  (transform's result, the triples, rows read)
+    '''
+    source = _JOB['source']
+    shard = ShardGraph(_JOB['graph'].are_bnodes_skized)
+    source.graph = source.testgraph = shard
+    with rows_counted() as record:
+        result = _JOB['transform'](*job, shard)
+    return (result, shard.records, record['rows'])
+
+
+def _parse_chunk(line_num, lines):
+    '''
+    In a worker: parse a chunk of the table into a ShardGraph
+    :return: tuple  (transform's result, the triples, rows read, kept, malformed)
+    '''
+    (source, reader) = (_JOB['source'], _JOB['reader'])
+    shard = ShardGraph(_JOB['graph'].are_bnodes_skized)
+    # whichever graph the transform (or what it calls) adds to
+    source.graph = source.testgraph = shard
+    reader.use_chunk(line_num, lines)
+    result = _JOB['transform'](reader, shard)
+    return (result, shard.records, reader.rows_read, reader.rows_kept, reader.malformed)
+
+
+def _merge(parsed, graph, rows):
+    (result, triples, rows_read, rows_kept, malformed) = parsed
+    graph.addTriples(triples)
+    rows[0] += rows_read
+    rows[1] += rows_kept
+    rows[2] += malformed
+    return result
@@ -0,0 +1,203 @@
+#! /usr/bin/env python3
+
+"""
+    Sort N-Triples (or any line based) files in bounded memory,
+    dropping repeated lines, so releases load quickly and diff cleanly.
+
+    Chunks of the input that fit the memory budget are sorted into
+    temporary "runs" (in parallel with --workers), the runs are then
+    merged k at a time until a single sorted file of distinct lines remains.
+
+    Lines are compared as python strings, which orders them as
+    `LC_ALL=C sort -u` would order their UTF-8 bytes.
+
+    ./dipper/utils/SortUtil.py out/panther.nt.gz --memory 4096 --workers 4
+"""
+
+import os
+import gzip
+import heapq
+import shutil
+import logging
+import argparse
+import tempfile
+import concurrent.futures
+
+from dipper.graph.StreamedGraph import StreamedGraph, zstandard
+
+LOG = logging.getLogger(__name__)
+
+# rough python overhead of a str beyond its characters
+LINE_OVERHEAD = 50
+# runs merged at once
+FAN_IN = 64
+
+
+def open_lines(filename):
+    '''
+    Open a (gzip or zstd compressed) text file for reading
+    :param filename: str
+    :return: file handle
+    '''
+    if filename.endswith('.gz'):
+        return gzip.open(filename, 'rt', encoding='utf-8')
+    if filename.endswith('.zst'):
+        if zstandard is None:
+            raise ImportError("reading {} needs the zstandard package".format(filename))
+        return zstandard.open(filename, 'rt', encoding='utf-8')
+    return open(filename, 'r', encoding='utf-8')
+
+
+def get_compression(filename):
+    '''
+    :return: the StreamedGraph.open compression implied by the file suffix
+    '''
+    for compression, ext in StreamedGraph.compression_ext.items():
+        if filename.endswith(ext):
+            return compression
+    return None
+
+
+def sort_ntriples(
+        infile, outfile=None, memory=2 ** 30, workers=1, tmpdir=None, fan_in=FAN_IN):
+    """
+    Sort the lines of infile into outfile, keeping one of each
+
+    :param infile: str  path, may end in .gz or .zst
+    :param outfile: str  path; compressed to match its suffix.
+                    default is to replace infile
+    :param memory: int  approximate bytes of lines to hold in memory
+    :param workers: int  processes sorting (and merging) runs at once
+    :param tmpdir: str  where runs are kept, default beside outfile
+    :param fan_in: int  runs merged at once
+    :return: int  count of distinct lines written
+    """
+    if outfile is None:
+        outfile = infile
+    if tmpdir is None:
+        tmpdir = os.path.dirname(os.path.abspath(outfile))
+    rundir = tempfile.mkdtemp(prefix='sort_', dir=tmpdir)
+    LOG.info("Sorting %s into %s", infile, outfile)
+
+    executor = None
+    if workers > 1:
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+    try:
+        runs = _make_runs(infile, rundir, memory, workers, executor)
+        LOG.info("Merging %i sorted runs", len(runs))
+        while len(runs) > fan_in:
+            groups = [runs[num:num + fan_in] for num in range(0, len(runs), fan_in)]
+            merged = [
+                os.path.join(rundir, 'merge_%i_%i' % (len(runs), num))
+                for num in range(len(groups))]
+            if executor is None:
+                for group, runfile in zip(groups, merged):
+                    merge_runs(group, runfile)
+            else:
+                list(executor.map(merge_runs, groups, merged))
+            for group in groups:
+                for runfile in group:
+                    os.remove(runfile)
+            runs = merged
+
+        tmp_outfile = outfile + '.sorting'  # on the same file system
+        count = merge_runs(runs, tmp_outfile, get_compression(outfile))
+        os.replace(tmp_outfile, outfile)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        shutil.rmtree(rundir)
+
+    LOG.info("Wrote %i distinct lines to %s", count, outfile)
+    return count
+
+
+def _make_runs(infile, rundir, memory, workers, executor):
+    # the chunk being read plus one per worker (& its pickled copy)
+    budget = max(2 ** 20, memory // (2 * workers + 1))
+    runs = []
+    pending = set()
+    chunk = []
+    size = 0
+    with open_lines(infile) as reader:
+        for line in reader:
+            if line.isspace():
+                continue
+            if line[-1] != '\n':
+                line += '\n'
+            chunk.append(line)
+            size += len(line) + LINE_OVERHEAD
+            if size >= budget:
+                runs.append(os.path.join(rundir, 'run_%i' % len(runs)))
+                if executor is None:
+                    sort_run(chunk, runs[-1])
+                else:
+                    if len(pending) >= workers:
+                        done, pending = concurrent.futures.wait(
+                            pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                        for future in done:
+                            future.result()
+                    pending.add(executor.submit(sort_run, chunk, runs[-1]))
+                chunk = []
+                size = 0
+    if chunk or not runs:
+        runs.append(os.path.join(rundir, 'run_%i' % len(runs)))
+        sort_run(chunk, runs[-1])
+    for future in concurrent.futures.as_completed(pending):
+        future.result()
+    return runs
+
+
+def sort_run(lines, runfile):
+    '''
+    Write the distinct lines, sorted
+    :return: str  runfile
+    '''
+    with open(runfile, 'w', encoding='utf-8') as writer:
+        writer.writelines(sorted(set(lines)))
+    return runfile
+
+
+def merge_runs(runs, outfile, compression=None):
+    '''
+    k-way merge of sorted files, writing each distinct line once
+    :return: int  count of lines written
+    '''
+    readers = [open(runfile, 'r', encoding='utf-8') for runfile in runs]
+    count = 0
+    previous = None
+    try:
+        with StreamedGraph.open(outfile, compression) as writer:
+            for line in heapq.merge(*readers):
+                if line != previous:
+                    writer.write(line)
+                    previous = line
+                    count += 1
+    finally:
+        for reader in readers:
+            reader.close()
+    return count
+
+
+def main():
+    argparser = argparse.ArgumentParser(
+        description='sort N-Triples, keeping one of each line')
+    argparser.add_argument('infile', help='input, may end in .gz or .zst')
+    argparser.add_argument(
+        '-o', '--output', help='output file. default: replace the input')
+    argparser.add_argument(
+        '-m', '--memory', type=int, default=1024, help='memory budget in MB')
+    argparser.add_argument(
+        '-w', '--workers', type=int, default=1,
+        help='processes generating (and merging) sorted runs')
+    argparser.add_argument(
+        '-t', '--tmpdir', help='directory for runs. default: beside the output')
+    args = argparser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    sort_ntriples(
+        args.infile, args.output, args.memory * 2 ** 20, args.workers, args.tmpdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+"""
+    Read the delimited tables ingests parse (tsv, csv; plain, gzip, zstd,
+    zip or tar) a row at a time, as light named tuples.
+
+    The expected columns are found in the header once, rather than with
+    `columns.index(name)` for every field of every row; rows may be selected
+    on a column's value (i.e. test ids, taxa) before a row is made of them,
+    and reading stops at the limit.
+"""
+
+import io
+import os
+import re
+import csv
+import time
+import tarfile
+import zipfile
+import logging
+from collections import namedtuple
+from operator import itemgetter
+
+from dipper.utils.SortUtil import open_lines
+from dipper.utils.MetricsUtil import count_rows
+
+LOG = logging.getLogger(__name__)
+
+# malformed rows reported in full, before only counting them
+MALFORMED_REPORTED = 10
+
+# lines in each chunk of a table read by other processes (see ShardUtil)
+CHUNK_LINES = 2 ** 15
+
+
+def open_table(filename, member=None, encoding='utf-8'):
+    '''
+    Open a text table, from within a tar or zip archive if it is one
+    :param filename: str
+    :param member: str  name of the table within the archive (default: the first)
+    :return: text file handle
+    '''
+    if re.search(r'\.(tar(\.gz|\.bz2|\.xz)?|tgz)$', filename):
+        archive = tarfile.open(filename, 'r:*')
+        if member is None:
+            member = next(info for info in archive if info.isfile())
+        return io.TextIOWrapper(archive.extractfile(member), encoding=encoding)
+    if filename.endswith('.zip'):
+        archive = zipfile.ZipFile(filename)
+        if member is None:
+            member = archive.namelist()[0]
+        return io.TextIOWrapper(archive.open(member), encoding=encoding)
+    if encoding != 'utf-8' and not filename.endswith(('.gz', '.zst')):
+        return open(filename, 'r', encoding=encoding)
+    return open_lines(filename)
+
+
+def make_row_class(columns):
+    '''
+    A namedtuple of the columns, each named as an identifier:
+    'Mim Number' is row.Mim_Number, 'tax_id' is row.tax_id
+    '''
+    fields = [re.sub(r'\W+', '_', str(column)).strip('_') for column in columns]
+    return namedtuple('Row', fields, rename=True)
+
+
+class TableReader:
+    """
+    Iterate over the rows of a table as namedtuples of the expected columns
+
+        reader = TableReader(
+            'raw/ncbigene/gene_info.gz', columns, select={'tax_id': {'9606'}})
+        for row in reader:
+            gene_id = 'NCBIGene:' + row.GeneID
+
+    :param filename: str  .gz, .zst, .zip and .tar(.gz) are opened as such
+    :param columns: list of expected column names, found by name in the header;
+                    without a header, the columns of the table in order.
+                    None yields each row as a list of every field
+    :param delimiter: str
+    :param quotechar: str  read with the csv module if given (quoted fields
+                      may hold the delimiter), else lines are simply split
+    :param comment: str  lines starting with it are skipped
+                    (it is stripped from the start of a header)
+    :param header: bool  whether the first line (after `skip`) names the columns
+    :param skip: int  lines before the header (or first row) to pass over
+    :param select: dict  column name -> collection of values; only rows having
+                   one of the values in each of these columns are yielded
+    :param limit: int  stop after yielding this many rows
+    :param strip: bool  strip white space from the start & end of each field
+    :param member: str  the table within a tar or zip archive
+    :param prefilter: str  regular expression a line must contain to be split
+                      into a row, a quick first pass over lines that can not
+                      be selected (tables without quoted fields)
+    """
+
+    def __init__(
+            self, filename, columns=None, delimiter='\t', quotechar=None,
+            comment='#', header=True, skip=0, select=None, limit=None,
+            strip=False, member=None, encoding='utf-8', prefilter=None):
+        self.filename = filename
+        self.columns = list(columns) if columns is not None else None
+        self.delimiter = delimiter
+        self.quotechar = quotechar
+        self.comment = comment
+        self.has_header = header
+        self.skip = skip
+        self.select = select or {}
+        self.limit = limit
+        self.strip = strip
+        self.member = member
+        self.encoding = encoding
+        if prefilter is not None and quotechar is not None:
+            raise ValueError("Lines of quoted fields are not prefiltered")
+        self.prefilter = None if prefilter is None else re.compile(prefilter).search
+
+        self.header = None          # the column names the file has
+        self.row_class = None if columns is None else make_row_class(self.columns)
+        self.rows_read = 0          # rows of data, selected or not
+        self.rows_kept = 0          # rows yielded
+        self.malformed = 0          # rows lacking expected columns, skipped
+        self.line_num = 0           # of the last line read
+        self.seconds = 0.0
+        self._plan = None           # how fields become rows, once the header is read
+        self._chunk = None          # lines to read instead of the file
+
+    def _split(self, lines):
+        if self.quotechar is None:
+            delimiter = self.delimiter
+            prefilter = self.prefilter
+            for line in lines:
+                self.line_num += 1
+                line = line.rstrip('\r\n')
+                if line == '' or (self.comment and line.startswith(self.comment)):
+                    continue
+                if prefilter is not None and prefilter(line) is None:
+                    self.rows_read += 1     # and passed over
+                    continue
+                yield line.split(delimiter)
+        else:
+            before = self.line_num     # the header and skipped lines
+            reader = csv.reader(
+                lines, delimiter=self.delimiter, quotechar=self.quotechar)
+            for fields in reader:
+                self.line_num = before + reader.line_num
+                if not fields or (
+                        self.comment and fields[0].startswith(self.comment)):
+                    continue
+                yield fields
+
+    def _read_header(self, lines):
+        line = next(lines, '')
+        self.line_num += 1
+        if self.comment and line.startswith(self.comment):
+            line = line[len(self.comment):].lstrip()
+        if self.quotechar is None:
+            return line.rstrip('\r\n').split(self.delimiter)
+        return next(csv.reader(
+            [line], delimiter=self.delimiter, quotechar=self.quotechar), [])
+
+    def get_indices(self):
+        '''
+        The position in the file of each expected column
+        :return: list of int
+        '''
+        if self.header is None:
+            return list(range(len(self.columns)))
+        missing = [name for name in self.columns if name not in self.header]
+        if missing:
+            LOG.error(
+                '\nExpected header: %s\nReceived header: %s', self.columns, self.header)
+            raise AssertionError(
+                'The header of {} is missing columns {}'.format(self.filename, missing))
+        if self.header != self.columns:
+            LOG.warning(
+                "%s has columns reordered or added: %s", self.filename,
+                [name for name in self.header if name not in self.columns])
+        return [self.header.index(name) for name in self.columns]
+
+    def _prepare(self, lines):
+        '''
+        Pass over the lines before the header and read it,
+        then plan how the fields of each line become a row
+        '''
+        for _ in range(self.skip):
+            next(lines, None)
+            self.line_num += 1
+        if self.has_header:
+            self.header = self._read_header(lines)
+
+        make = getter = None
+        width = 0
+        if self.columns is None:
+            selected = [(int(pos), set(values)) for (pos, values) in self.select.items()]
+        else:
+            indices = self.get_indices()
+            width = max(indices) + 1
+            make = self.row_class._make
+            if len(indices) == 1:
+                getter = lambda fields: (fields[indices[0]],)
+            elif indices != list(range(len(indices))):
+                getter = itemgetter(*indices)
+            selected = [
+                (indices[self.columns.index(name)], set(values))
+                for (name, values) in self.select.items()]
+        self._plan = (make, getter, width, selected)
+
+    def __iter__(self):
+        start = time.perf_counter()
+        handle = None
+        try:
+            if self._chunk is None:
+                handle = open_table(self.filename, self.member, self.encoding)
+                lines = iter(handle)
+                self._prepare(lines)
+            else:
+                lines = iter(self._chunk)
+            (make, getter, width, selected) = self._plan
+
+            for fields in self._split(lines):
+                self.rows_read += 1
+                if len(fields) < width:
+                    self._report_malformed(fields)
+                    continue
+                if self.strip:
+                    fields = [field.strip() for field in fields]
+                if selected and not all(
+                        fields[pos] in values for (pos, values) in selected):
+                    continue
+                self.rows_kept += 1
+                if make is None:
+                    yield fields
+                elif getter is not None:
+                    yield make(getter(fields))
+                elif len(fields) == width:
+                    yield make(fields)
+                else:
+                    yield make(fields[:width])
+                if self.limit is not None and self.rows_kept >= self.limit:
+                    break
+        finally:
+            self.seconds += time.perf_counter() - start
+            if handle is not None:
+                handle.close()
+                count_rows(self.rows_read)
+                self.log_rate()
+
+    def chunks(self, size=CHUNK_LINES):
+        '''
+        The lines of the table after its header, in lists of about `size`,
+        each ending where a row does (not within a quoted field),
+        for copies of this reader in other processes to read (see use_chunk)
+        :return: iterator of (number of the line before the chunk, list of lines)
+        '''
+        with open_table(self.filename, self.member, self.encoding) as handle:
+            lines = iter(handle)
+            self._prepare(lines)
+            first = self.line_num
+            chunk = []
+            quoted = False
+            for line in lines:
+                chunk.append(line)
+                if self.quotechar is not None and line.count(self.quotechar) % 2:
+                    quoted = not quoted
+                if len(chunk) >= size and not quoted:
+                    yield (first, chunk)
+                    first += len(chunk)
+                    chunk = []
+            if chunk:
+                yield (first, chunk)
+
+    def use_chunk(self, line_num, lines):
+        '''
+        Read these lines of the table (from chunks()) when next iterated,
+        rather than the file, counting rows afresh
+        :param line_num: int  number of the line before them
+        :param lines: list of str
+        '''
+        self._chunk = lines
+        self.line_num = line_num
+        self.rows_read = self.rows_kept = self.malformed = 0
+
+    def _report_malformed(self, fields):
+        self.malformed += 1
+        if self.malformed <= MALFORMED_REPORTED:
+            LOG.warning(
+                "Skipping line %i of %s, %i columns are expected: %s",
+                self.line_num, self.filename, len(self.columns), fields)
+
+    def log_rate(self):
+        '''
+        Log the rows read, kept and skipped, and how quickly
+        (the seconds include those the caller took over each row)
+        '''
+        LOG.info(
+            "Read %i rows (kept %i, %i malformed) from %s in %.1f sec (%i rows/sec)",
+            self.rows_read, self.rows_kept, self.malformed,
+            os.path.basename(self.filename), self.seconds,
+            self.rows_read / max(self.seconds, 1e-6))
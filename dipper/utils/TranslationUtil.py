@@ -0,0 +1,98 @@
+"""
+    Load the translation tables (translationtable/*.yaml) once per process,
+    from compiled copies where they are as new as the yaml.
+
+    The yaml of a table is parsed when it changes; the dict it makes is
+    pickled to __pycache__/ beside it, keyed by the yaml's mtime and size,
+    so the graphs and ingests of later runs read it back rather than
+    parse GLOBAL_TERMS.yaml (and their own table) again.
+"""
+
+import os
+import pickle
+import logging
+
+import yaml
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+LOG = logging.getLogger(__name__)
+
+TT_DIR = os.path.normpath(
+    os.path.join(os.path.dirname(__file__), '../../translationtable'))
+GLOBAL_TT = os.path.join(TT_DIR, 'GLOBAL_TERMS.yaml')
+
+# yaml file -> its table, as loaded in this process
+_TABLES = {}
+
+
+def _cache_file(yamlfile):
+    return os.path.join(
+        os.path.dirname(yamlfile), '__pycache__', os.path.basename(yamlfile) + '.pickle')
+
+
+def load_table(yamlfile):
+    '''
+    A translation table, parsed only when its yaml is newer than its compiled copy
+    :param yamlfile: str  path of the yaml
+    :return: dict  shared by every caller in this process; copy it to change it
+    '''
+    yamlfile = os.path.abspath(yamlfile)
+    stat = os.stat(yamlfile)
+    key = (stat.st_mtime_ns, stat.st_size)
+    if yamlfile in _TABLES and _TABLES[yamlfile][0] == key:
+        return _TABLES[yamlfile][1]
+
+    table = None
+    cache_file = _cache_file(yamlfile)
+    try:
+        with open(cache_file, 'rb') as cache:
+            (cached_key, cached) = pickle.load(cache)
+        if cached_key == key:
+            table = cached
+    except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+        pass
+
+    if table is None:
+        with open(yamlfile) as fhandle:
+            table = yaml.load(fhandle, Loader=SafeLoader)
+        if table is None:
+            table = {}
+        try:
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+            # replace rather than rewrite, other processes may be reading it
+            tmpfile = '{}.{}.tmp'.format(cache_file, os.getpid())
+            with open(tmpfile, 'wb') as cache:
+                pickle.dump((key, table), cache, pickle.HIGHEST_PROTOCOL)
+            os.replace(tmpfile, cache_file)
+        except OSError as err:
+            LOG.debug("Not caching %s: %s", yamlfile, err)
+
+    _TABLES[yamlfile] = (key, table)
+    return table
+
+
+def get_globaltt():
+    '''
+    :return: dict  GLOBAL_TERMS.yaml, ontology label -> curie
+    '''
+    return load_table(GLOBAL_TT)
+
+
+def compose(localtt, globaltt):
+    '''
+    What Source.resolve makes of each word: its local translation's global
+    term, else the word's own global term. Words whose local translation has
+    no global term are left out, for resolve to report as it first meets them.
+    :return: dict  word -> curie
+    '''
+    resolved = dict(globaltt)
+    for (word, label) in localtt.items():
+        if label in globaltt:
+            resolved[word] = globaltt[label]
+        else:
+            resolved.pop(word, None)
+    return resolved
@@ -20,11 +20,12 @@ setup(
     author_email='kshefchek@gmail.com',
     url='https://github.com/monarch-initiative/dipper',
     description='Library for transforming data from open genomic databases to RDF',
-    packages=find_packages(),
+    packages=find_packages(exclude=['benchmarks', 'benchmarks.*']),
     license='BSD',
     install_requires=[
         'psycopg2', 'rdflib', 'isodate', 'roman', 'python-docx', 'pyyaml',
-        'pysftp', 'beautifulsoup4', 'GitPython', 'intermine', 'pandas'],
+        'requests', 'pysftp', 'beautifulsoup4', 'GitPython', 'intermine', 'pandas'],
+    extras_require={'zstd': ['zstandard'], 'compact_graph': ['numpy']},
     include_package_data=True,
 
     keywords='ontology graph obo owl sparql rdf',
@@ -6,7 +6,7 @@
 
 
 # about 20 hours sequentially
-# might want to run them in parallel
+# or run them in parallel with `dipper-etl.py --jobs N`
 # (i.e. panther first, along with everything else on other cores )
 
 # note this places the 'out' dir in the directory it located in
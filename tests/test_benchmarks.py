@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+
+import unittest
+import logging
+import os
+import csv
+import gzip
+import shutil
+import tarfile
+import tempfile
+import xml.etree.ElementTree as ET
+
+from benchmarks.fixtures import make_fixtures, FIXTURES
+
+logging.basicConfig(level=logging.WARNING)
+LOG = logging.getLogger(__name__)
+
+SCALE = 40
+
+
+class FixturesTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.rawdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.rawdir)
+
+    def make(self, name):
+        rawdir = os.path.join(self.rawdir, name)
+        return (rawdir, make_fixtures(name, rawdir, SCALE))
+
+    def test_every_fixture_is_made_once(self):
+        for name in FIXTURES:
+            with self.subTest(name=name):
+                (rawdir, rows) = self.make(name)
+                self.assertTrue(all(rows.values()))
+                mtimes = {
+                    fname: os.stat(os.path.join(rawdir, fname)).st_mtime_ns
+                    for fname in rows}
+                self.assertEqual(make_fixtures(name, rawdir, SCALE), rows)
+                for fname in rows:
+                    self.assertEqual(
+                        os.stat(os.path.join(rawdir, fname)).st_mtime_ns, mtimes[fname])
+
+    def test_gene_info_columns(self):
+        (rawdir, rows) = self.make('ncbigene')
+        self.assertEqual(rows['gene_info.gz'], SCALE)
+        with gzip.open(os.path.join(rawdir, 'gene_info.gz'), 'rt') as tsv:
+            lines = [line.rstrip('\n').split('\t') for line in tsv]
+        self.assertEqual(lines[0][0], '#tax_id')
+        self.assertEqual({len(row) for row in lines}, {16})
+
+    def test_gaf_columns(self):
+        (rawdir, rows) = self.make('go')
+        with gzip.open(os.path.join(rawdir, 'goa_human.gaf.gz'), 'rt') as gaf:
+            lines = [row for row in csv.reader(gaf, delimiter='\t') if row[0][0] != '!']
+        self.assertEqual(len(lines), SCALE)
+        self.assertEqual({len(row) for row in lines}, {17})
+
+    def test_panther_pairs(self):
+        (rawdir, rows) = self.make('panther')
+        with tarfile.open(os.path.join(rawdir, 'RefGenomeOrthologs.tar.gz'), 'r:gz') as tar:
+            member = tar.getmembers()[0]
+            lines = tar.extractfile(member).read().decode().splitlines()
+        self.assertEqual(len(lines), SCALE)
+        for line in lines:
+            row = line.split('\t')
+            self.assertEqual(len(row), 5)
+            self.assertEqual(len(row[0].split('|')), 3)
+            self.assertEqual(len(row[1].split('|')), 3)
+
+    def test_mgi_tables_match_headers(self):
+        (rawdir, rows) = self.make('mgi')
+        for table in rows:
+            with open(os.path.join(rawdir, table)) as tsv:
+                widths = {line.count('\t') for line in tsv}
+            self.assertEqual(len(widths), 1, table)
+
+    def test_clinvar_accessions_unique(self):
+        (rawdir, rows) = self.make('clinvarxml_alpha')
+        with gzip.open(
+                os.path.join(rawdir, 'ClinVarFullRelease_00-latest.xml.gz')) as xml:
+            release = ET.parse(xml).getroot()
+        accessions = [
+            elem.get('Acc') for elem in release.iterfind(
+                './ClinVarSet/ReferenceClinVarAssertion/ClinVarAccession')]
+        self.assertEqual(len(accessions), SCALE)
+        self.assertEqual(len(set(accessions)), SCALE)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+
+import unittest
+import logging
+import os
+import shutil
+import sqlite3
+import tempfile
+
+from rdflib import ConjunctiveGraph, URIRef, Literal
+from rdflib.namespace import RDF, OWL, DC
+from rdflib.compare import to_isomorphic
+
+from dipper.graph.RDFGraph import RDFGraph
+from dipper.graph.SQLiteGraph import SQLiteGraph
+from dipper.models.Model import Model
+from dipper.utils.GraphUtils import GraphUtils
+
+try:
+    from dipper.graph.CompactGraph import CompactGraph
+except ImportError:     # numpy is only installed with the compact_graph extra
+    CompactGraph = None
+
+logging.basicConfig(level=logging.WARNING)
+LOG = logging.getLogger(__name__)
+
+
+class CompactGraphTestCase(unittest.TestCase):
+
+    @staticmethod
+    def _fill(graph):
+        model = Model(graph)
+        for _ in range(2):      # everything twice
+            for num in range(50):
+                gene = 'NCBIGene:%i' % num
+                model.addClassToGraph(gene, 'gene %i' % num, 'SO:0000704')
+                model.addSynonym(gene, 'a "quoted"\nsynonym')
+                model.addTriple(gene, 'RO:0002162', 'NCBITaxon:9606')
+                model.addTriple(
+                    gene, 'GENO:0000866', num, object_is_literal=True,
+                    literal_type='xsd:integer')
+                model.addTriple(gene, 'RO:0002200', '_:b%i' % (num % 7))
+        return graph
+
+    def setUp(self):
+        self.graph = self._fill(self.make_graph())
+        self.rdfgraph = self._fill(RDFGraph(True, 'test'))
+
+    def make_graph(self):
+        if CompactGraph is None:
+            self.skipTest('numpy is not installed')
+        return CompactGraph(True, 'test')
+
+    def _parsed(self, fmt):
+        graph = ConjunctiveGraph()
+        graph.parse(data=self.graph.serialize(format=fmt).decode(), format=fmt)
+        return graph
+
+    def test_same_as_rdfgraph(self):
+        self.assertEqual(len(self.graph), len(self.rdfgraph))
+        self.assertEqual(set(self.graph), set(self.rdfgraph.triples((None, None, None))))
+        for fmt in ('nt', 'turtle'):
+            self.assertEqual(
+                to_isomorphic(self._parsed(fmt)), to_isomorphic(self.rdfgraph), fmt)
+
+    def test_queries(self):
+        self.assertEqual(
+            set(self.graph.predicates()), GraphUtils.get_properties_from_graph(self.rdfgraph))
+        gene = URIRef(self.graph.curie_util.get_uri('NCBIGene:7'))
+        self.assertIn(gene, set(self.graph.subjects(RDF.type, OWL.Class)))
+        self.assertEqual(
+            list(self.graph.objects(gene, URIRef(self.graph.curie_util.get_uri(
+                'GENO:0000866')))), [Literal(7)])
+        self.assertEqual(list(self.graph.predicates(URIRef('http://x.org/nothing'))), [])
+
+        self.graph.add((DC['source'], RDF.type, OWL.AnnotationProperty))
+        self.assertIn((DC['source'], RDF.type, OWL.AnnotationProperty), self.graph)
+        self.graph.remove((DC['source'], RDF.type, OWL.AnnotationProperty))
+        self.assertNotIn((DC['source'], RDF.type, OWL.AnnotationProperty), self.graph)
+        self.assertEqual(len(self.graph), len(self.rdfgraph))
+
+    def test_add_triples(self):
+        triples = [
+            ('NCBIGene:1', 'rdfs:label', 'gene 1', True),
+            ('NCBIGene:1', 'RO:0002162', 'NCBITaxon:9606'),
+            ('NCBIGene:1', 'GENO:0000866', 1, True, 'xsd:integer'),
+            ('NCBIGene:1', 'RO:0002200', None, True),     # dropped
+            ('NCBIGene:1', 'RO:0002200', '_:b1')]
+        for graph in (self.make_graph(), RDFGraph(True, 'test')):
+            single = self.make_graph()
+            for triple in triples:
+                single.addTriple(*triple)
+            graph.addTriples(iter(triples))
+            self.assertEqual(len(graph), 4)
+            self.assertEqual(
+                set(graph.triples((None, None, None))),
+                set(single.triples((None, None, None))))
+
+
+class SQLiteGraphTestCase(CompactGraphTestCase):
+
+    def make_graph(self):
+        return SQLiteGraph(True, 'test')
+
+    def tearDown(self):
+        self.graph.close()
+
+    def test_replaced_once_closed(self):
+        outdir = tempfile.mkdtemp()
+        dbfile = os.path.join(outdir, 'test.sqlite')
+
+        def count():
+            dbconn = sqlite3.connect(dbfile)
+            try:
+                return dbconn.execute('SELECT count(*) FROM triples').fetchone()[0]
+            finally:
+                dbconn.close()
+        try:
+            self._fill(SQLiteGraph(True, 'test', dbfile)).close()
+            self.assertEqual(count(), len(self.graph))
+            # a second graph of the same file leaves the first until it is done
+            graph = SQLiteGraph(True, 'test', dbfile)
+            graph.addTriple('NCBIGene:1', 'RO:0002162', 'NCBITaxon:9606')
+            graph.commit()
+            self.assertEqual(count(), len(self.graph))
+            graph.close()
+            self.assertEqual(count(), 1)
+            self.assertEqual(os.listdir(outdir), ['test.sqlite'])
+        finally:
+            shutil.rmtree(outdir)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+
+import unittest
+import logging
+
+from dipper.utils.CurieUtil import CurieUtil
+from dipper import curie_map
+
+logging.basicConfig(level=logging.WARNING)
+LOG = logging.getLogger(__name__)
+
+
+class CurieUtilTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.curie_util = CurieUtil({
+            'OBO': 'http://purl.obolibrary.org/obo/',
+            'HP': 'http://purl.obolibrary.org/obo/HP_',
+            'GO': 'http://purl.obolibrary.org/obo/GO_',
+            'NCBIGene': 'https://www.ncbi.nlm.nih.gov/gene/'})
+
+    def test_longest_prefix(self):
+        self.assertEqual(
+            self.curie_util.get_curie('http://purl.obolibrary.org/obo/HP_0000118'),
+            'HP:0000118')
+        self.assertEqual(
+            self.curie_util.get_curie('http://purl.obolibrary.org/obo/UBERON_0001'),
+            'OBO:UBERON_0001')
+        self.assertEqual(
+            self.curie_util.get_curie_prefix('http://purl.obolibrary.org/obo/HP'),
+            'OBO')
+        self.assertIsNone(self.curie_util.get_curie('http://example.org/x'))
+        self.assertIsNone(self.curie_util.get_curie('http://purl'))
+
+    def test_batch(self):
+        uris = [
+            'https://www.ncbi.nlm.nih.gov/gene/1',
+            'http://purl.obolibrary.org/obo/GO_0008150',
+            'https://www.ncbi.nlm.nih.gov/gene/1',
+            'http://example.org/x']
+        curies = self.curie_util.get_curies(uris)
+        self.assertEqual(
+            curies, ['NCBIGene:1', 'GO:0008150', 'NCBIGene:1', None])
+        self.assertEqual(self.curie_util.get_uris(curies[:3]), uris[:3])
+
+    def test_curie_map_round_trip(self):
+        cmap = curie_map.get()
+        curie_util = CurieUtil(cmap)
+        for prefix, base in cmap.items():
+            if prefix != '' and curie_util.uri_map[base] == prefix:
+                self.assertEqual(
+                    curie_util.get_curie(curie_util.get_uri(prefix + ':123')),
+                    prefix + ':123')
+
+
+if __name__ == '__main__':
+    unittest.main()
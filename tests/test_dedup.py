@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+
+import unittest
+import logging
+import os
+import shutil
+import tempfile
+
+from dipper.utils.DedupUtil import digest, DigestSet, BloomFilter
+
+logging.basicConfig(level=logging.WARNING)
+LOG = logging.getLogger(__name__)
+
+
+class DedupTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.spill_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.spill_dir)
+
+    def test_digest_set_spills(self):
+        seen = DigestSet(max_memory=100, spill_dir=self.spill_dir)
+        items = [digest('triple %i' % num) for num in range(1000)]
+        self.assertTrue(all(seen.add(item) for item in items))
+        self.assertEqual(len(os.listdir(self.spill_dir)), 1)
+        self.assertLess(len(seen.memory), 100)
+
+        # repeats are found whether in memory or on disk
+        self.assertFalse(any(seen.add(item) for item in items))
+        self.assertNotIn(digest('triple 1000'), seen)
+        self.assertEqual(len(seen), 1000)
+
+        seen.close()
+        self.assertEqual(os.listdir(self.spill_dir), [])
+
+    def test_bloom_filter(self):
+        bloom = BloomFilter(capacity=10000, error_rate=0.01)
+        added = sum(bloom.add(digest('triple %i' % num)) for num in range(10000))
+        self.assertGreater(added, 9800)
+        self.assertIn(digest('triple 1'), bloom)
+        self.assertFalse(bloom.add(digest('triple 1')))
+
+        false_positives = sum(
+            digest('other %i' % num) in bloom for num in range(10000))
+        self.assertLess(false_positives, 300)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+
+import unittest
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import functools
+import hashlib
+from unittest import mock
+from email.utils import parsedate_to_datetime
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+from dipper.utils.FetchUtil import FetchUtil, FetchMetadata, ContentStore
+from dipper.sources.Source import Source
+from dipper.sources.NCBIGene import NCBIGene
+
+logging.basicConfig(level=logging.WARNING)
+LOG = logging.getLogger(__name__)
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'    # keep-alive
+
+    def log_message(self, *args):
+        pass
+
+
+class RangeHandler(QuietHandler):
+    """
+    Serves an ETag (md5 of the contents), honours conditional and Range requests
+    and can drop the connection part way through a response
+    """
+    cut = {}        # path -> bytes to send before hanging up (once)
+    ranges = []     # the Range header of every request
+
+    def do_GET(self):
+        path = self.translate_path(self.path)
+        if not os.path.isfile(path):
+            self.send_error(404)
+            return
+        with open(path, 'rb') as fh:
+            data = fh.read()
+        etag = '"%s"' % hashlib.md5(data).hexdigest()
+        mtime = int(os.path.getmtime(path))
+        since = self.headers.get('If-Modified-Since')
+        if self.headers.get('If-None-Match') == etag or (
+                self.headers.get('If-None-Match') is None and since is not None and
+                parsedate_to_datetime(since).timestamp() >= mtime):
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        RangeHandler.ranges.append(self.headers.get('Range'))
+        start = 0
+        if self.headers.get('Range') is not None and \
+                self.headers.get('If-Range', etag) == etag:
+            start = int(self.headers['Range'][6:].split('-')[0])
+        body = data[start:]
+        self.send_response(206 if start else 200)
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', self.date_time_string(mtime))
+        self.send_header('Content-Length', str(len(body)))
+        if start:
+            self.send_header(
+                'Content-Range', 'bytes %i-%i/%i' % (start, len(data) - 1, len(data)))
+        self.end_headers()
+        if self.path in self.cut:
+            body = body[:self.cut.pop(self.path)]
+            self.close_connection = True
+        self.wfile.write(body)
+
+
+class FetchUtilTestCase(unittest.TestCase):
+    """
+    Fetch files from a throw away local web server
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.served = tempfile.mkdtemp()
+        for num in range(6):
+            with open(os.path.join(cls.served, 'file%i.txt' % num), 'w') as fh:
+                fh.write('line %i\n' % num * 10000)
+        handler = functools.partial(RangeHandler, directory=cls.served)
+        cls.server = ThreadingHTTPServer(('localhost', 0), handler)
+        cls.base = 'http://localhost:%i/' % cls.server.server_port
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        shutil.rmtree(cls.served)
+
+    def setUp(self):
+        self.fetcher = FetchUtil(workers=3, host_limit=2)
+        self.rawdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.rawdir)
+
+    def _same(self, fname):
+        with open(os.path.join(self.served, fname), 'rb') as expected, \
+                open(os.path.join(self.rawdir, fname), 'rb') as received:
+            return expected.read() == received.read()
+
+    def test_download(self):
+        self.fetcher.download(
+            self.base + 'file0.txt', os.path.join(self.rawdir, 'file0.txt'))
+        self.assertTrue(self._same('file0.txt'))
+
+    def test_fetch_all_is_host_limited(self):
+        active = []
+        most = []
+        lock = threading.Lock()
+
+        def fetch(url, localfile):
+            with self.fetcher.host_slot(url):
+                with lock:
+                    active.append(url)
+                    most.append(len(active))
+                self.fetcher.session.get(url).content
+                with lock:
+                    active.remove(url)
+            self.fetcher.download(url, localfile)
+            return localfile
+
+        jobs = [
+            (self.base + 'file%i.txt' % num,
+             os.path.join(self.rawdir, 'file%i.txt' % num)) for num in range(6)]
+        results = self.fetcher.fetch_all(fetch, jobs)
+
+        self.assertEqual(results, [job[1] for job in jobs])
+        self.assertLessEqual(max(most), 2)
+        for num in range(6):
+            self.assertTrue(self._same('file%i.txt' % num))
+
+    def test_fetch_all_raises(self):
+        jobs = [
+            (self.base + 'file0.txt', os.path.join(self.rawdir, 'file0.txt')),
+            (self.base + 'missing.txt', os.path.join(self.rawdir, 'missing.txt'))]
+        with self.assertRaises(Exception):
+            self.fetcher.fetch_all(self.fetcher.download, jobs)
+        # the other job still finished
+        self.assertTrue(self._same('file0.txt'))
+
+    def test_download_records_metadata(self):
+        localfile = os.path.join(self.rawdir, 'file1.txt')
+        entry = self.fetcher.download(self.base + 'file1.txt', localfile)
+        self.assertTrue(entry['changed'])
+        self.assertEqual(entry['size'], os.path.getsize(localfile))
+        checksums = FetchUtil.get_file_checksums(localfile)
+        self.assertEqual(entry['sha256'], checksums['sha256'])
+        self.assertEqual(entry['md5'], checksums['md5'])
+        self.assertIsNotNone(entry['last_modified'])
+
+    def test_conditional_download(self):
+        remote = os.path.join(self.served, 'file2.txt')
+        localfile = os.path.join(self.rawdir, 'file2.txt')
+        first = self.fetcher.download(self.base + 'file2.txt', localfile)
+
+        # nothing changed: a 304 and the local copy is kept
+        os.remove(localfile)
+        with open(localfile, 'w') as fh:
+            fh.write('local copy')
+        second = self.fetcher.download(
+            self.base + 'file2.txt', localfile, cached=first)
+        self.assertFalse(second['changed'])
+        self.assertEqual(second['sha256'], first['sha256'])
+        with open(localfile) as fh:
+            self.assertEqual(fh.read(), 'local copy')
+
+        # remote is updated
+        with open(remote, 'a') as fh:
+            fh.write('more\n')
+        mtime = os.path.getmtime(remote) + 10
+        os.utime(remote, (mtime, mtime))
+        third = self.fetcher.download(
+            self.base + 'file2.txt', localfile, cached=first)
+        self.assertTrue(third['changed'])
+        self.assertTrue(self._same('file2.txt'))
+
+    def test_metadata_store(self):
+        store = FetchMetadata.for_directory(self.rawdir)
+        self.assertIs(store, FetchMetadata.for_directory(self.rawdir + '/'))
+        store.set('file3.txt', {'url': 'x', 'etag': '"abc"', 'changed': True})
+
+        reread = FetchMetadata(self.rawdir)
+        self.assertEqual(reread.get('file3.txt'), {'url': 'x', 'etag': '"abc"'})
+        self.assertIsNone(reread.get('file4.txt'))
+
+    def test_content_store(self):
+        store = ContentStore(os.path.join(self.rawdir, '.sha256'))
+        first = os.path.join(self.rawdir, 'first.txt')
+        second = os.path.join(self.rawdir, 'second.txt')
+        for localfile in (first, second):
+            with open(localfile, 'w') as fh:
+                fh.write('same contents\n')
+        sha256 = FetchUtil.get_file_checksums(first)['sha256']
+
+        self.assertFalse(store.add(first, sha256))
+        self.assertTrue(store.add(second, sha256))
+        self.assertTrue(os.path.samefile(first, second))
+        self.assertEqual(os.stat(store.path(sha256)).st_nlink, 3)
+
+        self.assertEqual(store.prune(), 0)
+        os.remove(first)
+        os.remove(second)
+        self.assertEqual(store.prune(), 1)
+        self.assertFalse(os.path.exists(store.path(sha256)))
+
+    def test_resume_interrupted_download(self):
+        localfile = os.path.join(self.rawdir, 'file4.txt')
+        RangeHandler.ranges = []
+        RangeHandler.cut['/file4.txt'] = 1000
+
+        entry = self.fetcher.download(self.base + 'file4.txt', localfile)
+        self.assertTrue(self._same('file4.txt'))
+        self.assertEqual(RangeHandler.ranges, [None, 'bytes=1000-'])
+        self.assertEqual(
+            entry['sha256'], FetchUtil.get_file_checksums(localfile)['sha256'])
+        self.assertEqual(os.listdir(self.rawdir), ['file4.txt'])
+
+    def test_resume_partial_from_earlier_run(self):
+        localfile = os.path.join(self.rawdir, 'file5.txt')
+        RangeHandler.cut['/file5.txt'] = 2000
+        with self.assertRaises(IOError):
+            FetchUtil(retries=1).download(self.base + 'file5.txt', localfile)
+        self.assertFalse(os.path.exists(localfile))
+        self.assertEqual(os.path.getsize(localfile + '.part'), 2000)
+
+        RangeHandler.ranges = []
+        self.fetcher.download(self.base + 'file5.txt', localfile)
+        self.assertEqual(RangeHandler.ranges, ['bytes=2000-'])
+        self.assertTrue(self._same('file5.txt'))
+        self.assertFalse(os.path.exists(localfile + '.part'))
+
+    def test_partial_of_changed_file_restarts(self):
+        remote = os.path.join(self.served, 'file0.txt')
+        localfile = os.path.join(self.rawdir, 'file0.txt')
+        RangeHandler.cut['/file0.txt'] = 2000
+        with self.assertRaises(IOError):
+            FetchUtil(retries=1).download(self.base + 'file0.txt', localfile)
+
+        with open(remote, 'a') as fh:
+            fh.write('changed\n')
+        self.fetcher.download(self.base + 'file0.txt', localfile)
+        self.assertTrue(self._same('file0.txt'))
+
+    def test_fetch_artifact(self):
+        cwd = os.getcwd()
+        os.chdir(self.rawdir)
+        try:
+            artifact = {'file': 'gene_group.txt', 'url': self.base + 'file3.txt'}
+            with mock.patch.dict(NCBIGene.files, {'gene_group': artifact}):
+                Source.fetch_artifact('NCBIGene:gene_group')
+            with open(os.path.join('raw', 'ncbigene', 'gene_group.txt')) as fh, \
+                    open(os.path.join(self.served, 'file3.txt')) as served:
+                self.assertEqual(fh.read(), served.read())
+            # the owning ingest was not made, nor its graph opened
+            self.assertFalse(os.path.exists('out'))
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+
+import unittest
+import logging
+import os
+import gzip
+import shutil
+import tempfile
+
+from dipper.utils.GafUtil import GafAssociations, read_gaf
+
+logging.basicConfig(level=logging.WARNING)
+LOG = logging.getLogger(__name__)
+
+
+def annotation(db_object_id, qualifier, go_id, ref, code, taxon, extra=''):
+    return '\t'.join([
+        'MGI', db_object_id, 'Pax6', qualifier, go_id, ref, code, '', 'P',
+        'paired box 6', '', 'protein', taxon, '20190612', 'MGI']) + extra + '\n'
+
+
+class Ingest:
+    '''
+    What the association builder needs of an ingest: its translation tables
+    '''
+    name = 'test'
+    localtt = {'MGI:MGI': 'MGI', 'GOC': 'GO_REF'}
+
+    def resolve(self, word):
+        return {'IMP': 'ECO:0000315'}[word]
+
+
+class GafUtilTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.rawdir = tempfile.mkdtemp()
+        self.gaf_file = os.path.join(self.rawdir, 'mgi.gaf.gz')
+        with gzip.open(self.gaf_file, 'wt') as gaf:
+            gaf.writelines([
+                '!gaf-version: 2.1\n',
+                annotation('MGI:MGI:97490', '', 'GO:0001654', 'MGI:MGI:1|PMID:2', 'IMP',
+                           'taxon:10090', '\t\t'),
+                annotation('MGI:MGI:97490', 'NOT', 'GO:0007420', 'PMID:3', 'IDA',
+                           'taxon:10090'),
+                annotation('MGI:MGI:97490', 'NOT|colocalizes_with', 'GO:0005634',
+                           'GOC:4', 'IEA', 'taxon:10090'),
+                annotation('MGI:MGI:97491', 'contributes_to', 'GO:0003700', 'GOC:5',
+                           'IEA', 'taxon:10090|taxon:9606'),
+                annotation('MGI:MGI:97492', '', 'GO:0003700', 'PMID:6', 'IEA',
+                           'taxon:9606'),
+            ])
+
+    def tearDown(self):
+        shutil.rmtree(self.rawdir)
+
+    def test_read_gaf(self):
+        reader = read_gaf(self.gaf_file)
+        rows = list(reader)
+        self.assertEqual(
+            [row.go_id for row in rows], ['GO:0001654', 'GO:0003700', 'GO:0003700'])
+        self.assertEqual(rows[0].date, '20190612')
+        self.assertEqual(reader.rows_read, 5)
+        self.assertEqual(reader.malformed, 0)
+
+    def test_negated_and_taxa(self):
+        rows = list(read_gaf(self.gaf_file, taxa=['10090']))
+        self.assertEqual([row.db_object_id for row in rows], ['MGI:MGI:97490', 'MGI:MGI:97491'])
+        rows = list(read_gaf(self.gaf_file, taxa=['9606'], negated=True))
+        self.assertEqual([row.db_object_id for row in rows], ['MGI:MGI:97492'])
+        self.assertEqual(len(list(read_gaf(self.gaf_file, negated=True))), 5)
+
+    def test_translations(self):
+        row = next(iter(read_gaf(self.gaf_file)))
+        gaf = GafAssociations(Ingest(), {'IEA': 'ECO:0000501', 'IEA-GOC:4': 'ECO:0000256'})
+        self.assertEqual(gaf.get_gene_id(row), 'MGI:97490')
+        self.assertEqual(gaf.get_references(row), ['MGI:1', 'PMID:2'])
+        self.assertEqual(gaf.get_evidence('IEA'), 'ECO:0000501')
+        self.assertIsNone(gaf.get_evidence('IMP'))
+        self.assertEqual(GafAssociations(Ingest()).get_evidence('IMP'), 'ECO:0000315')
+
+
+if __name__ == '__main__':
+    unittest.main()
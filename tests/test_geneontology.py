@@ -2,6 +2,11 @@
 
 import unittest
 import logging
+import os
+import gzip
+import shutil
+import tempfile
+from unittest import mock
 from dipper.sources.GeneOntology import GeneOntology
 from tests.test_source import SourceTestCase
 
@@ -21,5 +26,62 @@ class GeneOntologyTestCase(SourceTestCase):
         self.source = None
         return
 
+
+def annotation(db, db_object_id, qualifier, go_id, aspect, taxon):
+    return '\t'.join([
+        db, db_object_id, 'GENE', qualifier, go_id, 'PMID:1', 'IDA', '', aspect,
+        'a gene', '', 'protein', taxon, '20190612', 'UniProt']) + '\n'
+
+
+class ProcessGafTestCase(unittest.TestCase):
+    '''
+    The graph process_gaf makes of a few annotations,
+    without the UniProt id map or the ECO map being fetched
+    '''
+
+    def setUp(self):
+        self.rawdir = tempfile.mkdtemp()
+        self.gaf_file = os.path.join(self.rawdir, 'goa.gaf.gz')
+        with gzip.open(self.gaf_file, 'wt') as gaf:
+            gaf.writelines([
+                '!gaf-version: 2.1\n',
+                annotation('UniProtKB', 'P04637', '', 'GO:0006915', 'P', 'taxon:9606'),
+                annotation('MGI', 'MGI:MGI:97490', 'contributes_to', 'GO:0003700', 'F',
+                           'taxon:10090'),
+                annotation('MGI', 'MGI:MGI:97491', 'NOT', 'GO:0003700', 'F',
+                           'taxon:10090'),
+                annotation('ZFIN', 'ZDB-GENE-990415-200', '', 'GO:0003700', 'F',
+                           'taxon:7955'),
+            ])
+        with mock.patch.object(
+                GeneOntology, 'get_uniprot_entrez_id_map',
+                return_value={'P04637': 'NCBIGene:7157'}), \
+                mock.patch.object(
+                    GeneOntology, 'get_eco_map', return_value={'IDA': 'ECO:0000314'}):
+            self.source = GeneOntology('rdf_graph', True, ['9606', '10090'])
+
+    def tearDown(self):
+        shutil.rmtree(self.rawdir)
+
+    def test_associations(self):
+        source = self.source
+        graph = source.graph
+        source.process_gaf(
+            self.gaf_file, None, source.uniprot_entrez_id_map, source.eco_map)
+        subjects = set(graph.objects(
+            None, graph._getnode(source.globaltt['association has subject'])))
+        self.assertEqual(subjects, {
+            graph._getnode('NCBIGene:7157'), graph._getnode('MGI:97490')})
+        # F contributes_to is related by the aspect's relation
+        self.assertIn(
+            (graph._getnode('MGI:97490'), graph._getnode(source.globaltt['enables']),
+             graph._getnode('GO:0003700')), graph)
+        # the UniProt accession mapped from is not described
+        for assoc in graph.subjects(
+                graph._getnode(source.globaltt['association has subject'])):
+            self.assertIsNone(
+                graph.value(assoc, graph._getnode(source.globaltt['description'])))
+
+
 if __name__ == '__main__':
     unittest.main()
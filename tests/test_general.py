@@ -2,6 +2,7 @@
 
 import unittest
 import logging
+from rdflib import URIRef
 from dipper.graph.RDFGraph import RDFGraph
 from dipper import curie_map
 
@@ -34,6 +35,21 @@ class GeneralGraphTestCase(unittest.TestCase):
 
         return
 
+    def test_getnode_is_cached(self):
+        node = self.graph._getnode('GO:0008150')
+        self.assertIs(self.graph._getnode('GO:0008150'), node)
+        self.assertEqual(str(node), self.curie_map['GO'] + '0008150')
+        self.assertIn('GO', self.graph.bound_prefixes)
+        self.assertIn(
+            ('GO', URIRef(self.curie_map['GO'])),
+            list(self.graph.namespace_manager.namespaces()))
+
+        # blank nodes follow the graph they are made for
+        self.assertNotEqual(
+            self.graph._getnode('_:b1'), RDFGraph(False)._getnode('_:b1'))
+
+        return
+
     def readGraphFromTurtleFile(self, f):
         """
         This will read the specified file into a graph.  A simple parsing test.
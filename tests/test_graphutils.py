@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+
+import unittest
+import logging
+import io
+import os
+import json
+import shutil
+import tempfile
+
+from rdflib import ConjunctiveGraph, URIRef
+from rdflib.namespace import RDF, OWL
+from rdflib.compare import to_isomorphic
+
+from dipper.graph.RDFGraph import RDFGraph
+from dipper.graph.StreamedGraph import StreamedGraph
+from dipper.models.Model import Model
+from dipper.utils.GraphUtils import GraphUtils, PROPERTY_ONTOLOGIES, \
+    PROPERTY_INDEX_VERSION
+
+logging.basicConfig(level=logging.WARNING)
+LOG = logging.getLogger(__name__)
+
+
+class GraphUtilsWriteTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.outdir = tempfile.mkdtemp()
+        self.graph = RDFGraph(True, 'test')
+        model = Model(self.graph)
+        for num in range(20):
+            gene = 'NCBIGene:%i' % num
+            model.addClassToGraph(gene, 'gene "%i"' % num, 'SO:0000704')
+            model.addTriple(gene, 'RO:0002162', 'NCBITaxon:9606')
+            model.addTriple(gene, 'RO:0002200', 'HP:0000118')
+            model.addTriple(gene, 'RO:0002200', 'HP:0000119')
+            model.addTriple(gene, 'RO:0002200', '_:b%i' % num)
+            model.addTriple(
+                gene, 'GENO:0000866', num, object_is_literal=True,
+                literal_type='xsd:integer')
+            # not a valid local name
+            model.addTriple(gene, 'rdfs:seeAlso', 'http://x.org/a/b(c)')
+
+    def tearDown(self):
+        shutil.rmtree(self.outdir)
+
+    def _written(self, fmt):
+        outfile = os.path.join(self.outdir, 'test.' + fmt)
+        GraphUtils.write(self.graph, fmt, filename=outfile)
+        with open(outfile) as fh:
+            text = fh.read()
+        graph = ConjunctiveGraph()
+        graph.parse(data=text, format=fmt)
+        return text, graph
+
+    def test_write_turtle(self):
+        text, graph = self._written('turtle')
+        self.assertEqual(to_isomorphic(graph), to_isomorphic(self.graph))
+        self.assertIn('@prefix NCBIGene: <https://www.ncbi.nlm.nih.gov/gene/> .', text)
+        self.assertIn('NCBIGene:7 GENO:0000866 "7"^^xsd:integer ;', text)
+        self.assertIn('    a owl:Class ;', text)
+        self.assertIn('<http://x.org/a/b(c)>', text)
+        # reproducible
+        self.assertEqual(self._written('turtle')[0], text)
+
+    def test_write_nt(self):
+        text, graph = self._written('nt')
+        self.assertEqual(to_isomorphic(graph), to_isomorphic(self.graph))
+        self.assertEqual(len(text.splitlines()), len(self.graph))
+
+
+
+class PropertyAxiomsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.outdir = tempfile.mkdtemp()
+        self.index_file = GraphUtils.property_index_file
+        GraphUtils.property_index_file = os.path.join(self.outdir, 'properties.json')
+        GraphUtils.property_index = None
+        # as build_property_index would save it, without the downloads
+        with open(GraphUtils.property_index_file, 'w') as fhandle:
+            json.dump({
+                'version': PROPERTY_INDEX_VERSION,
+                'built': '2019-01-01T00:00:00',
+                'ontologies': {ontology: None for ontology in PROPERTY_ONTOLOGIES},
+                'properties': {
+                    self.iri('RO:0002200'): ['ObjectProperty'],
+                    self.iri('rdfs:label'): ['AnnotationProperty'],
+                    self.iri('GENO:0000866'): ['DatatypeProperty']}}, fhandle)
+
+    def tearDown(self):
+        GraphUtils.property_index_file = self.index_file
+        GraphUtils.property_index = None
+        shutil.rmtree(self.outdir)
+
+    @staticmethod
+    def iri(curie):
+        return RDFGraph.curie_util.get_uri(curie)
+
+    @staticmethod
+    def _fill(graph):
+        graph.addTriple('HP:0000001', 'RO:0002200', 'HP:0000118')
+        graph.addTriples([
+            ('HP:0000001', 'rdfs:label', 'all', True),
+            ('HP:0000001', 'RO:0002162', 'NCBITaxon:9606')])
+        return graph
+
+    def test_properties_tracked(self):
+        graph = self._fill(RDFGraph(True, 'test'))
+        self.assertEqual(
+            GraphUtils.get_properties_from_graph(graph), set(graph.predicates()))
+        streamed = self._fill(StreamedGraph(True, 'test', io.StringIO()))
+        self.assertEqual(streamed.get_properties(), set(graph.predicates()))
+
+    def test_axioms(self):
+        graph = self._fill(RDFGraph(True, 'test'))
+        GraphUtils.add_property_axioms(
+            graph, GraphUtils.get_properties_from_graph(graph))
+        self.assertEqual(
+            set(graph.objects(URIRef(self.iri('RO:0002200')), RDF.type)),
+            {OWL.ObjectProperty})
+        self.assertIn(
+            (URIRef(self.iri('rdfs:label')), RDF.type, OWL.AnnotationProperty), graph)
+        # only the properties in use
+        self.assertNotIn(
+            (URIRef(self.iri('GENO:0000866')), RDF.type, OWL.DatatypeProperty), graph)
+
+    def test_streamed_axioms(self):
+        stream = io.StringIO()
+        graph = self._fill(StreamedGraph(True, 'test', stream))
+        stream.close = lambda: None
+        GraphUtils.add_property_axioms(graph, graph.get_properties())
+        graph.close()
+        self.assertIn(
+            '<{}> <{}> <{}> .'.format(
+                self.iri('RO:0002200'), RDF.type, OWL.ObjectProperty),
+            stream.getvalue().splitlines())
+
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+
+import unittest
+import logging
+import os
+import gzip
+import shutil
+import tempfile
+
+from dipper.utils.IdMapUtil import UniProtIdMap
+
+logging.basicConfig(level=logging.WARNING)
+LOG = logging.getLogger(__name__)
+
+
+def mapping(accession, geneid, taxon, ensembl):
+    row = [''] * 22
+    (row[0], row[2], row[12], row[18]) = (accession, geneid, taxon, ensembl)
+    return '\t'.join(row) + '\n'
+
+
+class UniProtIdMapTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.rawdir = tempfile.mkdtemp()
+        self.mapping_file = os.path.join(self.rawdir, 'idmapping_selected.tab.gz')
+        self.dbfile = os.path.join(self.rawdir, 'uniprot_id_map.sqlite')
+        with gzip.open(self.mapping_file, 'wt') as tsv:
+            tsv.writelines([
+                mapping('P04637', '7157', '9606', 'ENSG00000141510'),
+                mapping('P02340', '22059', '10090', 'ENSMUSG00000059552'),
+                mapping('Q8VBT6', '', '10090', 'ENSMUSG00000026678'),
+                mapping('P01889', '3106; 3107', '9606', ''),          # not 1:1
+                mapping('Q1RLN5', '', '7955', 'ENSDARG1; ENSDARG2'),  # not 1:1
+            ])
+
+    def tearDown(self):
+        shutil.rmtree(self.rawdir)
+
+    def test_map_of_taxa(self):
+        id_map = UniProtIdMap(self.mapping_file, self.dbfile)
+        self.assertEqual(id_map.get_map(['9606']), {'P04637': 'NCBIGene:7157'})
+        self.assertEqual(id_map.get_map(['10090', '7955']), {
+            'P02340': 'NCBIGene:22059', 'Q8VBT6': 'ENSEMBL:ENSMUSG00000026678'})
+        id_map.close()
+
+    def test_lookup(self):
+        id_map = UniProtIdMap(self.mapping_file, self.dbfile)
+        self.assertEqual(id_map.lookup('P04637'), 'NCBIGene:7157')
+        self.assertEqual(id_map.lookup('P04637', ['9606', '10090']), 'NCBIGene:7157')
+        self.assertIsNone(id_map.lookup('P04637', ['10090']))
+        self.assertIsNone(id_map.lookup('P01889'))
+        id_map.close()
+
+    def test_built_once(self):
+        id_map = UniProtIdMap(self.mapping_file, self.dbfile)
+        self.assertFalse(id_map.is_current())
+        id_map.get_map(['9606'])
+        id_map.close()
+        self.assertTrue(id_map.is_current())
+        # the index is made again of a newer mapping file
+        mtime = os.path.getmtime(self.mapping_file) - 10
+        os.utime(self.dbfile, (mtime, mtime))
+        self.assertFalse(id_map.is_current())
+        self.assertEqual(id_map.get_map(['7955']), {})
+        self.assertTrue(id_map.is_current())
+        id_map.close()
+
+    def test_build_beside_another(self):
+        # the part built index of another process is left alone
+        other = self.dbfile + '.1.tmp'
+        with open(other, 'w') as part:
+            part.write('building')
+        self.assertEqual(UniProtIdMap(self.mapping_file, self.dbfile).build(), 3)
+        with open(other) as part:
+            self.assertEqual(part.read(), 'building')
+        self.assertEqual(sorted(os.listdir(self.rawdir)), sorted([
+            'idmapping_selected.tab.gz', 'uniprot_id_map.sqlite',
+            'uniprot_id_map.sqlite.1.tmp']))
+
+
+if __name__ == '__main__':
+    unittest.main()
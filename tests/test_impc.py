@@ -2,9 +2,15 @@
 
 import unittest
 import logging
+import os
 import csv
 import gzip
+import shutil
+import tempfile
 from dipper.sources.IMPC import IMPC
+from dipper.utils.TableUtil import TableReader
+from dipper.utils.ShardUtil import process_sharded, can_fork
+from dipper.graph.StreamedGraph import StreamedGraph
 from dipper.utils.CurieUtil import CurieUtil
 from dipper.utils.TestUtils import TestUtils
 from dipper import curie_map
@@ -15,6 +21,38 @@ logging.basicConfig()
 logging.getLogger().setLevel(logging.WARN)
 LOG = logging.getLogger(__name__)
 
+# a row of genotype_phenotype.csv
+GENOTYPE_PHENOTYPE_ROW = (
+    'MGI:1920145',              # 01
+    'Setd5',                    # 02
+    'WTSI',                     # 03
+    'MEFW',                     # 04
+    'male',                     # 05
+    'heterozygote',             # 06
+    'MGI:4432631',              # 07
+    'Setd5<tm1a(EUCOMM)Wtsi>',  # 08
+    'targeted mutation 1a, Wellcome Trust Sanger Institute',    # 09
+    'MGI:2159965',              # 10
+    'C57BL/6N',                 # 11
+    'MGP',                      # 12
+    'Wellcome Trust Sanger Institute Mouse Genetics Project',   # 13
+    'MGP Select Pipeline',      # 14
+    'MGP_001',                  # 15
+    'MGP_XRY_001',              # 16
+    'X-ray',                    # 17
+    'IMPC_XRY_008_001',         # 18
+    'Number of ribs right',     # 19
+    'MP:0005390',               # 20
+    'skeleton phenotype',       # 21
+    'MP:0000480',               # 22
+    'increased rib number',     # 23
+    '1.637023E-010',            # 24
+    '',                         # 25
+    '8.885439E-007',            # 26
+    'Wilcoxon rank sum test with continuity correction',    # 27
+    'IMPC'            # 28
+)
+
 
 class EvidenceProvenanceTestCase(unittest.TestCase):
 
@@ -53,36 +91,7 @@ class EvidenceProvenanceTestCase(unittest.TestCase):
         # 27 statistical_method,
         # 28 resource_name
 
-        self.test_set_1 = (
-            'MGI:1920145',              # 01
-            'Setd5',                    # 02
-            'WTSI',                     # 03
-            'MEFW',                     # 04
-            'male',                     # 05
-            'heterozygote',             # 06
-            'MGI:4432631',              # 07
-            'Setd5<tm1a(EUCOMM)Wtsi>',  # 08
-            'targeted mutation 1a, Wellcome Trust Sanger Institute',    # 09
-            'MGI:2159965',              # 10
-            'C57BL/6N',                 # 11
-            'MGP',                      # 12
-            'Wellcome Trust Sanger Institute Mouse Genetics Project',   # 13
-            'MGP Select Pipeline',      # 14
-            'MGP_001',                  # 15
-            'MGP_XRY_001',              # 16
-            'X-ray',                    # 17
-            'IMPC_XRY_008_001',         # 18
-            'Number of ribs right',     # 19
-            'MP:0005390',               # 20
-            'skeleton phenotype',       # 21
-            'MP:0000480',               # 22
-            'increased rib number',     # 23
-            '1.637023E-010',            # 24
-            '',                         # 25
-            '8.885439E-007',            # 26
-            'Wilcoxon rank sum test with continuity correction',    # 27
-            'IMPC'            # 28
-        )
+        self.test_set_1 = GENOTYPE_PHENOTYPE_ROW
 
         # Generate test curies, these are otherwise generated
         # within _add_evidence() and _add_study_provenance()
@@ -311,5 +320,78 @@ WHERE {
         return
 
 
+class GenotypePhenotypeRowsTestCase(unittest.TestCase):
+    '''
+    Rows of a genotype_phenotype.csv as parse() reads them, through process_rows
+    '''
+
+    def setUp(self):
+        self.rawdir = tempfile.mkdtemp()
+        self.impc = IMPC('rdf_graph', True)
+        self.row = list(GENOTYPE_PHENOTYPE_ROW)
+
+    def tearDown(self):
+        shutil.rmtree(self.rawdir)
+
+    def write(self, rows):
+        filename = os.path.join(self.rawdir, 'ALL_genotype_phenotype.csv.gz')
+        with gzip.open(filename, 'wt') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(IMPC.files['all']['columns'])
+            writer.writerows(rows)
+        return TableReader(
+            filename, IMPC.files['all']['columns'], delimiter=',', quotechar='\"',
+            comment=None, strip=True)
+
+    def test_row_with_strain(self):
+        reader = self.write([self.row])
+        graph = self.impc.graph
+        self.impc.process_rows(reader, self.impc._add_genotype_phenotypes, graph)
+        self.assertEqual(reader.rows_kept, 1)
+        taxa = {
+            str(obj) for obj in graph.objects(
+                None, graph._getnode(self.impc.globaltt['in taxon']))}
+        self.assertIn(graph.curie_util.get_uri(self.impc.globaltt['Mus musculus']), taxa)
+
+    @unittest.skipUnless(can_fork(), 'workers are forked')
+    def test_sharded_as_one_process(self):
+        rows = []
+        for num in range(40):
+            row = list(self.row)
+            row[3] = 'MEFW{}'.format(num)
+            if num == 15:
+                row[5] = 'mosaic'   # unknown zygosity
+            rows.append(row)
+
+        def parse(workers):
+            output = os.path.join(self.rawdir, 'shards_{}.nt'.format(workers))
+            graph = StreamedGraph(True, 'test', StreamedGraph.open(output))
+            self.impc.graph = graph
+            reader = self.write(rows)
+            if workers == 1:
+                self.impc._add_genotype_phenotypes(reader, graph)
+            else:
+                process_sharded(
+                    self.impc, reader, self.impc._add_genotype_phenotypes, graph,
+                    workers, chunk_lines=10)
+            graph.close()
+            with open(output) as ntriples:
+                return ntriples.read()
+
+        single = parse(1)
+        # the rows after the one of unknown zygosity are parsed
+        self.assertIn('MEFW39', single)
+        self.assertNotIn('mosaic', single)
+        self.assertEqual(parse(3), single)
+
+    def test_checksums(self):
+        self.impc.rawdir = self.rawdir
+        with open(os.path.join(self.rawdir, 'checksum.md5'), 'w') as md5:
+            md5.write('d41d8cd98f00b204e9800998ecf8427e  ALL_genotype_phenotype.csv.gz\n')
+        self.assertEqual(
+            self.impc.parse_checksum_file('checksum.md5'),
+            {'d41d8cd98f00b204e9800998ecf8427e': 'ALL_genotype_phenotype.csv.gz'})
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+import unittest
+import logging
+import os
+import json
+import pstats
+import shutil
+import tempfile
+
+from dipper.graph.RDFGraph import RDFGraph
+from dipper.utils.MetricsUtil import Metrics, count_rows
+
+logging.basicConfig(level=logging.WARNING)
+LOG = logging.getLogger(__name__)
+
+
+class FakeSource:
+    # just what Metrics.instrument needs of a Source
+
+    def __init__(self):
+        self.graph = RDFGraph(True, 'test')
+
+    def _process_genes(self, limit=None):
+        for num in range(limit):
+            count_rows()
+            self.graph.addTriple('NCBIGene:%i' % num, 'rdfs:label', 'gene', True)
+        return 'done'
+
+
+class MetricsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.outdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.outdir)
+
+    def test_methods_and_stages(self):
+        source = FakeSource()
+        metrics = Metrics('fake')
+        metrics.instrument(source)
+        with metrics.stage('parse', source.graph, self.outdir, trace_memory=True):
+            self.assertEqual(source._process_genes(limit=10), 'done')
+            source._process_genes(limit=5)
+
+        method = metrics.methods['_process_genes']
+        self.assertEqual(
+            (method['calls'], method['triples'], method['rows']), (2, 15, 15))
+        stage = metrics.stages['parse']
+        self.assertEqual((stage['triples'], stage['rows']), (15, 15))
+        self.assertGreater(stage['memory_peak_kib'], 0)
+        self.assertTrue(stage['top_allocators'])
+        pstats.Stats(stage['profile'])     # a readable profile
+
+        metricsfile = os.path.join(self.outdir, 'fake_metrics.json')
+        metrics.write(metricsfile, source.graph)
+        with open(metricsfile) as fhandle:
+            report = json.load(fhandle)
+        self.assertEqual(report['triples'], 15)
+        self.assertEqual(
+            report['triples_per_predicate'],
+            {'http://www.w3.org/2000/01/rdf-schema#label': 15})
+        self.assertIn('rows_per_sec', report['methods']['_process_genes'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,7 +2,13 @@
 
 import unittest
 import logging
+import os
+import gzip
+import shutil
+import tempfile
+from unittest import mock
 from tests.test_source import SourceTestCase
+from dipper.sources.OMIMSource import OMIMSource
 from dipper.sources.OMIA import OMIA
 
 
@@ -22,5 +28,43 @@ class OMIATestCase(SourceTestCase):
         self.source = None
         return
 
+
+class OMIAOrthologsTestCase(unittest.TestCase):
+    """
+    OMIA adds the orthologs of its genes from NCBI Gene's gene_group file
+    """
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.workdir = tempfile.mkdtemp()
+        os.chdir(self.workdir)
+        os.makedirs('raw/ncbigene')
+        os.makedirs('out')
+        with gzip.open('raw/ncbigene/gene_group.gz', 'wt') as tsv:
+            tsv.write('#tax_id\tGeneID\trelationship\tOther_tax_id\tOther_GeneID\n')
+            tsv.write('9606\t7157\tOrtholog\t9615\t403869\n')
+        with open('out/ncbigene.nt', 'w') as ntriples:
+            ntriples.write('# the finished ncbigene ingest\n')
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.workdir)
+
+    @mock.patch.object(OMIMSource, 'populate_omim_type')
+    def test_parse_after_ncbigene(self, _):
+        omia = OMIA('streamed_graph', True)
+        with mock.patch.multiple(
+                omia, scrub=mock.DEFAULT, process_species=mock.DEFAULT,
+                process_classes=mock.DEFAULT, process_associations=mock.DEFAULT,
+                write_molgen_report=mock.DEFAULT):
+            omia.annotated_genes = {'NCBIGene:403869'}
+            omia.parse()
+        omia.close()
+        with open('out/ncbigene.nt') as ntriples:
+            self.assertEqual(ntriples.read(), '# the finished ncbigene ingest\n')
+        with open(omia.streamfile) as ntriples:
+            self.assertIn('<https://www.ncbi.nlm.nih.gov/gene/7157>', ntriples.read())
+
+
 if __name__ == '__main__':
     unittest.main()
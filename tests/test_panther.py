@@ -4,6 +4,9 @@ import unittest
 import logging
 from tests.test_source import SourceTestCase
 from dipper.sources.Panther import Panther
+from dipper.graph.ShardGraph import ShardGraph
+from dipper.models.Model import Model
+from dipper.models.assoc.OrthologyAssoc import OrthologyAssoc
 
 logging.basicConfig(level=logging.WARNING)
 logger = logging.getLogger(__name__)
@@ -31,5 +34,52 @@ class PantherTestCase(SourceTestCase):
     #    return
 
 
+class PantherOrthologTriplesTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.source = Panther('rdf_graph', True)
+
+    def tearDown(self):
+        self.source = None
+
+    def test_triples_as_orthology_assoc(self):
+        (gene_a, gene_b) = ('NCBIGene:1', 'MGI:11287')
+        rel = self.source.resolve('LDO')
+        family_id = 'PANTHER:PTHR15964'
+
+        graph = ShardGraph()
+        model = Model(graph)
+        assoc = OrthologyAssoc(graph, self.source.name, gene_a, gene_b, rel)
+        assoc.add_evidence(self.source.globaltt['phylogenetic evidence'])
+        model.addClassToGraph(gene_a, None)
+        model.addClassToGraph(gene_b, None)
+        graph.addTriple(gene_a, self.source.globaltt['in taxon'], 'NCBITaxon:9606')
+        graph.addTriple(gene_b, self.source.globaltt['in taxon'], 'NCBITaxon:10090')
+        assoc.add_association_to_graph()
+        assoc.add_gene_family_to_graph(family_id)
+
+        expected = ShardGraph()
+        expected.addTriples(self.source._ortholog_triples(
+            expected, gene_a, gene_b, rel, self.source.globaltt['phylogenetic evidence'],
+            '9606', '10090', family_id))
+        self.assertEqual(
+            [triple[:3] for triple in graph.records],
+            [triple[:3] for triple in expected.records])
+
+    def test_species_taxa(self):
+        species_taxa = self.source.get_species_taxa()
+        self.assertEqual(species_taxa['HUMAN'], '9606')
+        self.assertEqual(species_taxa['MOUSE'], '10090')
+        self.assertNotIn('LDO', species_taxa)
+
+    def test_gene_curies(self):
+        self.assertEqual(
+            self.source._get_gene_curie('MGI=MGI=2176230', 'MOUSE'), 'MGI:2176230')
+        self.assertEqual(
+            self.source._get_gene_curie('Ensembl=ENSG00000184730', 'HUMAN'),
+            'ENSEMBL:ENSG00000184730')
+        self.assertIsNone(self.source._get_gene_curie('Gene_Name=Huwe1', 'RAT'))
+
+
 if __name__ == '__main__':
     unittest.main()
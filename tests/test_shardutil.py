@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+
+import unittest
+import logging
+import os
+import gzip
+import shutil
+import tempfile
+
+from dipper.graph.ShardGraph import ShardGraph
+from dipper.graph.StreamedGraph import StreamedGraph
+from dipper.utils.TableUtil import TableReader
+from dipper.utils.ShardUtil import process_sharded, can_fork
+
+logging.basicConfig(level=logging.WARNING)
+LOG = logging.getLogger(__name__)
+
+COLUMNS = ['marker', 'label']
+
+
+class Ingest:
+    '''
+    What a worker needs of an ingest: the graphs it swaps for its shard's
+    '''
+
+    def __init__(self, graph):
+        self.graph = self.testgraph = graph
+
+    def add_rows(self, reader, graph):
+        for row in reader:
+            graph.addTriple(row.marker, 'rdfs:label', row.label, True)
+            # blank nodes are skolemized as they would be in one process
+            graph.addTriple(row.marker, 'RO:0002200', '_:pheno' + row.marker[4:])
+            # as are the triples an ingest adds to its own graph
+            self.graph.addTriple(
+                '_:pheno' + row.marker[4:], 'rdf:type', 'UPHENO:0001001')
+        return reader.rows_kept
+
+
+@unittest.skipUnless(can_fork(), 'workers are forked')
+class ShardUtilTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.table = os.path.join(self.tmpdir, 'markers.csv.gz')
+        with gzip.open(self.table, 'wt') as csv:
+            csv.write('marker,label\n')
+            for num in range(500):
+                # quoted labels over two lines must not be split between chunks
+                if num % 7 == 0:
+                    csv.write('MGI:{},"marker\n{}"\n'.format(num, num))
+                else:
+                    csv.write('MGI:{},marker {}\n'.format(num, num))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def reader(self):
+        return TableReader(self.table, COLUMNS, delimiter=',', quotechar='"')
+
+    def parse(self, workers):
+        output = os.path.join(self.tmpdir, 'shards_{}.nt'.format(workers))
+        graph = StreamedGraph(True, 'test', StreamedGraph.open(output))
+        ingest = Ingest(graph)
+        reader = self.reader()
+        if workers == 1:
+            kept = [ingest.add_rows(reader, graph)]
+        else:
+            kept = process_sharded(
+                ingest, reader, ingest.add_rows, graph, workers, chunk_lines=40)
+        graph.close()
+        self.assertEqual(sum(kept), 500)
+        self.assertEqual(reader.rows_read, 500)
+        with open(output) as ntriples:
+            return ntriples.read()
+
+    def test_as_one_process(self):
+        single = self.parse(1)
+        self.assertEqual(len(single.splitlines()), 1500)
+        self.assertEqual(self.parse(3), single)
+
+    def test_shard_graph_records(self):
+        graph = ShardGraph()
+        graph.addTriple('MGI:1', 'rdfs:label', 'one', True)
+        graph.addTriples([('MGI:1', 'rdf:type', 'SO:0000704')])
+        self.assertEqual(len(graph), 2)
+        self.assertEqual(graph.records[1], ('MGI:1', 'rdf:type', 'SO:0000704'))
+        self.assertIn(b'"one"', graph.serialize(format='nt'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+
+import unittest
+import logging
+import os
+import gzip
+import random
+import shutil
+import tempfile
+
+from dipper.utils.SortUtil import sort_ntriples
+
+logging.basicConfig(level=logging.WARNING)
+LOG = logging.getLogger(__name__)
+
+
+class SortUtilTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.outdir = tempfile.mkdtemp()
+        rand = random.Random(5)
+        self.lines = [
+            '<http://x.org/s{}> <http://x.org/p> "café {}" .\n'.format(
+                rand.randrange(20000), num % 7)
+            for num in range(60000)]
+        self.expected = sorted(set(self.lines))
+
+    def tearDown(self):
+        shutil.rmtree(self.outdir)
+
+    def test_sort_many_runs(self):
+        infile = os.path.join(self.outdir, 'test.nt')
+        with open(infile, 'w', encoding='utf-8') as fh:
+            fh.writelines(self.lines)
+            fh.write('\n')
+        # ~1MB runs and merging 2 at a time
+        count = sort_ntriples(infile, workers=2, memory=2 ** 22, fan_in=2)
+        self.assertEqual(count, len(self.expected))
+        with open(infile, encoding='utf-8') as fh:
+            self.assertEqual(fh.readlines(), self.expected)
+        self.assertEqual(os.listdir(self.outdir), ['test.nt'])
+
+    def test_sort_compressed(self):
+        infile = os.path.join(self.outdir, 'test.nt.gz')
+        outfile = os.path.join(self.outdir, 'sorted.nt.gz')
+        with gzip.open(infile, 'wt', encoding='utf-8') as fh:
+            fh.writelines(self.lines)
+        sort_ntriples(infile, outfile)
+        with gzip.open(outfile, 'rt', encoding='utf-8') as fh:
+            self.assertEqual(fh.readlines(), self.expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+
+import unittest
+import logging
+import os
+import gzip
+import shutil
+import tempfile
+
+from rdflib import ConjunctiveGraph, URIRef
+from rdflib.compare import to_isomorphic
+
+from dipper.graph.StreamedGraph import StreamedGraph, zstandard
+from dipper.graph.RDFGraph import RDFGraph
+from dipper.models.Model import Model
+from dipper import curie_map
+
+logging.basicConfig(level=logging.WARNING)
+LOG = logging.getLogger(__name__)
+
+
+class StreamedGraphTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.outdir = tempfile.mkdtemp()
+        self.go_iri = curie_map.get()['GO']
+
+    def tearDown(self):
+        shutil.rmtree(self.outdir)
+
+    def _stream(self, graph, count):
+        for num in range(count):
+            graph.addTriple(
+                'GO:%07i' % num, 'rdfs:subClassOf', 'GO:0008150')
+
+    def _check(self, lines, count):
+        self.assertEqual(len(lines), count)
+        self.assertEqual(len(set(lines)), count)
+        self.assertEqual(
+            lines[0].split()[0], '<{}0000000>'.format(self.go_iri))
+
+    def test_buffered_write(self):
+        outfile = os.path.join(self.outdir, 'test.nt')
+        graph = StreamedGraph(True, 'test', StreamedGraph.open(outfile))
+        self._stream(graph, 10)
+        graph.flush()
+        with open(outfile) as fh:
+            self._check(fh.read().splitlines(), 10)
+        graph.close()
+        graph.close()   # closing twice is harmless
+
+    def test_gzip_threaded(self):
+        outfile = os.path.join(self.outdir, 'test.nt.gz')
+        graph = StreamedGraph(
+            True, 'test', StreamedGraph.open(outfile, 'gzip'), threaded=True)
+        self._stream(graph, 10000)
+        graph.close()
+        with gzip.open(outfile, 'rt') as fh:
+            self._check(fh.read().splitlines(), 10000)
+
+    @unittest.skipIf(zstandard is None, 'zstandard is not installed')
+    def test_zstd(self):
+        outfile = os.path.join(self.outdir, 'test.nt.zst')
+        graph = StreamedGraph(True, 'test', StreamedGraph.open(outfile, 'zstd'))
+        self._stream(graph, 100)
+        graph.close()
+        with open(outfile, 'rb') as fh:
+            reader = zstandard.ZstdDecompressor().stream_reader(fh)
+            self._check(reader.read().decode().splitlines(), 100)
+
+    def test_dedup(self):
+        outfile = os.path.join(self.outdir, 'test.nt')
+        graph = StreamedGraph(
+            True, 'test', StreamedGraph.open(outfile), dedup='exact')
+        for _ in range(3):
+            self._stream(graph, 10)
+        graph.close()
+        self.assertEqual(graph.duplicates, 20)
+        with open(outfile) as fh:
+            self._check(fh.read().splitlines(), 10)
+
+    def test_add_triples(self):
+        outfile = os.path.join(self.outdir, 'test.nt')
+        graph = StreamedGraph(
+            True, 'test', StreamedGraph.open(outfile), dedup='exact')
+        graph.addTriples(
+            ('GO:%07i' % (num % 10), 'rdfs:subClassOf', 'GO:0008150')
+            for num in range(30))
+        graph.close()
+        self.assertEqual(graph.duplicates, 20)
+        with open(outfile) as fh:
+            self._check(fh.read().splitlines(), 10)
+
+    def test_unknown_prefix_skipped(self):
+        outfile = os.path.join(self.outdir, 'test.nt')
+        graph = StreamedGraph(True, 'test', StreamedGraph.open(outfile))
+        graph.addTriple('NOSUCHPREFIX:1', 'rdfs:subClassOf', 'GO:0008150')
+        graph.addTriple('GO:0000001', 'rdfs:subClassOf', 'NOSUCHPREFIX:1')
+        graph.addTriple('GO:0000001', 'rdfs:label', '1', True, 'NOSUCHPREFIX:int')
+        self._stream(graph, 1)
+        graph.close()
+        with open(outfile) as fh:
+            self._check(fh.read().splitlines(), 1)
+
+    def test_object_is_literal(self):
+        outfile = os.path.join(self.outdir, 'test.nt')
+        graph = StreamedGraph(True, 'test', StreamedGraph.open(outfile))
+        # an explicit False is an IRI (it had been written as a literal)
+        graph.addTriple('GO:0000001', 'rdfs:seeAlso', 'GO:0000002', False)
+        graph.addTriple('GO:0000001', 'rdfs:label', 'GO:0000003', True)
+        # when not given, a curie or IRI is an IRI, anything else a literal
+        graph.addTriple('GO:0000001', 'rdfs:seeAlso', 'http://x.org/1')
+        graph.addTriple('GO:0000001', 'rdfs:comment', 'a comment')
+        graph.close()
+        with open(outfile) as fh:
+            objects = [line.split(' ', 2)[2] for line in fh.read().splitlines()]
+        self.assertEqual(objects, [
+            '<{}0000002> .'.format(self.go_iri), '"GO:0000003" .',
+            '<http://x.org/1> .', '"a comment" .'])
+
+    @staticmethod
+    def _fill(graph):
+        model = Model(graph)
+        for num in range(3):
+            gene = 'NCBIGene:%i' % num
+            model.addClassToGraph(gene, 'gene <%i> & "more"' % num, 'SO:0000704')
+            model.addTriple(gene, 'RO:0002162', 'NCBITaxon:9606')
+            model.addTriple(
+                gene, 'GENO:0000866', num, object_is_literal=True,
+                literal_type='xsd:integer')
+            model.addTriple(gene, 'RO:0002200', '_:b%i' % num)
+            model.addTriple('_:b%i' % num, 'rdfs:label', 'blank\nnode', True)
+            model.addTriple(gene, 'rdfs:seeAlso', 'http://x.org/a/b(c)')
+        return graph
+
+    def test_formats(self):
+        expected = to_isomorphic(self._fill(RDFGraph(True, 'test')))
+        for (fmt, parser) in (
+                ('nt', 'nt'), ('nquads', 'nquads'), ('turtle', 'turtle'),
+                ('n3', 'n3'), ('rdfxml', 'xml')):
+            outfile = os.path.join(self.outdir, 'test.' + fmt)
+            graph = StreamedGraph(
+                True, ':MONARCH_test', StreamedGraph.open(outfile), fmt=fmt)
+            self._fill(graph).close()
+            parsed = ConjunctiveGraph()
+            parsed.parse(outfile, format=parser)
+            self.assertEqual(to_isomorphic(parsed), expected, fmt)
+            if fmt == 'nquads':
+                self.assertEqual(
+                    [context.identifier for context in parsed.contexts()],
+                    [URIRef(graph.get_graph_iri())])
+
+    def test_unknown_compression(self):
+        with self.assertRaises(ValueError):
+            StreamedGraph.open(os.path.join(self.outdir, 'test.nt'), 'lzma')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+
+import unittest
+import logging
+import io
+import os
+import gzip
+import shutil
+import tarfile
+import tempfile
+import zipfile
+
+from dipper.utils.TableUtil import TableReader
+
+logging.basicConfig(level=logging.WARNING)
+LOG = logging.getLogger(__name__)
+
+COLUMNS = ['tax_id', 'GeneID', 'Symbol', 'description']
+
+LINES = [
+    '#tax_id\tGeneID\tSymbol\tdescription\n',
+    '9606\t1\tA1BG\talpha-1-B glycoprotein\n',
+    '10090\t11287\tPzp\tPZP, alpha-2-macroglobulin like\n',
+    '# a comment\n',
+    '9606\t2\tA2M\talpha-2-macroglobulin\n',
+    '9606\t3\n',
+    '7955\t30037\ttnc\ttenascin C\n',
+]
+
+
+class TableReaderTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.rawdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.rawdir)
+
+    def write(self, name, lines=LINES):
+        filename = os.path.join(self.rawdir, name)
+        with open(filename, 'w') as tsv:
+            tsv.writelines(lines)
+        return filename
+
+    def test_rows_by_name(self):
+        reader = TableReader(self.write('gene_info'), COLUMNS)
+        rows = list(reader)
+        self.assertEqual([row.GeneID for row in rows], ['1', '11287', '2', '30037'])
+        self.assertEqual(rows[0].description, 'alpha-1-B glycoprotein')
+        self.assertEqual(reader.rows_read, 5)
+        self.assertEqual(reader.rows_kept, 4)
+        self.assertEqual(reader.malformed, 1)
+
+    def test_reordered_columns(self):
+        reader = TableReader(self.write('gene_info'), ['Symbol', 'tax_id'])
+        self.assertEqual(next(iter(reader)), ('A1BG', '9606'))
+
+    def test_missing_column(self):
+        reader = TableReader(self.write('gene_info'), COLUMNS + ['Feature_type'])
+        with self.assertRaises(AssertionError):
+            list(reader)
+
+    def test_select_and_limit(self):
+        filename = self.write('gene_info')
+        reader = TableReader(filename, COLUMNS, select={'tax_id': ['9606', '7955']})
+        self.assertEqual([row.Symbol for row in reader], ['A1BG', 'A2M', 'tnc'])
+        reader = TableReader(filename, COLUMNS, select={'tax_id': ['9606']}, limit=1)
+        self.assertEqual([row.Symbol for row in reader], ['A1BG'])
+        self.assertEqual(reader.rows_read, 1)
+
+    def test_prefilter(self):
+        reader = TableReader(
+            self.write('gene_info'), COLUMNS, prefilter=r'^(?:9606|7955)\t')
+        self.assertEqual([row.Symbol for row in reader], ['A1BG', 'A2M', 'tnc'])
+        self.assertEqual(reader.rows_read, 5)
+        self.assertEqual(reader.malformed, 1)
+
+    def test_without_header(self):
+        reader = TableReader(
+            self.write('gene_info'), None, header=False, select={0: ['10090']})
+        self.assertEqual(
+            list(reader), [['10090', '11287', 'Pzp', 'PZP, alpha-2-macroglobulin like']])
+
+    def test_quoted_csv(self):
+        filename = self.write('phenotypes.csv', [
+            'marker,p_value,description\n',
+            '"MGI:1", 0.01 ,"small, pale"\n',
+            '"MGI:2",0.5,"large"\n'])
+        reader = TableReader(
+            filename, ['marker', 'description', 'p_value'], delimiter=',',
+            quotechar='"', strip=True)
+        self.assertEqual(list(reader)[0], ('MGI:1', 'small, pale', '0.01'))
+        self.assertEqual(reader.line_num, 3)
+
+    def test_compressed_and_archived(self):
+        data = ''.join(LINES).encode()
+        gzipped = os.path.join(self.rawdir, 'gene_info.gz')
+        with gzip.open(gzipped, 'wb') as tsv:
+            tsv.write(data)
+        tarred = os.path.join(self.rawdir, 'gene_info.tar.gz')
+        with tarfile.open(tarred, 'w:gz') as tar:
+            info = tarfile.TarInfo('gene_info')
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+        zipped = os.path.join(self.rawdir, 'gene_info.zip')
+        with zipfile.ZipFile(zipped, 'w') as archive:
+            archive.writestr('gene_info', data)
+        for filename in (gzipped, tarred, zipped):
+            with self.subTest(filename=filename):
+                rows = list(TableReader(filename, COLUMNS))
+                self.assertEqual(len(rows), 4)
+                self.assertEqual(rows[-1].Symbol, 'tnc')
+
+
+if __name__ == '__main__':
+    unittest.main()
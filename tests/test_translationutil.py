@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+
+import unittest
+import logging
+import os
+import shutil
+import tempfile
+
+from dipper.utils import TranslationUtil
+from dipper.utils.TranslationUtil import load_table, compose
+
+logging.basicConfig(level=logging.WARNING)
+LOG = logging.getLogger(__name__)
+
+
+class TranslationUtilTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.ttdir = tempfile.mkdtemp()
+        self.yamlfile = os.path.join(self.ttdir, 'panther.yaml')
+        with open(self.yamlfile, 'w') as yaml_file:
+            yaml_file.write('---\n"LDO": "least diverged orthologous"\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.ttdir)
+
+    def test_compiled_once(self):
+        table = load_table(self.yamlfile)
+        self.assertEqual(table, {'LDO': 'least diverged orthologous'})
+        self.assertTrue(os.path.exists(
+            os.path.join(self.ttdir, '__pycache__', 'panther.yaml.pickle')))
+        # later processes read the compiled copy
+        TranslationUtil._TABLES.clear()
+        self.assertEqual(load_table(self.yamlfile), table)
+
+    def test_changed_yaml(self):
+        load_table(self.yamlfile)
+        with open(self.yamlfile, 'a') as yaml_file:
+            yaml_file.write('"O": "orthologous"\n')
+        self.assertEqual(load_table(self.yamlfile)['O'], 'orthologous')
+
+    def test_compose(self):
+        globaltt = {
+            'least diverged orthologous': 'RO:HOM0000020',
+            'orthologous': 'RO:HOM0000017', 'LDO': 'RO:0000000'}
+        localtt = {'LDO': 'least diverged orthologous', 'P': 'paralogous'}
+        resolved = compose(localtt, globaltt)
+        self.assertEqual(resolved['LDO'], 'RO:HOM0000020')
+        self.assertEqual(resolved['orthologous'], 'RO:HOM0000017')
+        # left for resolve to report
+        self.assertNotIn('P', resolved)
+
+    def test_global_terms(self):
+        self.assertIs(TranslationUtil.get_globaltt(), TranslationUtil.get_globaltt())
+
+
+if __name__ == '__main__':
+    unittest.main()